@@ -0,0 +1,47 @@
+import api from './axios';
+
+// Live updates from GET /api/events/ (Server-Sent Events).
+// `handlers` maps event names ('gate_log', 'visitor', 'alert') to callbacks
+// that receive the parsed event data. Returns a function that closes the stream.
+export const subscribeToEvents = (handlers) => {
+    let source = null;
+    let retryTimer = null;
+    let closed = false;
+
+    const retry = () => {
+        if (!closed) retryTimer = setTimeout(connect, 15000);
+    };
+
+    const connect = async () => {
+        if (!localStorage.getItem('access_token') || closed) return;
+
+        // Each stream is opened with a fresh single-use ticket, so the access
+        // token never goes in a URL (the axios interceptor refreshes it if needed)
+        let ticket;
+        try {
+            const response = await api.post('/api/events/ticket/');
+            ticket = response.data.ticket;
+        } catch {
+            retry();
+            return;
+        }
+        if (closed) return;
+
+        source = new EventSource(`${api.defaults.baseURL}/api/events/?ticket=${encodeURIComponent(ticket)}`);
+        Object.entries(handlers).forEach(([name, handler]) => {
+            source.addEventListener(name, (event) => handler(JSON.parse(event.data)));
+        });
+        source.onerror = () => {
+            // The ticket is used up; reconnect with a new one
+            source.close();
+            retry();
+        };
+    };
+
+    connect();
+    return () => {
+        closed = true;
+        clearTimeout(retryTimer);
+        if (source) source.close();
+    };
+};
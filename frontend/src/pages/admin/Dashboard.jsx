@@ -12,6 +12,7 @@ import {
   LogOut 
 } from 'lucide-react';
 import api from '../../api/axios';
+import { subscribeToEvents } from '../../api/events';
 import AlertsWidget from '../shared/AlertsWidget';
 
 const AdminDashboard = () => {
@@ -27,32 +28,22 @@ const AdminDashboard = () => {
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
-    const fetchDashboardData = async () => {
+    let refreshTimer = null;
+
+    const fetchDashboardData = async (showSpinner = true) => {
       try {
-        setLoading(true);
+        if (showSpinner) setLoading(true);
         
-        // Fetch recent logs
-        const logsResponse = await api.get('/api/gate-logs/?limit=5');
-        setRecentLogs(logsResponse.data.results || logsResponse.data);
-
-        // Fetch basic counts (you might need to add these endpoints or use existing ones)
-        try {
-          const [usersRes, assetsRes, vehiclesRes] = await Promise.all([
-            api.get('/api/users/'),
-            api.get('/api/assets/'),
-            api.get('/api/vehicles/'),
-          ]);
-          
-          setStats(prev => ({
-            ...prev,
-            totalUsers: Array.isArray(usersRes.data) ? usersRes.data.length : (usersRes.data.count ?? 0),
-            totalAssets: assetsRes.data.count ?? 0,
-            totalVehicles: vehiclesRes.data.count ?? 0,
-            totalLogs: logsResponse.data.count ?? 0,
-          }));
-        } catch (statsError) {
-          console.warn('Some stats could not be loaded:', statsError);
-        }
+        // One cached summary replaces the old per-entity list downloads
+        const { data } = await api.get('/api/dashboard/summary/');
+        setRecentLogs(data.recent_logs);
+        setStats({
+          totalUsers: data.users.total,
+          totalAssets: data.assets,
+          totalVehicles: data.vehicles,
+          totalLogs: data.gate_logs.total,
+          todayLogs: data.gate_logs.today,
+        });
         
       } catch (error) {
         console.error('Error fetching dashboard data:', error);
@@ -62,6 +53,21 @@ const AdminDashboard = () => {
     };
 
     fetchDashboardData();
+
+    // Refresh when the server pushes new activity, at most every 10 seconds
+    const scheduleRefresh = () => {
+      if (!refreshTimer) {
+        refreshTimer = setTimeout(() => {
+          refreshTimer = null;
+          fetchDashboardData(false);
+        }, 10000);
+      }
+    };
+    const unsubscribe = subscribeToEvents({ gate_log: scheduleRefresh, visitor: scheduleRefresh });
+    return () => {
+      unsubscribe();
+      clearTimeout(refreshTimer);
+    };
   }, []);
 
   const quickActions = [
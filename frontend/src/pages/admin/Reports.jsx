@@ -36,7 +36,7 @@ const AdminReports = () => {
   }, [startDateFilter, endDateFilter, typeFilter, guardFilter]);
 
   const buildFilterParams = () => {
-    const params = { page_size: 500 };
+    const params = {};
     if (startDateFilter) params.start_date = startDateFilter;
     if (endDateFilter) params.end_date = endDateFilter;
     if (typeFilter !== 'all') params.log_type = typeFilter;
@@ -45,33 +45,30 @@ const AdminReports = () => {
   };
 
   const fetchAllLogs = async (params) => {
-    let nextUrl = '/api/gate-logs/';
-    let requestParams = params;
-    const aggregated = [];
-
-    while (nextUrl) {
-      const response = await api.get(nextUrl, { params: requestParams });
-      const data = response.data;
-
-      if (Array.isArray(data)) {
-        return data;
-      }
-
-      aggregated.push(...(data.results || []));
-      nextUrl = data.next;
-      requestParams = undefined;
-    }
-
-    return aggregated;
+    // One streamed NDJSON response instead of walking every paginated page
+    const response = await api.get('/api/gate-logs/export/', {
+      params: { ...params, output: 'ndjson' },
+      responseType: 'text',
+    });
+
+    return response.data
+      .split('\n')
+      .filter((line) => line.trim())
+      .map((line) => JSON.parse(line));
   };
 
   const fetchGuards = async () => {
     try {
-      const response = await api.get('/api/users/');
-      const users = response.data.results || response.data;
-      const guardUsers = users
-        .filter((user) => user.role === 'guard')
-        .sort((a, b) => `${a.first_name} ${a.last_name}`.localeCompare(`${b.first_name} ${b.last_name}`));
+      // Follow the cursor so campuses with more than one page of guards get all of them
+      let response = await api.get('/api/users/', {
+        params: { role: 'guard', ordering: 'last_name', page_size: 200 },
+      });
+      const guardUsers = [...response.data.results];
+      while (response.data.next) {
+        response = await api.get(response.data.next);
+        guardUsers.push(...response.data.results);
+      }
+      guardUsers.sort((a, b) => `${a.first_name} ${a.last_name}`.localeCompare(`${b.first_name} ${b.last_name}`));
       setGuards(guardUsers);
     } catch (fetchError) {
       console.error('Error fetching guards:', fetchError);
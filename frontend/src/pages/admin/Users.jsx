@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Link } from 'react-router-dom';
 import { useForm } from 'react-hook-form';
 import { zodResolver } from '@hookform/resolvers/zod';
@@ -406,12 +406,15 @@ const BanModal = ({ open, user, onClose, onUpdated }) => {
 
 const AdminUsers = () => {
   const [users, setUsers] = useState([]);
-  const [filteredUsers, setFilteredUsers] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
+  const [counts, setCounts] = useState({ by_role: {}, banned: 0 });
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [searchTerm, setSearchTerm] = useState('');
   const [debouncedSearch, setDebouncedSearch] = useState('');
   const [roleFilter, setRoleFilter] = useState('all');
   const [bannedFilter, setBannedFilter] = useState('all');
+  const latestRequest = useRef(0);
 
   // Modal state
   const [showForm, setShowForm] = useState(false);
@@ -419,8 +422,6 @@ const AdminUsers = () => {
   const [deleteTarget, setDeleteTarget] = useState(null);
   const [banTarget, setBanTarget] = useState(null);
 
-  useEffect(() => { fetchUsers(); }, []);
-
   useEffect(() => {
     const handler = setTimeout(() => {
       setDebouncedSearch(searchTerm);
@@ -428,29 +429,38 @@ const AdminUsers = () => {
     return () => clearTimeout(handler);
   }, [searchTerm]);
 
-  useEffect(() => {
-    let filtered = users;
-    if (debouncedSearch) {
-      const q = debouncedSearch.toLowerCase();
-      filtered = filtered.filter(u =>
-        u.username?.toLowerCase().includes(q) ||
-        u.first_name?.toLowerCase().includes(q) ||
-        u.last_name?.toLowerCase().includes(q) ||
-        u.email?.toLowerCase().includes(q) ||
-        u.student_id?.toLowerCase().includes(q)
-      );
+  // Filtering, search and paging happen on the server; unchanged pages come back as 304s
+  // (only the first load shows the full-page spinner)
+  useEffect(() => { fetchUsers(!loading); }, [debouncedSearch, roleFilter, bannedFilter]);
+
+  const buildParams = () => {
+    const params = {};
+    if (debouncedSearch.trim()) params.search = debouncedSearch.trim();
+    if (roleFilter !== 'all') params.role = roleFilter;
+    if (bannedFilter !== 'all') params.is_banned = bannedFilter === 'banned' ? 'true' : 'false';
+    return params;
+  };
+
+  const fetchCounts = async () => {
+    try {
+      const { data } = await api.get('/api/dashboard/summary/');
+      setCounts(data.users);
+    } catch (err) {
+      console.error('Error fetching user counts:', err);
     }
-    if (roleFilter !== 'all') filtered = filtered.filter(u => u.role === roleFilter);
-    if (bannedFilter === 'banned') filtered = filtered.filter(u => u.is_banned);
-    if (bannedFilter === 'active') filtered = filtered.filter(u => !u.is_banned);
-    setFilteredUsers(filtered);
-  }, [users, debouncedSearch, roleFilter, bannedFilter]);
+  };
 
   const fetchUsers = async (silent = false) => {
+    const requestId = ++latestRequest.current;
     try {
       if (!silent) setLoading(true);
-      const res = await api.get('/api/users/');
-      setUsers(res.data.results || res.data);
+      const [res] = await Promise.all([
+        api.get('/api/users/', { params: buildParams() }),
+        fetchCounts(),
+      ]);
+      if (requestId !== latestRequest.current) return;
+      setUsers(res.data.results);
+      setNextPage(res.data.next);
     } catch (err) {
       console.error('Error fetching users:', err);
     } finally {
@@ -458,6 +468,22 @@ const AdminUsers = () => {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextPage) return;
+    const requestId = latestRequest.current;
+    try {
+      setLoadingMore(true);
+      const res = await api.get(nextPage);
+      if (requestId !== latestRequest.current) return;
+      setUsers(prev => [...prev, ...res.data.results]);
+      setNextPage(res.data.next);
+    } catch (err) {
+      console.error('Error fetching users:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const openCreate = () => { setEditUser(null); setShowForm(true); };
   const openEdit   = (u) => { setEditUser(u);   setShowForm(true); };
 
@@ -561,13 +587,13 @@ const AdminUsers = () => {
           {/* Stats md/lg screens */}
           <div className="mt-6 pt-4 border-t-2 border-gray-900 flex flex-wrap gap-x-6 gap-y-2 text-xs font-bold uppercase tracking-widest text-gray-900">
             <span className="bg-gray-200 px-2 py-1 border border-gray-900">
-              {Math.min(filteredUsers.length, 50)} / {filteredUsers.length} SHOWN
+              {users.length}{nextPage ? '+' : ''} SHOWN
             </span>
-            <span className="flex items-center gap-2"><GraduationCap className="w-4 h-4"/> STU: {users.filter(u => u.role === 'student').length}</span>
-            <span className="flex items-center gap-2"><Briefcase className="w-4 h-4"/> STF: {users.filter(u => u.role === 'staff').length}</span>
-            <span className="flex items-center gap-2"><UserCheck className="w-4 h-4"/> GRD: {users.filter(u => u.role === 'guard').length}</span>
-            <span className="flex items-center gap-2"><Shield className="w-4 h-4"/> ADM: {users.filter(u => u.role === 'admin').length}</span>
-            <span className="flex items-center gap-2 text-red-600 ml-auto"><Ban className="w-4 h-4"/> BANNED: {users.filter(u => u.is_banned).length}</span>
+            <span className="flex items-center gap-2"><GraduationCap className="w-4 h-4"/> STU: {counts.by_role.student || 0}</span>
+            <span className="flex items-center gap-2"><Briefcase className="w-4 h-4"/> STF: {counts.by_role.staff || 0}</span>
+            <span className="flex items-center gap-2"><UserCheck className="w-4 h-4"/> GRD: {counts.by_role.guard || 0}</span>
+            <span className="flex items-center gap-2"><Shield className="w-4 h-4"/> ADM: {counts.by_role.admin || 0}</span>
+            <span className="flex items-center gap-2 text-red-600 ml-auto"><Ban className="w-4 h-4"/> BANNED: {counts.banned}</span>
           </div>
         </div>
 
@@ -585,7 +611,7 @@ const AdminUsers = () => {
                 </tr>
               </thead>
               <tbody className="bg-white divide-y-2 divide-gray-200">
-                {filteredUsers.slice(0, 50).map(user => (
+                {users.map(user => (
                   <tr key={user.id} className={`hover:bg-amber-50 transition-colors ${user.is_banned ? 'bg-red-50 hover:bg-red-100' : ''}`}>
                     {/* User */}
                     <td className="px-6 py-4 whitespace-nowrap">
@@ -702,7 +728,19 @@ const AdminUsers = () => {
             </table>
           </div>
 
-          {filteredUsers.length === 0 && (
+          {nextPage && (
+            <div className="border-t-4 border-gray-900 p-4 text-center bg-gray-50">
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="gate-btn px-6 py-3 shadow-[4px_4px_0px_0px_rgba(0,0,0,1)] hover:translate-y-[2px] hover:shadow-[2px_2px_0px_0px_rgba(0,0,0,1)] active:translate-y-[4px] active:shadow-none disabled:opacity-50"
+              >
+                {loadingMore ? 'LOADING...' : 'LOAD MORE'}
+              </button>
+            </div>
+          )}
+
+          {users.length === 0 && (
             <div className="text-center py-24 bg-gray-50">
               <div className="w-20 h-20 bg-white border-4 border-gray-900 flex items-center justify-center mx-auto mb-6 shadow-[4px_4px_0px_0px_rgba(0,0,0,1)]">
                 <Users className="h-10 w-10 text-gray-900" />
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import api from '../../api/axios';
 import { ChevronLeft, Search, UserCheck, UserMinus, ShieldAlert } from 'lucide-react';
@@ -10,21 +10,27 @@ const DayScholars = () => {
     const [error, setError] = useState(null);
 
     const navigate = useNavigate();
+    const latestRequest = useRef(0);
 
     const fetchScholars = async (search = '') => {
+        // Responses can arrive out of order while typing; only the newest is shown
+        const requestId = ++latestRequest.current;
         try {
             setLoading(true);
             const params = {};
             if (search.trim()) {
                 params.search = search.trim();
+                params.limit = 25;
             }
             const res = await api.get('/api/day-scholars/', { params });
+            if (requestId !== latestRequest.current) return;
             setScholars(Array.isArray(res.data) ? res.data : (res.data.results || []));
             setError(null);
         } catch {
+            if (requestId !== latestRequest.current) return;
             setError("Failed to load scholars. Tap to retry.");
         } finally {
-            setLoading(false);
+            if (requestId === latestRequest.current) setLoading(false);
         }
     };
 
@@ -55,25 +61,6 @@ const DayScholars = () => {
         }
     };
 
-    const filteredScholars = scholars.filter(s => {
-        const search = searchTerm.toLowerCase();
-        return (
-            (s.first_name && s.first_name.toLowerCase().includes(search)) ||
-            (s.last_name && s.last_name.toLowerCase().includes(search)) ||
-            (s.student_id && s.student_id.toLowerCase().includes(search))
-        );
-    }).sort((a, b) => {
-        const search = searchTerm.toLowerCase();
-        if (!search) return 0;
-        
-        const aIdMatch = a.student_id && a.student_id.toLowerCase().includes(search);
-        const bIdMatch = b.student_id && b.student_id.toLowerCase().includes(search);
-        
-        if (aIdMatch && !bIdMatch) return -1;
-        if (!aIdMatch && bIdMatch) return 1;
-        return 0;
-    });
-
     return (
         <div className="min-h-screen bg-[#f4f4f5] font-sans flex flex-col items-center p-4 sm:p-8 pb-24">
 
@@ -116,13 +103,13 @@ const DayScholars = () => {
                     </div>
                 ) : (
                     <div className="space-y-6">
-                        {filteredScholars.length === 0 ? (
+                        {scholars.length === 0 ? (
                             <div className="bg-white p-12 border-4 border-gray-900 text-center shadow-[8px_8px_0px_0px_rgba(0,0,0,1)]">
                                 <ShieldAlert className="w-16 h-16 text-gray-300 mx-auto mb-4" />
                                 <p className="text-xl font-display font-black text-gray-900 uppercase tracking-tight">No scholars found</p>
                             </div>
                         ) : (
-                            filteredScholars.map(scholar => (
+                            scholars.map(scholar => (
                                 <div key={scholar.id} className="bg-white border-4 border-gray-900 shadow-[8px_8px_0px_0px_rgba(0,0,0,1)] p-5 flex flex-col sm:flex-row sm:items-center justify-between gap-4">
                                     <div className="flex-1">
                                         <h3 className="text-2xl font-display font-black text-gray-900 uppercase leading-none tracking-tight">
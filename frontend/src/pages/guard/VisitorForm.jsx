@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useForm } from 'react-hook-form';
 import { zodResolver } from '@hookform/resolvers/zod';
@@ -12,6 +12,7 @@ const VisitorForm = () => {
     const [visitorData, setVisitorData] = useState(null);
     const [phoneCountry, setPhoneCountry] = useState('+254');
     const [hostPhoneCountry, setHostPhoneCountry] = useState('+254');
+    const [returning, setReturning] = useState(null);
 
     const navigate = useNavigate();
 
@@ -37,6 +38,42 @@ const VisitorForm = () => {
         }
     });
 
+    const nationalId = watch('national_id');
+
+    // Look the document up once typing pauses, to offer the last visit's details
+    useEffect(() => {
+        const number = (nationalId || '').trim();
+        if (number.length < 5) {
+            setReturning(null);
+            return undefined;
+        }
+        let cancelled = false;
+        const timer = setTimeout(async () => {
+            try {
+                const response = await api.get('/api/visitors/lookup/', { params: { document: number } });
+                if (!cancelled) setReturning(response.data.found ? response.data : null);
+            } catch {
+                if (!cancelled) setReturning(null);
+            }
+        }, 300);
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
+        };
+    }, [nationalId]);
+
+    const fillFromLastVisit = () => {
+        const previous = returning.visitor;
+        [
+            'name', 'phone', 'email', 'organization', 'purpose_category', 'purpose_details',
+            'host_name', 'host_email', 'host_phone', 'department', 'office_location', 'expected_duration',
+        ].forEach((field) => setValue(field, previous[field] ?? '', { shouldValidate: true }));
+        setPhoneCountry(previous.phone_country);
+        setValue('phone_country', previous.phone_country);
+        setHostPhoneCountry(previous.host_phone_country);
+        setValue('host_phone_country', previous.host_phone_country);
+    };
+
     const purposeCategory = watch('purpose_category');
     const isStudentVisit = purposeCategory === 'STUDENT_VISIT';
     const isPersonal = purposeCategory === 'PERSONAL';
@@ -193,6 +230,23 @@ const VisitorForm = () => {
                                         className="gate-input font-mono"
                                     />
                                     {errors.national_id && <p className="mt-2 text-xs font-bold text-red-600">{errors.national_id.message}</p>}
+                                    {returning && (
+                                        <div className="mt-2 p-3 border-2 border-gray-900 bg-yellow-50 text-xs font-bold">
+                                            <p className="uppercase tracking-wider">
+                                                Returning visitor: {returning.visitor.name} · {returning.visit_count} previous visit{returning.visit_count === 1 ? '' : 's'}, last {new Date(returning.visitor.last_visit).toLocaleDateString()}
+                                            </p>
+                                            {returning.visitor.on_site && (
+                                                <p className="mt-1 text-red-600 uppercase tracking-wider">Still signed in from their last visit</p>
+                                            )}
+                                            <button
+                                                type="button"
+                                                onClick={fillFromLastVisit}
+                                                className="mt-2 px-3 py-1 bg-white border-2 border-gray-900 uppercase tracking-wider hover:bg-gray-100"
+                                            >
+                                                Fill from last visit
+                                            </button>
+                                        </div>
+                                    )}
                                 </div>
 
                                 <div>
@@ -35,15 +35,14 @@ const VisitorManagement = () => {
   const fetchVisitors = async () => {
     try {
       setLoading(true);
-      const [allVisitors, pending, overdue] = await Promise.all([
-        api.get('/api/visitors/'),
-        api.get('/api/visitors/pending/'),
-        api.get('/api/visitors/overdue/')
-      ]);
-      
-      setVisitors(allVisitors.data.results || allVisitors.data);
-      setPendingVisitors(pending.data.results || pending.data);
-      setOverdueVisitors(overdue.data.results || overdue.data);
+      // One call returns today's desk plus which of those visits are pending/overdue
+      const { data } = await api.get('/api/visitors/desk/');
+      const pendingIds = new Set(data.pending_ids);
+      const overdueIds = new Set(data.overdue_ids);
+
+      setVisitors(data.visits);
+      setPendingVisitors(data.visits.filter((visitor) => pendingIds.has(visitor.id)));
+      setOverdueVisitors(data.visits.filter((visitor) => overdueIds.has(visitor.id)));
     } catch (error) {
       console.error('Error fetching visitors:', error);
     } finally {
@@ -198,7 +197,7 @@ const VisitorManagement = () => {
                   : 'bg-white text-gray-600 hover:bg-gray-100'
               }`}
             >
-              All Visitors ({visitors.length})
+              Today ({visitors.length})
             </button>
             <button
               onClick={() => setSelectedTab('pending')}
@@ -395,7 +394,7 @@ const VisitorManagement = () => {
               <p className="mt-2 text-sm font-bold text-gray-500 uppercase tracking-widest">
                 {selectedTab === 'pending' && 'No visitors pending approval.'}
                 {selectedTab === 'overdue' && 'No overdue visitors.'}
-                {selectedTab === 'all' && 'No visitors registered yet.'}
+                {selectedTab === 'all' && 'No visitors today.'}
               </p>
             </div>
           )}
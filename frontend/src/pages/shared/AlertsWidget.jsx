@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { AlertCircle, X } from 'lucide-react';
 import api from '../../api/axios';
+import { subscribeToEvents } from '../../api/events';
 
 const AlertsWidget = () => {
     const [alerts, setAlerts] = useState([]);
@@ -18,10 +19,15 @@ const AlertsWidget = () => {
             }
         };
         fetchAlerts();
-        
-        // Auto-refresh every 60 seconds
-        const interval = setInterval(fetchAlerts, 60000);
-        return () => clearInterval(interval);
+
+        // New overdue alerts and visitor sign-outs are pushed by the server;
+        // the slow poll is only a safety net if the stream is unavailable
+        const unsubscribe = subscribeToEvents({ alert: fetchAlerts, visitor: fetchAlerts });
+        const interval = setInterval(fetchAlerts, 300000);
+        return () => {
+            unsubscribe();
+            clearInterval(interval);
+        };
     }, []);
 
     if (loading || alerts.length === 0) return null;
@@ -41,8 +41,7 @@ const AssetDetail = () => {
     const handleDownload = async () => {
         try {
             // Attempt to fetch via proxy (relative path) to avoid CORS cross-origin blocks when converting to blob
-            const urlToFetch = asset.qr_code.startsWith('http') ? new URL(asset.qr_code).pathname : asset.qr_code;
-            const response = await fetch(urlToFetch);
+            const response = await fetch(asset.qr_image_url);
             const blob = await response.blob();
             const blobUrl = window.URL.createObjectURL(blob);
             
@@ -65,8 +64,7 @@ const AssetDetail = () => {
             const a = document.createElement('a');
             const safeOwner = asset.owner_name ? asset.owner_name.replace(/[^a-zA-Z0-9]/g, '_') : 'Student';
             const safeAsset = asset.asset_type ? asset.asset_type.replace(/[^a-zA-Z0-9]/g, '_') : 'Asset';
-            const qrPath = asset.qr_code.startsWith('http') ? new URL(asset.qr_code).pathname : asset.qr_code;
-            a.href = `${api.defaults.baseURL}${qrPath}`;
+            a.href = `${api.defaults.baseURL}${asset.qr_image_url}`;
             a.download = `${safeOwner}_${safeAsset}_QR.png`;
             a.target = "_blank";
             a.click();
@@ -100,10 +98,8 @@ const AssetDetail = () => {
         );
     }
 
-    // Extract only the pathname to ensure it routes correctly through Vite proxy on local networks,
-    // avoiding issues where the backend returns a localhost domain hardcoded in the url.
-    const qrPath = asset.qr_code.startsWith('http') ? new URL(asset.qr_code).pathname : asset.qr_code;
-    const qrUrl = `${api.defaults.baseURL}${qrPath}`;
+    // The QR image is rendered on demand by the API from the asset's token
+    const qrUrl = `${api.defaults.baseURL}${asset.qr_image_url}`;
 
     return (
         <PageLayout title="Asset QR Code">
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from assets import qr
+from assets.models import Asset
+from visitors.models import Visitor
+
+
+class Command(BaseCommand):
+    help = "Render QR images for assets and visitors that do not have one yet"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Rows rendered per bulk update (default 200)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        total = 0
+        for model in (Asset, Visitor):
+            pks = list(model.objects.filter(qr_code="").values_list("pk", flat=True))
+            for start in range(0, len(pks), batch_size):
+                total += qr.render_pending(
+                    [(model, pk) for pk in pks[start : start + batch_size]]
+                )
+        self.stdout.write(self.style.SUCCESS(f"QR codes rendered: {total}"))
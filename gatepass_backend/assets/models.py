@@ -1,11 +1,11 @@
 # Asset registration and QR codes
 import uuid
-from io import BytesIO
 
-import qrcode
-from django.core.files import File
+from django.core.files.base import ContentFile
 from django.db import models
 
+from . import qr
+
 
 # Create your models here.
 class Asset(models.Model):
@@ -20,12 +20,11 @@ class Asset(models.Model):
     registered_at = models.DateTimeField(auto_now_add=True)
 
     def save(self, *args, **kwargs):
-        if not self.qr_code:
-            self._generate_qr()
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        if adding and not self.qr_code:
+            qr.schedule(self)  # Rendered off the request; see assets/qr.py
 
-    def _generate_qr(self):
-        qr = qrcode.make(str(self.qr_token))
-        buffer = BytesIO()
-        qr.save(buffer, "PNG")
-        self.qr_code.save(f"asset_{self.qr_token}.png", File(buffer), save=False)
+    def _generate_qr(self, png=None):
+        png = png or qr.render_png(self.qr_token)
+        self.qr_code.save(f"asset_{self.qr_token}.png", ContentFile(png), save=False)
@@ -0,0 +1,160 @@
+"""
+QR code images for assets and visitors.
+
+Images are normally rendered on demand by ``/api/qr/<token>.<png|svg>`` (see
+``render``), which keeps a bounded LRU of the encoded bytes, so nothing is
+written to MEDIA_ROOT.
+
+Deployments that still want files on disk set ``QR_RENDER["STORE_FILES"]``.
+New rows are then committed with an empty ``qr_code`` and queued here once the
+transaction commits; a daemon thread drains the queue in batches, renders the
+images on a small thread pool and writes all the file names back with one
+bulk_update. An empty ``qr_code`` is the durable "still to render" marker:
+anything lost with a restarting worker is picked up by
+``manage.py generate_qr_codes``. Large imports call ``render_batch``, which
+encodes the images on a process pool instead (PNG encoding holds the GIL).
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+
+import qrcode
+import qrcode.image.svg
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_queue = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+_pool = None
+
+
+# Below this many images, starting worker processes costs more than it saves
+PROCESS_POOL_MIN_BATCH = 50
+
+CONTENT_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+
+def render_png(token):
+    """PNG bytes for a QR code encoding ``token``."""
+    buffer = BytesIO()
+    qrcode.make(str(token)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def render_svg(token):
+    """SVG bytes for a QR code encoding ``token``."""
+    buffer = BytesIO()
+    qrcode.make(str(token), image_factory=qrcode.image.svg.SvgPathImage).save(buffer)
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=1024)
+def render(token, fmt):
+    """Cached ``fmt`` ("png" or "svg") rendering of ``token`` (a string)."""
+    if fmt == "svg":
+        return render_svg(token)
+    return render_png(token)
+
+
+def schedule(instance):
+    """
+    Render ``instance``'s QR image file after the current transaction
+    commits. Does nothing unless ``QR_RENDER["STORE_FILES"]`` is on.
+    """
+    if not settings.QR_RENDER["STORE_FILES"]:
+        return
+    job = (type(instance), instance.pk)
+    if settings.QR_RENDER["ASYNC"]:
+        transaction.on_commit(lambda: _enqueue(job))
+    else:
+        transaction.on_commit(lambda: render_pending([job]))
+
+
+def render_pending(jobs):
+    """
+    Render the images for ``jobs`` ((model, pk) pairs) whose ``qr_code`` is
+    still empty. Returns the number of images written.
+    """
+    by_model = {}
+    for model, pk in jobs:
+        by_model.setdefault(model, set()).add(pk)
+
+    written = 0
+    for model, pks in by_model.items():
+        objs = list(model.objects.filter(pk__in=pks, qr_code=""))
+        if not objs:
+            continue
+        list(_get_pool().map(lambda obj: obj._generate_qr(), objs))
+        model.objects.bulk_update(objs, ["qr_code"])
+        written += len(objs)
+    return written
+
+
+def render_batch(model, objs):
+    """
+    Render and save the images for freshly inserted ``objs`` of ``model``,
+    encoding the PNGs on ``QR_RENDER["PROCESSES"]`` worker processes, then
+    write the file names back with one bulk_update. Returns the number of
+    images written; does nothing unless ``QR_RENDER["STORE_FILES"]`` is on.
+    """
+    if not settings.QR_RENDER["STORE_FILES"]:
+        return 0
+    objs = [obj for obj in objs if not obj.qr_code]
+    if not objs:
+        return 0
+    tokens = [str(obj.qr_token) for obj in objs]
+    processes = settings.QR_RENDER["PROCESSES"]
+    if processes > 1 and len(tokens) >= PROCESS_POOL_MIN_BATCH:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            images = list(pool.map(render_png, tokens, chunksize=25))
+    else:
+        images = [render_png(token) for token in tokens]
+    for obj, png in zip(objs, images):
+        obj._generate_qr(png)
+    model.objects.bulk_update(objs, ["qr_code"], batch_size=500)
+    return len(objs)
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(
+            max_workers=settings.QR_RENDER["WORKERS"], thread_name_prefix="qr-render"
+        )
+    return _pool
+
+
+def _enqueue(job):
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run, name="qr-render-queue", daemon=True)
+            _worker.start()
+    _queue.put(job)
+
+
+def _run():
+    batch_size = settings.QR_RENDER["BATCH_SIZE"]
+    while True:
+        jobs = [_queue.get()]
+        while len(jobs) < batch_size:
+            try:
+                jobs.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            render_pending(jobs)
+        except Exception:
+            logger.exception("QR rendering failed for %d jobs", len(jobs))
+        finally:
+            close_old_connections()
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 import bleach
 
+from users.fieldsets import SparseFieldsSerializerMixin
+
 from .models import Asset
 
 def sanitize_text(value):
@@ -9,9 +11,10 @@ def sanitize_text(value):
         return bleach.clean(value, tags=[], attributes={}, strip=True)
     return value
 
-class AssetSerializer(serializers.ModelSerializer):
+class AssetSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     owner_name = serializers.CharField(source="owner.get_full_name", read_only=True)
     owner_photo = serializers.ImageField(source="owner.photo", read_only=True)
+    qr_image_url = serializers.SerializerMethodField()
 
     class Meta:
         model = Asset
@@ -22,11 +25,18 @@ class AssetSerializer(serializers.ModelSerializer):
             "model_name",
             "qr_code",
             "qr_token",
+            "qr_image_url",
+            "owner",
             "owner_name",
             "owner_photo",
             "registered_at",
         ]
-        read_only_fields = ["qr_code", "qr_token", "registered_at"]
+        read_only_fields = ["qr_code", "qr_token", "owner", "registered_at"]
+        related_fields = {"owner_name": ["owner"], "owner_photo": ["owner"]}
+        expandable_fields = {"owner": "users.serializers.UserSummarySerializer"}
+
+    def get_qr_image_url(self, obj):
+        return f"/api/qr/{obj.qr_token}.png"
 
     def validate_asset_type(self, value):
         value = sanitize_text(value)
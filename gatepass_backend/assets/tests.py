@@ -1,3 +1,179 @@
-from django.test import TestCase
+import io
+import tempfile
+import uuid
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from users.models import User
+from visitors.models import Visitor
+
+from . import qr
+from .models import Asset
+
+
+class QRImageTests(TestCase):
+    def setUp(self):
+        cache.clear()  # Throttle history
+        owner = User.objects.create_user("stu", password="pw123456", role="student")
+        self.asset = Asset.objects.create(
+            owner=owner, asset_type="Laptop", serial_number="SN1", model_name="X1"
+        )
+        self.url = f"/api/qr/{self.asset.qr_token}.svg"
+
+    def test_renders_known_token(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/svg+xml")
+        self.assertEqual(response["ETag"], f'"{self.asset.qr_token}.svg"')
+
+    def test_unknown_token_is_not_rendered(self):
+        response = self.client.get(f"/api/qr/{uuid.uuid4()}.png")
+        self.assertEqual(response.status_code, 404)
+
+    def test_etag_must_match_exactly(self):
+        etag = f'"{self.asset.qr_token}.svg"'
+        matched = self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"other", {etag}')
+        self.assertEqual(matched.status_code, 304)
+        # Contains the ETag as a substring but is a different tag
+        partial = self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"x{etag[1:]}')
+        self.assertEqual(partial.status_code, 200)
+
+
+class QRRenderCacheTests(TestCase):
+    def setUp(self):
+        qr.render.cache_clear()
+        self.addCleanup(qr.render.cache_clear)
+
+    def test_repeat_renders_come_from_cache(self):
+        token = str(uuid.uuid4())
+        with mock.patch.object(qr, "render_svg", wraps=qr.render_svg) as render_svg:
+            first = qr.render(token, "svg")
+            self.assertEqual(qr.render(token, "svg"), first)
+        render_svg.assert_called_once_with(token)
+        self.assertTrue(qr.render(token, "png").startswith(b"\x89PNG"))
+
+    def test_least_recently_used_is_evicted(self):
+        tokens = [str(uuid.uuid4()) for _ in range(qr.render.cache_info().maxsize + 1)]
+        with mock.patch.object(qr, "render_png", return_value=b"png") as render_png:
+            for token in tokens:
+                qr.render(token, "png")
+            qr.render(tokens[-1], "png")
+            self.assertEqual(render_png.call_count, len(tokens))
+            qr.render(tokens[0], "png")
+            self.assertEqual(render_png.call_count, len(tokens) + 1)
+
+    def test_changed_token_stops_serving_old_image(self):
+        owner = User.objects.create_user("stu", password="pw123456", role="student")
+        asset = Asset.objects.create(
+            owner=owner, asset_type="Laptop", serial_number="SN1", model_name="X1"
+        )
+        old_url = f"/api/qr/{asset.qr_token}.svg"
+        self.assertEqual(self.client.get(old_url).status_code, 200)
+        new_token = uuid.uuid4()
+        Asset.objects.filter(pk=asset.pk).update(qr_token=new_token)
+        self.assertEqual(self.client.get(old_url).status_code, 404)
+        response = self.client.get(f"/api/qr/{new_token}.svg")
+        self.assertEqual(response["ETag"], f'"{new_token}.svg"')
+
+
+class QRFileTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.owner = User.objects.create_user("stu", password="pw123456", role="student")
+
+    def store_files(self, **options):
+        return override_settings(
+            QR_RENDER={**settings.QR_RENDER, "STORE_FILES": True, "PROCESSES": 1, **options}
+        )
+
+    def asset(self, serial="SN1"):
+        return Asset.objects.create(
+            owner=self.owner, asset_type="Laptop", serial_number=serial, model_name="X1"
+        )
+
+    def test_no_files_by_default(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            asset = self.asset()
+        asset.refresh_from_db()
+        self.assertFalse(asset.qr_code)
+
+    def test_file_is_rendered_after_commit(self):
+        with self.store_files(ASYNC=False):
+            with self.captureOnCommitCallbacks() as callbacks:
+                asset = self.asset()
+            asset.refresh_from_db()
+            self.assertFalse(asset.qr_code)
+            for callback in callbacks:
+                callback()
+        asset.refresh_from_db()
+        self.assertEqual(asset.qr_code.name, f"qr_codes/asset_{asset.qr_token}.png")
+
+    def test_async_rendering_is_queued_not_done_inline(self):
+        with (
+            self.store_files(ASYNC=True),
+            mock.patch.object(qr, "_enqueue") as enqueue,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            asset = self.asset()
+        enqueue.assert_called_once_with((Asset, asset.pk))
+        asset.refresh_from_db()
+        self.assertFalse(asset.qr_code)
+
+    def test_command_renders_missing_files(self):
+        assets = [self.asset(f"SN{n}") for n in range(3)]
+        with self.store_files():
+            call_command("generate_qr_codes", "--batch-size=2", stdout=io.StringIO())
+        self.assertFalse(Asset.objects.filter(qr_code="").exists())
+        self.assertEqual(qr.render_pending([(Asset, assets[0].pk)]), 0)
+
+    def test_batch_render_writes_every_file(self):
+        assets = [self.asset(f"SN{n}") for n in range(3)]
+        with self.store_files():
+            self.assertEqual(qr.render_batch(Asset, assets), 3)
+        self.assertFalse(Asset.objects.filter(qr_code="").exists())
+
+
+class VerificationTests(TestCase):
+    def setUp(self):
+        guard = User.objects.create_user("grd", password="pw123456", role="guard")
+        self.client = APIClient()
+        self.client.force_authenticate(guard)
+        self.visitor = Visitor.objects.create(
+            name="Jane Doe", national_id="12345678", host_name="Dr. Smith"
+        )
+
+    def scan(self, token, kind="visitors"):
+        return self.client.get(f"/api/{kind}/verify/", {"token": str(token)})
+
+    def test_scan_reflects_changes_that_fire_no_signal(self):
+        self.assertEqual(self.scan(self.visitor.qr_token).data["visitor"]["status"], "APPROVED")
+        # As the overdue sweeper and bulk updates do
+        Visitor.objects.filter(pk=self.visitor.pk).update(status="DENIED")
+        self.assertEqual(self.scan(self.visitor.qr_token).data["visitor"]["status"], "DENIED")
+
+    def test_asset_scan_is_one_indexed_query(self):
+        owner = User.objects.create_user("stu", password="pw123456", role="student")
+        asset = Asset.objects.create(
+            owner=owner, asset_type="Laptop", serial_number="SN1", model_name="X1"
+        )
+        with self.assertNumQueries(1):
+            response = self.scan(asset.qr_token, "assets")
+        self.assertEqual(response.data["asset"]["id"], asset.pk)
+
+    def test_unknown_and_malformed_tokens_are_invalid(self):
+        self.assertEqual(self.scan(uuid.uuid4()).status_code, 404)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.scan("not-a-token").status_code, 404)
+
+    def test_deleted_record_stops_verifying(self):
+        token = self.visitor.qr_token
+        self.scan(token)
+        self.visitor.delete()
+        self.assertEqual(self.scan(token).status_code, 404)
@@ -0,0 +1,23 @@
+"""
+Token lookups for QR-scan verification.
+
+A scan is one lookup on the unique ``qr_token`` index (with whatever the view
+joins), so the status a guard sees is always the row's current state, however
+and by whichever worker it was last changed. Malformed tokens are rejected
+before any query.
+"""
+
+import uuid
+
+
+def parse_token(raw):
+    """Canonical token string, or None if ``raw`` is not a UUID."""
+    try:
+        return str(uuid.UUID(str(raw)))
+    except ValueError:
+        return None
+
+
+def fetch(queryset, token):
+    """The row of ``queryset`` whose ``qr_token`` is ``token``, or None."""
+    return queryset.filter(qr_token=token).first()
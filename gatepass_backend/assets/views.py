@@ -1,14 +1,26 @@
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
 from rest_framework import status, viewsets
-from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import (
+    action,
+    api_view,
+    authentication_classes,
+    permission_classes,
+    throttle_classes,
+)
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.throttling import AnonRateThrottle
+from users.fieldsets import SparseFieldsViewMixin
 from users.permissions import IsAdmin, IsGuard
+from visitors.models import Visitor
 
+from . import qr, verification
 from .models import Asset
 from .serializers import AssetSerializer
 
 
-class AssetViewSet(viewsets.ModelViewSet):
+class AssetViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
     serializer_class = AssetSerializer
 
     def get_permissions(self):
@@ -18,9 +30,10 @@ class AssetViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        queryset = self.with_related(Asset.objects.all())
         if user.role == "student":
-            return Asset.objects.filter(owner=user)
-        return Asset.objects.select_related("owner").all()
+            return queryset.filter(owner=user)
+        return queryset
 
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
@@ -30,8 +43,44 @@ class AssetViewSet(viewsets.ModelViewSet):
         token = request.query_params.get("token")
         if not token:
             return Response({"error": "token query param is required"}, status=400)
-        try:
-            asset = Asset.objects.select_related("owner").get(qr_token=token)
-            return Response({"status": "VALID", "asset": AssetSerializer(asset).data})
-        except Asset.DoesNotExist:
+        token = verification.parse_token(token)
+        asset = token and verification.fetch(Asset.objects.select_related("owner"), token)
+        if not asset:
             return Response({"status": "INVALID"}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"status": "VALID", "asset": AssetSerializer(asset).data})
+
+
+class QRImageRateThrottle(AnonRateThrottle):
+    scope = "qr_image"
+
+
+def _token_exists(token):
+    return (
+        Asset.objects.filter(qr_token=token).exists()
+        or Visitor.objects.filter(qr_token=token).exists()
+    )
+
+
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([AllowAny])
+@throttle_classes([QRImageRateThrottle])
+def qr_image(request, token, fmt):
+    """
+    GET /api/qr/<token>.<png|svg> — QR image for an asset or visitor token.
+
+    Public so it works as an <img src>, but throttled per client and only
+    rendered for tokens that belong to an asset or visitor. Output never
+    changes for a token, so it is cached in-process and marked immutable for
+    browsers and proxies.
+    """
+    if fmt not in qr.CONTENT_TYPES or not _token_exists(token):
+        raise Http404
+    etag = f'"{token}.{fmt}"'
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(qr.render(str(token), fmt), content_type=qr.CONTENT_TYPES[fmt])
+    response["ETag"] = etag
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
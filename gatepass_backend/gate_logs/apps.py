@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class GateLogsConfig(AppConfig):
     name = 'gate_logs'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,254 @@
+"""
+Optional write-behind buffer for GateLog rows.
+
+With ``GATE_LOG_BUFFER["ENABLED"]`` on, ``log_event`` appends the event to a
+per-process spool file and an in-memory queue and returns at once; a
+background thread flushes the queue with one bulk_create (via
+``bulk.insert_logs``) whenever it reaches ``MAX_EVENTS`` or every
+``FLUSH_INTERVAL`` seconds. The spool is rewritten after each flush, so after
+a crash the events that never reached the database are still on disk. Each
+worker holds an flock on its own spool file; a worker that can lock someone
+else's file knows the owner is dead and replays it.
+
+Every event carries a generated client_id, recorded in GateLogClientEvent
+with the log, so replaying a spool that was partly flushed does not insert
+anything twice. If the database rejects a batch (an integrity or data error,
+not an outage), its events are retried one at a time and any it still
+rejects are moved to ``REJECTED_FILE`` in the spool directory, so one bad
+event cannot hold up the rest of the spool.
+
+With buffering off (the default) ``log_event`` is a plain synchronous insert.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DataError, IntegrityError, close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import bulk
+from .models import GateLog, GateLogClientEvent
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process spool recovery
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Not matched by recover_spools' "gate_logs-*.jsonl"
+REJECTED_FILE = "gate_logs.rejected.jsonl"
+
+# Errors that mean an event itself is bad; anything else (e.g. the database
+# being unreachable) keeps the whole batch for the next flush
+REJECTED_ERRORS = (IntegrityError, DataError, TypeError, ValueError)
+
+FIELDS = [
+    "log_type",
+    "guard_id",
+    "student_id",
+    "vehicle_id",
+    "asset_id",
+    "notes",
+    "plate_number_raw",
+    "is_visitor",
+    "driver_name",
+    "declared_items",
+]
+
+
+def _config():
+    return settings.GATE_LOG_BUFFER
+
+
+def is_enabled():
+    return _config()["ENABLED"]
+
+
+def log_event(**fields):
+    """
+    Record a gate log. Buffered when enabled (returns None), otherwise
+    created immediately (returns the GateLog).
+    """
+    if not is_enabled():
+        return GateLog.objects.create(**fields)
+    _get_buffer().add(fields)
+    return None
+
+
+def _to_event(fields):
+    event = {name: fields.get(name) for name in FIELDS if name in fields}
+    for relation in ("guard", "student", "vehicle", "asset"):
+        if relation in fields:
+            obj = fields[relation]
+            event[f"{relation}_id"] = obj.pk if obj is not None else None
+    event["timestamp"] = (fields.get("timestamp") or timezone.now()).isoformat()
+    event["client_id"] = fields.get("client_id") or f"buffer-{uuid.uuid4()}"
+    return event
+
+
+def _to_log(event):
+    attrs = dict(event)
+    attrs["timestamp"] = parse_datetime(attrs["timestamp"])
+    return GateLog(**attrs)
+
+
+def _unwritten(events):
+    """Drop events whose (guard, client_id) is already stored, or repeated."""
+    client_ids = defaultdict(list)
+    for event in events:
+        client_ids[event.get("guard_id")].append(event["client_id"])
+    query = Q()
+    for guard_id, ids in client_ids.items():
+        query |= Q(guard_id=guard_id, client_id__in=ids)
+    stored = set(GateLogClientEvent.objects.filter(query).values_list("guard_id", "client_id"))
+    unwritten = []
+    for event in events:
+        key = (event.get("guard_id"), event["client_id"])
+        if key not in stored:
+            stored.add(key)
+            unwritten.append(event)
+    return unwritten
+
+
+def _reject(event, error):
+    path = Path(_config()["SPOOL_DIR"]) / REJECTED_FILE
+    with open(path, "a", encoding="utf-8") as rejected:
+        rejected.write(json.dumps({"event": event, "error": repr(error)}) + "\n")
+    logger.error("Gate log event %s rejected (%r); moved to %s", event["client_id"], error, path)
+
+
+def write_events(events):
+    """
+    Insert spooled events, skipping any whose client_id was already written.
+    Returns the number written; events the database rejects are set aside.
+    """
+    events = _unwritten(events) if events else []
+    if not events:
+        return 0
+    try:
+        bulk.insert_logs([_to_log(event) for event in events])
+        return len(events)
+    except REJECTED_ERRORS:
+        pass
+
+    written = 0
+    for event in events:
+        try:
+            bulk.insert_logs([_to_log(event)])
+        except REJECTED_ERRORS as error:
+            _reject(event, error)
+        else:
+            written += 1
+    return written
+
+
+def recover_spools(spool_dir, skip=None):
+    """Replay spool files left behind by dead processes. Returns events written."""
+    written = 0
+    for path in sorted(Path(spool_dir).glob("gate_logs-*.jsonl")):
+        if path == skip:
+            continue
+        with open(path, "r+", encoding="utf-8") as spool:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(spool, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue  # Owner is alive
+            elif path.name != f"gate_logs-{os.getpid()}.jsonl":
+                continue
+            events = [json.loads(line) for line in spool if line.strip()]
+            written += write_events(events)
+        path.unlink()
+    return written
+
+
+class _Buffer:
+    def __init__(self, config):
+        self.max_events = config["MAX_EVENTS"]
+        self.interval = config["FLUSH_INTERVAL"]
+        self.spool_dir = Path(config["SPOOL_DIR"])
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.spool_path = self.spool_dir / f"gate_logs-{os.getpid()}.jsonl"
+
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.pending = []
+
+        recover_spools(self.spool_dir)
+        self.spool = open(self.spool_path, "a+", encoding="utf-8")
+        if fcntl is not None:
+            fcntl.flock(self.spool, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        self.thread = threading.Thread(target=self._run, name="gate-log-buffer", daemon=True)
+        self.thread.start()
+        atexit.register(self.flush)
+
+    def add(self, fields):
+        event = _to_event(fields)
+        line = json.dumps(event) + "\n"
+        with self.lock:
+            self.spool.write(line)
+            self.spool.flush()
+            os.fsync(self.spool.fileno())
+            self.pending.append(event)
+            full = len(self.pending) >= self.max_events
+        if full:
+            self.wakeup.set()
+
+    def flush(self):
+        with self.lock:
+            batch = list(self.pending)
+        if not batch:
+            return
+        try:
+            write_events(batch)
+        except Exception:
+            # e.g. the database is down: keep the batch queued and spooled for
+            # the next flush (bad events were already set aside)
+            logger.exception("Gate log buffer flush failed; %d events kept", len(batch))
+            return
+        finally:
+            close_old_connections()
+
+        with self.lock:
+            del self.pending[: len(batch)]
+            self.spool.seek(0)
+            self.spool.truncate()
+            self.spool.writelines(json.dumps(event) + "\n" for event in self.pending)
+            self.spool.flush()
+            os.fsync(self.spool.fileno())
+
+    def _run(self):
+        while True:
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            self.flush()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def _get_buffer():
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None or _buffer.spool_path.name != f"gate_logs-{os.getpid()}.jsonl":
+            # First use in this process (or first use after a fork)
+            _buffer = _Buffer(_config())
+    return _buffer
+
+
+def flush():
+    """Flush this process's buffer now, if it has one."""
+    if _buffer is not None:
+        _buffer.flush()
@@ -0,0 +1,189 @@
+"""
+Batch ingestion for POST /api/gate-logs/bulk/.
+
+Offline gate tablets replay their queue as one request. The whole batch is
+validated together (related ids and vehicle presence are resolved with one
+query per table), inserted with a single bulk_create, and the rollups,
+presence and visit tables are updated once for the batch.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
+
+from assets.models import Asset
+from users import events
+from users.models import User
+from vehicles.models import Vehicle
+
+from . import presence, rollups, visits
+from .models import GateLog, GateLogClientEvent, VehiclePresence
+from .serializers import GateLogBulkItemSerializer
+
+MAX_EVENTS = 5000
+# Tolerated device clock drift before a client_timestamp counts as "future"
+CLOCK_SKEW = timedelta(minutes=5)
+
+_RELATED = (
+    ("vehicle", Vehicle),
+    ("asset", Asset),
+    ("student", User),
+)
+
+
+def _resolve_related(items):
+    """Swap vehicle/asset/student ids for instances; record unknown ids as errors."""
+    for field, model in _RELATED:
+        ids = {item["attrs"][field] for item in items if item["attrs"].get(field)}
+        found = model.objects.in_bulk(ids) if ids else {}
+        for item in items:
+            pk = item["attrs"].get(field)
+            if not pk:
+                item["attrs"][field] = None
+            elif pk in found:
+                item["attrs"][field] = found[pk]
+            else:
+                item["errors"][field] = [f'Invalid pk "{pk}" - object does not exist.']
+
+
+def _check_presence(items):
+    """Replay vehicle events in time order against current presence state."""
+    vehicle_items = [
+        item
+        for item in items
+        if item["attrs"]["log_type"] in presence.VEHICLE_LOG_TYPES
+    ]
+    for item in vehicle_items:
+        attrs = item["attrs"]
+        item["plate_key"] = presence.plate_key(
+            attrs["vehicle"], attrs.get("plate_number_raw", "")
+        )
+    keys = {item["plate_key"] for item in vehicle_items if item["plate_key"]}
+    states = {
+        state.plate_key: state
+        for state in VehiclePresence.objects.filter(plate_key__in=keys)
+    }
+
+    for item in sorted(vehicle_items, key=lambda item: item["attrs"]["timestamp"]):
+        key = item["plate_key"]
+        if not key:
+            continue
+        state = states.setdefault(key, VehiclePresence(plate_key=key))
+        last_event_at = presence.last_event_at(state)
+        if last_event_at and item["attrs"]["timestamp"] < last_event_at:
+            # Older than what is already known; history can't be re-checked
+            continue
+        if item["attrs"]["log_type"] == "VEHICLE_ENTRY":
+            conflict = presence.entry_conflict(state)
+            if conflict:
+                item["errors"]["log_type"] = [conflict]
+                continue
+            state.is_on_campus = True
+            state.entered_at = item["attrs"]["timestamp"]
+        else:
+            state.is_on_campus = False
+            state.exited_at = item["attrs"]["timestamp"]
+
+
+def insert_logs(logs):
+    """
+    bulk_create unsaved GateLog instances, record their client_ids, and bring
+    the derived tables (rollups, vehicle presence, visits) up to date.
+    """
+    if not logs:
+        return logs
+    with transaction.atomic():
+        GateLog.objects.bulk_create(logs, batch_size=500)
+        # Raises IntegrityError if a concurrent upload stored the same event
+        GateLogClientEvent.objects.bulk_create(
+            [
+                GateLogClientEvent(guard_id=log.guard_id, client_id=log.client_id, log=log)
+                for log in logs
+                if log.client_id and log.guard_id
+            ],
+            batch_size=500,
+        )
+        prefetch_related_objects(logs, "vehicle", "student", "asset")
+        rollups.record(logs)
+        presence.record(logs)
+        visits.record(logs)
+    events.publish_gate_logs(logs)
+    return logs
+
+
+def ingest(events, guard):
+    """
+    Validate and insert a batch of events for ``guard``.
+
+    Returns one result dict per input event, in input order, with a status of
+    "created", "duplicate" (client_id already ingested) or "error". A
+    client_id repeated in the batch is an error if its first copy failed.
+    """
+    now = timezone.now()
+    items = []
+    for index, event in enumerate(events):
+        serializer = GateLogBulkItemSerializer(data=event)
+        valid = serializer.is_valid()
+        attrs = dict(serializer.validated_data) if valid else {}
+        errors = {} if valid else dict(serializer.errors)
+        if valid:
+            attrs["timestamp"] = attrs.pop("client_timestamp", None) or now
+            if attrs["timestamp"] > now + CLOCK_SKEW:
+                errors["client_timestamp"] = ["Event time is in the future."]
+        items.append(
+            {
+                "index": index,
+                "client_id": event.get("client_id") if isinstance(event, dict) else None,
+                "attrs": attrs,
+                "errors": errors,
+            }
+        )
+
+    # Idempotency: skip anything this guard has already uploaded, or repeated in-batch
+    valid_items = [item for item in items if not item["errors"]]
+    already = dict(
+        GateLogClientEvent.objects.filter(
+            guard=guard,
+            client_id__in=[item["attrs"]["client_id"] for item in valid_items],
+        ).values_list("client_id", "log_id")
+    )
+    first_seen = {}
+    for item in valid_items:
+        client_id = item["attrs"]["client_id"]
+        if client_id in already:
+            item["duplicate_of"] = already[client_id]
+        elif client_id in first_seen:
+            item["duplicate_of"] = first_seen[client_id]
+        else:
+            first_seen[client_id] = item
+
+    candidates = [item for item in valid_items if "duplicate_of" not in item]
+    _resolve_related(candidates)
+    _check_presence([item for item in candidates if not item["errors"]])
+
+    to_create = [item for item in candidates if not item["errors"]]
+    logs = insert_logs([GateLog(guard=guard, **item["attrs"]) for item in to_create])
+    for item, log in zip(to_create, logs):
+        item["id"] = log.id
+
+    results = []
+    for item in items:
+        result = {"index": item["index"], "client_id": item["client_id"]}
+        if item["errors"]:
+            result.update(status="error", errors=item["errors"])
+        elif "duplicate_of" in item:
+            original = item["duplicate_of"]
+            if not isinstance(original, dict):
+                result.update(status="duplicate", id=original)
+            elif "id" in original:  # Repeated within this batch
+                result.update(status="duplicate", id=original["id"])
+            else:
+                # The first copy failed, so nothing was stored for this event
+                message = f"Repeats event {original['index']}, which was not stored."
+                result.update(status="error", errors={"client_id": [message]})
+        else:
+            result.update(status="created", id=item["id"])
+        results.append(result)
+    return results
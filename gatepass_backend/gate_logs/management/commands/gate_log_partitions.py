@@ -0,0 +1,77 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from gate_logs import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Maintain monthly GateLog partitions (PostgreSQL): create upcoming months "
+        "and detach or archive months older than the retention window. Run daily."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="Make sure partitions exist for this many months after the current one",
+        )
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            help="Detach partitions that ended more than this many months ago",
+        )
+        parser.add_argument(
+            "--archive-dir",
+            help="Write detached partitions to <dir>/<partition>.csv.gz and drop them",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Preview what would be created or detached without changing anything",
+        )
+
+    def handle(self, *args, **options):
+        if not partitions.is_supported():
+            raise CommandError("GateLog partitioning requires PostgreSQL.")
+        if not partitions.is_partitioned():
+            raise CommandError(
+                "The GateLog table is not partitioned; run `manage.py partition_gate_logs` first."
+            )
+
+        archive_dir = options["archive_dir"]
+        if archive_dir:
+            archive_dir = Path(archive_dir)
+            archive_dir.mkdir(parents=True, exist_ok=True)
+
+        missing = partitions.missing_months(options["months_ahead"])
+        expired = []
+        if options["retain_months"] is not None:
+            current = partitions.month_start(timezone.localdate())
+            cutoff = partitions.add_months(current, -options["retain_months"])
+            expired = partitions.partitions_older_than(cutoff)
+
+        if options["dry_run"]:
+            self.stdout.write(
+                f"[DRY RUN] Would create: {len(missing)} | Would detach: {len(expired)}"
+            )
+            for start in missing:
+                self.stdout.write(f"  + {partitions.partition_name(start)}")
+            for name in expired:
+                self.stdout.write(f"  - {name}")
+            return
+
+        for start in missing:
+            self.stdout.write(f"  + {partitions.create_partition(start)}")
+        for name in expired:
+            path = partitions.detach_partition(name, archive_dir)
+            self.stdout.write(f"  - {name}" + (f" → {path}" if path else " (detached)"))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Partitions maintained. Created: {len(missing)} | Detached: {len(expired)}"
+            )
+        )
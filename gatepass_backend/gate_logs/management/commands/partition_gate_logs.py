@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from gate_logs import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Convert the GateLog table into monthly range partitions (PostgreSQL), or back "
+        "with --revert. Locks and rewrites the whole table: run it in a maintenance window."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--revert",
+            action="store_true",
+            help="Convert a partitioned table back into a plain table",
+        )
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="Create partitions for this many months after the current one",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Check that the conversion can run without changing anything",
+        )
+
+    def handle(self, *args, **options):
+        if not partitions.is_supported():
+            raise CommandError("GateLog partitioning requires PostgreSQL.")
+
+        revert = options["revert"]
+        if options["dry_run"]:
+            self._check(revert)
+            return
+
+        try:
+            if revert:
+                rows = partitions.unpartition_table()
+                summary = f"GateLog table is no longer partitioned. Rows: {rows}"
+            else:
+                rows, created = partitions.partition_table(options["months_ahead"])
+                summary = (
+                    f"GateLog table partitioned by month. Rows: {rows} | "
+                    f"Monthly partitions: {created}"
+                )
+        except partitions.ConversionError as exc:
+            raise CommandError(f"{exc} Nothing was changed.")
+        self.stdout.write(self.style.SUCCESS(summary))
+
+    def _check(self, revert):
+        if partitions.is_partitioned() != revert:
+            state = "is not" if revert else "is already"
+            raise CommandError(f"{partitions.TABLE} {state} partitioned.")
+        found = partitions.blockers()
+        if found:
+            raise CommandError(f"{partitions.TABLE} is referenced by: {', '.join(found)}.")
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM "{partitions.TABLE}"')
+            rows = cursor.fetchone()[0]
+        action = "revert" if revert else "partition"
+        self.stdout.write(f"[DRY RUN] Would {action} {partitions.TABLE}. Rows to copy: {rows}")
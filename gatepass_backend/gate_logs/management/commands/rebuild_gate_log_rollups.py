@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from gate_logs import rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the hourly/daily gate log rollups from the raw GateLog table"
+
+    def handle(self, *args, **options):
+        created = rollups.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rollups rebuilt. Buckets written: {created}")
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from gate_logs import visits
+
+
+class Command(BaseCommand):
+    help = "Re-pair entry/exit gate logs into visits for dwell-time analytics"
+
+    def handle(self, *args, **options):
+        total = visits.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Visits rebuilt. Visits written: {total}"))
@@ -0,0 +1,12 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from gate_logs import buffer
+
+
+class Command(BaseCommand):
+    help = "Insert gate log events left in the write-behind spool by dead workers"
+
+    def handle(self, *args, **options):
+        total = buffer.recover_spools(settings.GATE_LOG_BUFFER["SPOOL_DIR"])
+        self.stdout.write(self.style.SUCCESS(f"Spool replayed. Logs written: {total}"))
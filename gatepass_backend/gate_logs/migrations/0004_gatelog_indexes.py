@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-17 09:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0002_initial'),
+        ('gate_logs', '0003_gatelog_declared_items_gatelog_driver_name'),
+        ('vehicles', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gatelog',
+            index=models.Index(fields=['-timestamp', '-id'], name='gatelog_ts_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gatelog',
+            index=models.Index(fields=['guard', '-timestamp', '-id'], name='gatelog_guard_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gatelog',
+            index=models.Index(fields=['log_type', '-timestamp', '-id'], name='gatelog_type_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gatelog',
+            index=models.Index(fields=['guard', 'log_type', '-timestamp'], name='gatelog_guard_type_ts_idx'),
+        ),
+    ]
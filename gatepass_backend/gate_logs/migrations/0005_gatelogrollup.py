@@ -0,0 +1,53 @@
+# Generated by Django 6.0.2 on 2026-10-17 09:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_rollups(apps, schema_editor):
+    from django.db.models import Count
+    from django.db.models.functions import TruncDay, TruncHour
+    from django.utils import timezone
+
+    GateLog = apps.get_model('gate_logs', 'GateLog')
+    GateLogRollup = apps.get_model('gate_logs', 'GateLogRollup')
+    tz = timezone.get_current_timezone()
+    for period, trunc in (('HOUR', TruncHour), ('DAY', TruncDay)):
+        rows = (
+            GateLog.objects.annotate(bucket=trunc('timestamp', tzinfo=tz))
+            .values('bucket', 'log_type', 'guard_id')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        GateLogRollup.objects.bulk_create(
+            (GateLogRollup(period=period, **row) for row in rows.iterator()),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gate_logs', '0004_gatelog_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GateLogRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('HOUR', 'Hourly'), ('DAY', 'Daily')], max_length=4)),
+                ('bucket', models.DateTimeField()),
+                ('log_type', models.CharField(choices=[('VEHICLE_ENTRY', 'Vehicle Entry'), ('VEHICLE_EXIT', 'Vehicle Exit'), ('ASSET_VERIFY', 'Asset Verification'), ('SCHOLAR_IN', 'Day Scholar Sign In'), ('SCHOLAR_OUT', 'Day Scholar Sign Out'), ('VISITOR_ENTRY', 'Visitor Entry')], max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('guard', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['period', 'bucket'], name='gatelogrollup_period_idx')],
+                'constraints': [models.UniqueConstraint(fields=('period', 'bucket', 'log_type', 'guard'), name='gatelogrollup_unique_bucket')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 6.0.2 on 2026-10-17 10:05
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_presence(apps, schema_editor):
+    GateLog = apps.get_model('gate_logs', 'GateLog')
+    VehiclePresence = apps.get_model('gate_logs', 'VehiclePresence')
+    states = {}
+    logs = (
+        GateLog.objects.filter(log_type__in=['VEHICLE_ENTRY', 'VEHICLE_EXIT'])
+        .select_related('vehicle')
+        .order_by('timestamp', 'id')
+    )
+    for log in logs.iterator():
+        plate = log.vehicle.plate_number if log.vehicle else log.plate_number_raw
+        key = re.sub(r'\s+', '', plate or '').upper()
+        if not key:
+            continue
+        state = states.setdefault(key, VehiclePresence(plate_key=key))
+        state.plate_number = plate
+        state.vehicle = log.vehicle
+        state.last_log = log
+        state.is_on_campus = log.log_type == 'VEHICLE_ENTRY'
+        if state.is_on_campus:
+            state.driver_name = log.driver_name
+            state.entered_at = log.timestamp
+        else:
+            state.exited_at = log.timestamp
+    VehiclePresence.objects.bulk_create(states.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gate_logs', '0005_gatelogrollup'),
+        ('vehicles', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VehiclePresence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('plate_key', models.CharField(max_length=20, unique=True)),
+                ('plate_number', models.CharField(max_length=20)),
+                ('is_on_campus', models.BooleanField(default=False)),
+                ('driver_name', models.CharField(blank=True, max_length=150)),
+                ('entered_at', models.DateTimeField(blank=True, null=True)),
+                ('exited_at', models.DateTimeField(blank=True, null=True)),
+                ('last_log', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='gate_logs.gatelog')),
+                ('vehicle', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='vehicles.vehicle')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('is_on_campus', True)), fields=['-entered_at'], name='presence_on_campus_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_presence, migrations.RunPython.noop),
+    ]
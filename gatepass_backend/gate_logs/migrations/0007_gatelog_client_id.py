@@ -0,0 +1,32 @@
+# Generated by Django 6.0.2 on 2026-10-17 10:30
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0002_initial'),
+        ('gate_logs', '0006_vehiclepresence'),
+        ('vehicles', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gatelog',
+            name='client_id',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AlterField(
+            model_name='gatelog',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddConstraint(
+            model_name='gatelog',
+            constraint=models.UniqueConstraint(condition=models.Q(('client_id__isnull', False)), fields=('guard', 'client_id'), name='gatelog_unique_client_id'),
+        ),
+    ]
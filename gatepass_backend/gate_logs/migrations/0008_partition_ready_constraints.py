@@ -0,0 +1,63 @@
+# Generated by Django 6.0.2 on 2026-10-17 11:00
+#
+# Prepares gate_logs_gatelog for optional monthly partitioning
+# (manage.py partition_gate_logs): a partitioned table can only enforce unique
+# constraints that include the partition key, so the (guard, client_id) dedup
+# key moves to its own table, and the presence table stops holding a database
+# FK to gate log ids.
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_client_events(apps, schema_editor):
+    GateLog = apps.get_model('gate_logs', 'GateLog')
+    GateLogClientEvent = apps.get_model('gate_logs', 'GateLogClientEvent')
+    rows = (
+        GateLog.objects.filter(client_id__isnull=False, guard__isnull=False)
+        .values_list('guard_id', 'client_id', 'id')
+        .iterator(chunk_size=2000)
+    )
+    batch = []
+    for guard_id, client_id, log_id in rows:
+        batch.append(GateLogClientEvent(guard_id=guard_id, client_id=client_id, log_id=log_id))
+        if len(batch) == 2000:
+            GateLogClientEvent.objects.bulk_create(batch)
+            batch = []
+    GateLogClientEvent.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0002_initial'),
+        ('gate_logs', '0007_gatelog_client_id'),
+        ('vehicles', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GateLogClientEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('client_id', models.CharField(max_length=64)),
+                ('guard', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('log', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='gate_logs.gatelog')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('guard', 'client_id'), name='gatelogclientevent_unique')],
+            },
+        ),
+        migrations.RunPython(copy_client_events, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='gatelog',
+            name='gatelog_unique_client_id',
+        ),
+        migrations.AlterField(
+            model_name='vehiclepresence',
+            name='last_log',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='gate_logs.gatelog'),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 6.0.2 on 2026-10-17 11:50
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+ENTRY_TYPES = {'VEHICLE_ENTRY': 'VEHICLE', 'SCHOLAR_IN': 'SCHOLAR'}
+EXIT_TYPES = {'VEHICLE_EXIT': 'VEHICLE', 'SCHOLAR_OUT': 'SCHOLAR'}
+
+
+def backfill_visits(apps, schema_editor):
+    GateLog = apps.get_model('gate_logs', 'GateLog')
+    GateVisit = apps.get_model('gate_logs', 'GateVisit')
+    open_visits = {}
+    finished = []
+    logs = (
+        GateLog.objects.filter(log_type__in=[*ENTRY_TYPES, *EXIT_TYPES])
+        .select_related('vehicle', 'student')
+        .order_by('timestamp', 'id')
+    )
+    for log in logs.iterator():
+        kind = ENTRY_TYPES.get(log.log_type) or EXIT_TYPES.get(log.log_type)
+        if kind == 'VEHICLE':
+            label = log.vehicle.plate_number if log.vehicle else log.plate_number_raw
+            key = re.sub(r'\s+', '', label or '').upper()
+        elif log.student_id:
+            label = f'{log.student.first_name} {log.student.last_name}'.strip() or log.student.username
+            key = f'student:{log.student_id}'
+        else:
+            continue
+        if not key:
+            continue
+
+        if log.log_type in ENTRY_TYPES:
+            if (kind, key) in open_visits:
+                # Never exited: ends when the next visit starts, without a duration
+                visit = open_visits.pop((kind, key))
+                visit.exited_at = log.timestamp
+                finished.append(visit)
+            open_visits[(kind, key)] = GateVisit(
+                kind=kind, subject_key=key, label=label, entry_log=log, entered_at=log.timestamp
+            )
+        elif (kind, key) in open_visits:
+            visit = open_visits.pop((kind, key))
+            visit.exit_log = log
+            visit.exited_at = log.timestamp
+            visit.duration_seconds = int((log.timestamp - visit.entered_at).total_seconds())
+            finished.append(visit)
+
+        if len(finished) >= 1000:
+            GateVisit.objects.bulk_create(finished)
+            finished = []
+    GateVisit.objects.bulk_create([*finished, *open_visits.values()], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gate_logs', '0008_partition_ready_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GateVisit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('VEHICLE', 'Vehicle'), ('SCHOLAR', 'Day Scholar')], max_length=10)),
+                ('subject_key', models.CharField(max_length=32)),
+                ('label', models.CharField(max_length=150)),
+                ('entered_at', models.DateTimeField()),
+                ('exited_at', models.DateTimeField(blank=True, null=True)),
+                ('duration_seconds', models.PositiveIntegerField(blank=True, null=True)),
+                ('entry_log', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='gate_logs.gatelog')),
+                ('exit_log', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='gate_logs.gatelog')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'entered_at'], name='gatevisit_kind_entered_idx'), models.Index(condition=models.Q(('exited_at__isnull', True)), fields=['kind', 'subject_key', '-entered_at'], name='gatevisit_open_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_visits, migrations.RunPython.noop),
+    ]
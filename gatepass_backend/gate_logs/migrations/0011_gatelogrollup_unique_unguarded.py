@@ -0,0 +1,39 @@
+# Generated by Django 6.0.2 on 2026-10-17 19:10
+#
+# Guard-less rollup buckets could be duplicated (NULLs are distinct in
+# gatelogrollup_unique_bucket). Merge existing duplicates, then add a partial
+# unique constraint for them.
+
+from django.db import migrations, models
+
+
+def merge_unguarded_duplicates(apps, schema_editor):
+    from django.db.models import Count, Min, Sum
+
+    GateLogRollup = apps.get_model('gate_logs', 'GateLogRollup')
+    duplicates = (
+        GateLogRollup.objects.filter(guard__isnull=True)
+        .values('period', 'bucket', 'log_type')
+        .annotate(rows=Count('id'), keep=Min('id'), total=Sum('count'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for row in duplicates:
+        key = {'period': row['period'], 'bucket': row['bucket'], 'log_type': row['log_type']}
+        GateLogRollup.objects.filter(pk=row['keep']).update(count=row['total'])
+        GateLogRollup.objects.filter(guard__isnull=True, **key).exclude(pk=row['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gate_logs', '0010_gatevisit'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_unguarded_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='gatelogrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('guard__isnull', True)), fields=('period', 'bucket', 'log_type'), name='gatelogrollup_unique_unguarded'),
+        ),
+    ]
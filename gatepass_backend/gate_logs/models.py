@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 # Create your models here.
@@ -13,7 +14,8 @@ class GateLog(models.Model):
     ]
     guard = models.ForeignKey("users.User", on_delete=models.SET_NULL, null=True)
     log_type = models.CharField(max_length=20, choices=LOG_TYPES)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # default rather than auto_now_add so offline batches keep their device time
+    timestamp = models.DateTimeField(default=timezone.now)
     notes = models.TextField(blank=True)
 
     # Flexible foreign keys (onlyone will be set per log)
@@ -36,3 +38,178 @@ class GateLog(models.Model):
     is_visitor = models.BooleanField(default=False)
     driver_name = models.CharField(max_length=150, blank=True)
     declared_items = models.TextField(blank=True)
+    # Device-generated event id; makes replays from offline tablets idempotent
+    client_id = models.CharField(max_length=64, null=True, blank=True)
+
+    class Meta:
+        # No unique constraints: a table partitioned by month on timestamp
+        # (manage.py partition_gate_logs) can only enforce ones that include
+        # timestamp. client_id dedup lives in GateLogClientEvent instead.
+        # Match the filter combinations in GateLogViewSet._apply_filters; the
+        # trailing id column lets the cursor paginator seek on (timestamp, id).
+        indexes = [
+            models.Index(fields=["-timestamp", "-id"], name="gatelog_ts_id_idx"),
+            models.Index(
+                fields=["guard", "-timestamp", "-id"], name="gatelog_guard_ts_idx"
+            ),
+            models.Index(
+                fields=["log_type", "-timestamp", "-id"], name="gatelog_type_ts_idx"
+            ),
+            models.Index(
+                fields=["guard", "log_type", "-timestamp"],
+                name="gatelog_guard_type_ts_idx",
+            ),
+        ]
+
+
+class GateLogClientEvent(models.Model):
+    """
+    One row per (guard, client_id) ever ingested: the dedup key that makes
+    device replays idempotent. Written in the same transaction as the gate
+    log, so a concurrent upload of the same event fails with IntegrityError.
+    """
+
+    guard = models.ForeignKey("users.User", on_delete=models.CASCADE, related_name="+")
+    client_id = models.CharField(max_length=64)
+    # No DB constraint: partitioned gate logs have no unique index on id alone
+    log = models.ForeignKey(
+        GateLog, null=True, on_delete=models.SET_NULL, related_name="+", db_constraint=False
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["guard", "client_id"], name="gatelogclientevent_unique"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.guard_id}:{self.client_id}"
+
+
+class GateLogRollup(models.Model):
+    """
+    Pre-aggregated event counts per (period, bucket, log_type, guard).
+
+    Maintained incrementally as gate logs are written (see gate_logs.rollups)
+    and rebuildable with ``manage.py rebuild_gate_log_rollups``.
+    """
+
+    HOUR = "HOUR"
+    DAY = "DAY"
+    PERIODS = [(HOUR, "Hourly"), (DAY, "Daily")]
+
+    period = models.CharField(max_length=4, choices=PERIODS)
+    bucket = models.DateTimeField()  # Local start of the hour/day
+    log_type = models.CharField(max_length=20, choices=GateLog.LOG_TYPES)
+    guard = models.ForeignKey(
+        "users.User", on_delete=models.SET_NULL, null=True, related_name="+"
+    )
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["period", "bucket", "log_type", "guard"],
+                name="gatelogrollup_unique_bucket",
+            ),
+            # NULLs are distinct in the constraint above, so guard-less
+            # buckets need their own
+            models.UniqueConstraint(
+                fields=["period", "bucket", "log_type"],
+                condition=models.Q(guard__isnull=True),
+                name="gatelogrollup_unique_unguarded",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["period", "bucket"], name="gatelogrollup_period_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.period} {self.bucket:%Y-%m-%d %H:%M} {self.log_type}: {self.count}"
+
+
+class VehiclePresence(models.Model):
+    """
+    Current on/off-campus state per vehicle, keyed by normalized plate.
+
+    Updated in the same transaction as every VEHICLE_ENTRY / VEHICLE_EXIT log
+    (see gate_logs.presence), so the duplicate-entry check and the on-campus
+    list are single indexed reads instead of "latest log" scans.
+    """
+
+    plate_key = models.CharField(max_length=20, unique=True)  # e.g. "KDA123X"
+    plate_number = models.CharField(max_length=20)  # As last logged, for display
+    vehicle = models.ForeignKey(
+        "vehicles.Vehicle",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    is_on_campus = models.BooleanField(default=False)
+    # No DB constraint: partitioned gate logs have no unique index on id alone,
+    # and archived partitions may drop the referenced row.
+    last_log = models.ForeignKey(
+        GateLog,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        db_constraint=False,
+    )
+    driver_name = models.CharField(max_length=150, blank=True)
+    entered_at = models.DateTimeField(null=True, blank=True)
+    exited_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-entered_at"],
+                condition=models.Q(is_on_campus=True),
+                name="presence_on_campus_idx",
+            ),
+        ]
+
+    def __str__(self):
+        state = "on campus" if self.is_on_campus else "off campus"
+        return f"{self.plate_number} ({state})"
+
+
+class GateVisit(models.Model):
+    """
+    An entry paired with its matching exit (VEHICLE_ENTRY → VEHICLE_EXIT,
+    SCHOLAR_IN → SCHOLAR_OUT). Open visits have no exit yet.
+
+    Maintained as logs are written (see gate_logs.visits) so dwell-time
+    analytics are plain aggregates over this table.
+    """
+
+    VEHICLE = "VEHICLE"
+    SCHOLAR = "SCHOLAR"
+    KINDS = [(VEHICLE, "Vehicle"), (SCHOLAR, "Day Scholar")]
+
+    kind = models.CharField(max_length=10, choices=KINDS)
+    subject_key = models.CharField(max_length=32)  # Plate key or "student:<id>"
+    label = models.CharField(max_length=150)  # Plate number or student name
+    entry_log = models.ForeignKey(
+        GateLog, null=True, on_delete=models.SET_NULL, related_name="+", db_constraint=False
+    )
+    exit_log = models.ForeignKey(
+        GateLog, null=True, on_delete=models.SET_NULL, related_name="+", db_constraint=False
+    )
+    entered_at = models.DateTimeField()
+    exited_at = models.DateTimeField(null=True, blank=True)
+    duration_seconds = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["kind", "entered_at"], name="gatevisit_kind_entered_idx"),
+            models.Index(
+                fields=["kind", "subject_key", "-entered_at"],
+                condition=models.Q(exited_at__isnull=True),
+                name="gatevisit_open_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.label} {self.kind} {self.entered_at:%Y-%m-%d %H:%M}"
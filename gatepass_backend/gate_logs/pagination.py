@@ -0,0 +1,96 @@
+from django.db import models
+from django.db.models import F, Func, Value
+from django.db.models.lookups import GreaterThan, LessThan
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+class Row(Func):
+    """A row value, e.g. ``(timestamp, id)``, for row-wise comparison."""
+
+    function = ""
+    output_field = models.Field()
+
+
+class GateLogCursorPagination(CursorPagination):
+    """
+    Keyset pagination on (timestamp, id), newest first.
+
+    The cursor holds the last row's timestamp and id, and the next page is
+    ``WHERE (timestamp, id) < (cursor)``: one range scan of the (timestamp,
+    id) indexes however many rows share a timestamp, as bulk and buffered
+    inserts often do. No COUNT(*) is ever issued.
+    """
+
+    ordering = ("-timestamp", "-id")
+    page_size = 25
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = self.cursor.position if self.cursor else None
+
+        if reverse:
+            queryset = queryset.order_by("timestamp", "id")
+        else:
+            queryset = queryset.order_by("-timestamp", "-id")
+        if position is not None:
+            timestamp, pk = self._parse_position(position)
+            compare = GreaterThan if reverse else LessThan
+            queryset = queryset.filter(
+                compare(Row(F("timestamp"), F("id")), Row(Value(timestamp), Value(pk)))
+            )
+
+        # Positions are unique, so cursors never need an offset
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+        following = (
+            self._get_position_from_instance(results[-1], self.ordering)
+            if len(results) > len(self.page)
+            else None
+        )
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.next_position = True, position
+            self.has_previous, self.previous_position = following is not None, following
+        else:
+            self.has_next, self.next_position = following is not None, following
+            self.has_previous, self.previous_position = position is not None, position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is not None and cursor.offset:
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def _get_position_from_instance(self, instance, ordering):
+        if isinstance(instance, dict):
+            timestamp, pk = instance["timestamp"], instance["id"]
+        else:
+            timestamp, pk = instance.timestamp, instance.pk
+        return f"{timestamp.isoformat()}|{pk}"
+
+    def _parse_position(self, position):
+        timestamp, _, pk = position.rpartition("|")
+        try:
+            parsed = parse_datetime(timestamp)
+            pk = int(pk)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise NotFound(self.invalid_cursor_message)
+        return parsed, pk
@@ -0,0 +1,320 @@
+"""
+Monthly range partitions for the GateLog table (PostgreSQL only).
+
+Partitioning is opt-in: ``manage.py partition_gate_logs`` converts
+gate_logs_gatelog into a table partitioned by RANGE ("timestamp"), with one
+partition per local calendar month plus a DEFAULT partition that catches
+anything outside the prepared range, and ``--revert`` converts it back.
+``manage.py gate_log_partitions`` then keeps future months created and
+detaches/archives old ones. Date-filtered queries (see
+GateLogViewSet._apply_filters) compare against timestamp bounds, so the
+planner prunes them to the months they cover.
+"""
+
+import gzip
+import re
+from datetime import date, datetime, time
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import GateLog
+
+TABLE = GateLog._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+MONTHLY_NAME_RE = re.compile(rf"^{TABLE}_y(?P<year>\d{{4}})m(?P<month>\d{{2}})$")
+
+
+LEGACY = f"{TABLE}_legacy"
+SEQUENCE = f"{TABLE}_id_partitioned_seq"
+
+
+class ConversionError(Exception):
+    pass
+
+
+def is_supported():
+    return connection.vendor == "postgresql"
+
+
+def is_partitioned():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE relname = %s", [TABLE])
+        row = cursor.fetchone()
+    return row is not None and row[0] == "p"
+
+
+def month_start(value):
+    """Aware local midnight on the first of ``value``'s month."""
+    return timezone.make_aware(datetime.combine(value.replace(day=1), time.min))
+
+
+def add_months(start, months):
+    index = start.year * 12 + start.month - 1 + months
+    return month_start(start.date().replace(year=index // 12, month=index % 12 + 1, day=1))
+
+
+def partition_name(start):
+    return f"{TABLE}_y{start:%Y}m{start:%m}"
+
+
+def existing_partitions():
+    """Names of the attached monthly partitions, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            ORDER BY child.relname
+            """,
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    return [name for name in names if MONTHLY_NAME_RE.match(name)]
+
+
+def create_partition(start):
+    """
+    Create and attach the partition for the month starting at ``start``.
+
+    Rows for that month that already landed in the DEFAULT partition are moved
+    into the new partition first, otherwise the ATTACH would be rejected.
+    """
+    end = add_months(start, 1)
+    name = partition_name(start)
+    bounds = f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE "{name}" (LIKE "{TABLE}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        )
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" '
+            f'WHERE "timestamp" >= %s AND "timestamp" < %s RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved',
+            [start, end],
+        )
+        cursor.execute(f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{name}" FOR VALUES {bounds}')
+    return name
+
+
+def missing_months(months_ahead):
+    """Month starts from now through ``months_ahead`` months out that have no partition."""
+    existing = existing_partitions()
+    current = month_start(timezone.localdate())
+    months = (add_months(current, offset) for offset in range(months_ahead + 1))
+    return [start for start in months if partition_name(start) not in existing]
+
+
+def partitions_older_than(cutoff):
+    """Names of attached monthly partitions that end on or before ``cutoff``."""
+    return [
+        name
+        for name in existing_partitions()
+        if add_months(_start_from_name(name), 1) <= cutoff
+    ]
+
+
+def _start_from_name(name):
+    match = MONTHLY_NAME_RE.match(name)
+    return month_start(date(int(match["year"]), int(match["month"]), 1))
+
+
+def detach_partition(name, archive_dir=None):
+    """
+    Detach ``name`` from the parent so queries stop scanning it.
+
+    With ``archive_dir`` the rows are also written to
+    ``<archive_dir>/<name>.csv.gz`` (with a header) and the table is dropped;
+    otherwise it is left behind as a standalone table. Rollups are not
+    touched, so reports keep covering archived months.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"')
+        if archive_dir is None:
+            return None
+
+        path = archive_dir / f"{name}.csv.gz"
+        copy_sql = f'COPY "{name}" TO STDOUT WITH (FORMAT csv, HEADER true)'
+        raw = cursor.cursor
+        with gzip.open(path, "wb") as archive:
+            if hasattr(raw, "copy_expert"):  # psycopg2
+                raw.copy_expert(copy_sql, archive)
+            else:  # psycopg 3
+                with raw.copy(copy_sql) as copy:
+                    for chunk in copy:
+                        archive.write(chunk)
+        cursor.execute(f'DROP TABLE "{name}"')
+    return path
+
+
+def blockers():
+    """
+    Objects that would stop the table from being rebuilt: foreign keys from
+    other tables and views that depend on it. Django's own references to gate
+    logs are declared with db_constraint=False, so normally there are none.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT 'foreign key ' || conname || ' on ' || conrelid::regclass::text
+            FROM pg_constraint
+            WHERE contype = 'f' AND confrelid = %s::regclass
+              AND conrelid NOT IN (SELECT inhrelid FROM pg_inherits)
+            UNION
+            SELECT DISTINCT 'view ' || view.oid::regclass::text
+            FROM pg_depend
+            JOIN pg_rewrite ON pg_rewrite.oid = pg_depend.objid
+            JOIN pg_class view ON view.oid = pg_rewrite.ev_class
+            WHERE pg_depend.refobjid = %s::regclass AND view.oid <> pg_depend.refobjid
+            """,
+            [TABLE, TABLE],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _schema(cursor, table):
+    """Foreign-key/unique constraints and plain indexes of ``table``, as DDL."""
+    cursor.execute(
+        """
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype IN ('f', 'u')
+        ORDER BY conname
+        """,
+        [table],
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        """
+        SELECT indexname, indexdef
+        FROM pg_indexes
+        WHERE tablename = %s
+          AND indexname NOT IN (SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass)
+        ORDER BY indexname
+        """,
+        [table, table],
+    )
+    return constraints, cursor.fetchall()
+
+
+def _restore_schema(cursor, source, constraints, indexes):
+    for name, definition in constraints:
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{name}" {definition}')
+    for name, definition in indexes:
+        cursor.execute(
+            re.sub(rf' ON (ONLY )?(\S+\.)?"?{source}"? ', rf' ON \g<2>"{TABLE}" ', definition, count=1)
+        )
+
+
+def _check_copy(cursor, source_rows, constraints):
+    cursor.execute(f'SELECT COUNT(*), COALESCE(MAX(id), 0) FROM "{TABLE}"')
+    rows, max_id = cursor.fetchone()
+    if rows != source_rows:
+        raise ConversionError(f"Copied {rows} of {source_rows} rows.")
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [TABLE])
+    sequence = cursor.fetchone()[0]
+    if sequence is None:
+        raise ConversionError("id has no sequence.")
+    cursor.execute(f"SELECT last_value, is_called FROM {sequence}")
+    last_value, is_called = cursor.fetchone()
+    if (last_value if is_called else last_value - 1) < max_id:
+        raise ConversionError(f"{sequence} is behind MAX(id) = {max_id}.")
+    after, _ = _schema(cursor, TABLE)
+    if sorted(after) != sorted(constraints):
+        raise ConversionError("Constraints differ from the original table.")
+
+
+def partition_table(months_ahead=3):
+    """
+    Rebuild gate_logs_gatelog as a monthly-partitioned table, in one
+    transaction. The primary key becomes (id, "timestamp"), as PostgreSQL
+    requires; ids keep counting from where they were. Nothing is dropped
+    with CASCADE: if another object depends on the table, PostgreSQL refuses
+    and the transaction rolls back. Returns (rows copied, partitions created).
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE "{TABLE}" IN ACCESS EXCLUSIVE MODE')
+        if is_partitioned():
+            raise ConversionError(f"{TABLE} is already partitioned.")
+        found = blockers()
+        if found:
+            raise ConversionError(f"{TABLE} is referenced by: {', '.join(found)}.")
+
+        constraints, indexes = _schema(cursor, TABLE)
+        cursor.execute(f'SELECT COUNT(*), MIN("timestamp"), COALESCE(MAX(id), 0) FROM "{TABLE}"')
+        rows, oldest, max_id = cursor.fetchone()
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{LEGACY}"')
+
+        cursor.execute(f'CREATE SEQUENCE "{SEQUENCE}"')
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{LEGACY}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            'PARTITION BY RANGE ("timestamp")'
+        )
+        cursor.execute(f'ALTER TABLE "{TABLE}" ALTER COLUMN id SET DEFAULT nextval(\'"{SEQUENCE}"\')')
+        cursor.execute(f'ALTER SEQUENCE "{SEQUENCE}" OWNED BY "{TABLE}".id')
+        cursor.execute(f"SELECT setval('\"{SEQUENCE}\"', %s + 1, false)", [max_id])
+
+        cursor.execute(f'CREATE TABLE "{DEFAULT_PARTITION}" PARTITION OF "{TABLE}" DEFAULT')
+        start = month_start(timezone.localtime(oldest).date() if oldest else timezone.localdate())
+        last = add_months(month_start(timezone.localdate()), months_ahead)
+        created = 0
+        while start <= last:
+            end = add_months(start, 1)
+            cursor.execute(
+                f'CREATE TABLE "{partition_name(start)}" PARTITION OF "{TABLE}" '
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+            start = end
+            created += 1
+
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{LEGACY}"')
+        # The old id sequence is owned by the legacy table and goes with it
+        cursor.execute(f'DROP TABLE "{LEGACY}"')
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_pkey" PRIMARY KEY (id, "timestamp")'
+        )
+        _restore_schema(cursor, LEGACY, constraints, indexes)
+        _check_copy(cursor, rows, constraints)
+    return rows, created
+
+
+def unpartition_table():
+    """
+    Rebuild gate_logs_gatelog as a plain table with an identity id primary
+    key, as Django creates it, in one transaction. Partitions detached by
+    ``detach_partition`` are not part of the table and are left alone.
+    Returns the number of rows copied.
+    """
+    partitioned = f"{TABLE}_partitioned"
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE "{TABLE}" IN ACCESS EXCLUSIVE MODE')
+        if not is_partitioned():
+            raise ConversionError(f"{TABLE} is not partitioned.")
+        found = blockers()
+        if found:
+            raise ConversionError(f"{TABLE} is referenced by: {', '.join(found)}.")
+
+        constraints, indexes = _schema(cursor, TABLE)
+        cursor.execute(f'SELECT COUNT(*) FROM "{TABLE}"')
+        rows = cursor.fetchone()[0]
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{partitioned}"')
+
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{partitioned}" INCLUDING CONSTRAINTS)'
+        )
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{partitioned}"')
+        # Drops the partitions and the partitioned id sequence with it
+        cursor.execute(f'DROP TABLE "{partitioned}"')
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_pkey" PRIMARY KEY (id)')
+        cursor.execute(f'ALTER TABLE "{TABLE}" ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY')
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 0) + 1, false) "
+            f'FROM "{TABLE}"',
+            [TABLE],
+        )
+        _restore_schema(cursor, partitioned, constraints, indexes)
+        _check_copy(cursor, rows, constraints)
+    return rows
@@ -0,0 +1,84 @@
+"""
+Maintenance of VehiclePresence, the per-plate on/off-campus state table.
+"""
+
+import re
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import VehiclePresence
+
+VEHICLE_LOG_TYPES = ("VEHICLE_ENTRY", "VEHICLE_EXIT")
+
+
+def plate_key(vehicle=None, plate_number_raw=""):
+    """Normalize a registered vehicle's plate, or a raw plate, to e.g. "KDA123X"."""
+    plate = vehicle.plate_number if vehicle else plate_number_raw
+    return re.sub(r"\s+", "", plate or "").upper()
+
+
+def current(key):
+    """Return the VehiclePresence row for a plate key, or None if never logged."""
+    if not key:
+        return None
+    return VehiclePresence.objects.filter(plate_key=key).first()
+
+
+def entry_conflict(state):
+    """Return the duplicate-entry error for a presence row, or None if entry is allowed."""
+    if not (state and state.is_on_campus):
+        return None
+    return (
+        "This vehicle is already logged IN (last entry at "
+        f"{timezone.localtime(state.entered_at):%Y-%m-%d %H:%M:%S}). "
+        "Log an exit first before adding another entry."
+    )
+
+
+def last_event_at(state):
+    return max(filter(None, (state.entered_at, state.exited_at)), default=None)
+
+
+def record(logs):
+    """
+    Apply saved VEHICLE_ENTRY / VEHICLE_EXIT logs to the table.
+
+    Logs are folded per plate in timestamp order, then written once per plate.
+    A plate whose stored state is newer than the incoming logs (e.g. an
+    offline backlog replayed after a live exit) is left untouched.
+    """
+    pending = {}
+    for log in sorted(logs, key=lambda log: log.timestamp):
+        if log.log_type not in VEHICLE_LOG_TYPES:
+            continue
+        key = plate_key(log.vehicle, log.plate_number_raw)
+        if not key:
+            continue
+
+        fields = pending.setdefault(key, {})
+        entering = log.log_type == "VEHICLE_ENTRY"
+        fields.update(
+            plate_number=log.vehicle.plate_number if log.vehicle else log.plate_number_raw,
+            vehicle=log.vehicle,
+            is_on_campus=entering,
+            last_log=log,
+        )
+        if entering:
+            fields.update(driver_name=log.driver_name, entered_at=log.timestamp)
+        else:
+            fields["exited_at"] = log.timestamp
+
+    for key, fields in pending.items():
+        with transaction.atomic():
+            state, created = VehiclePresence.objects.select_for_update().get_or_create(
+                plate_key=key, defaults=fields
+            )
+            if created:
+                continue
+            latest = last_event_at(state)
+            if latest and latest > fields["last_log"].timestamp:
+                continue
+            for attr, value in fields.items():
+                setattr(state, attr, value)
+            state.save()
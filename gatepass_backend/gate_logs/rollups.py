@@ -0,0 +1,82 @@
+"""
+Incremental maintenance of GateLogRollup.
+
+Every write path that creates GateLog rows must go through ``record`` (the
+post_save signal covers ``GateLog.objects.create``; bulk inserts call it
+explicitly) so the reports endpoint can answer from buckets instead of
+scanning raw events.
+"""
+
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from .models import GateLog, GateLogRollup
+
+
+def _buckets(timestamp):
+    local = timezone.localtime(timestamp)
+    hour = local.replace(minute=0, second=0, microsecond=0)
+    return (
+        (GateLogRollup.HOUR, hour),
+        (GateLogRollup.DAY, hour.replace(hour=0)),
+    )
+
+
+def record(logs):
+    """Add the given (already saved) gate logs to their hourly and daily buckets."""
+    increments = Counter()
+    for log in logs:
+        for period, bucket in _buckets(log.timestamp):
+            increments[(period, bucket, log.log_type, log.guard_id)] += 1
+
+    for (period, bucket, log_type, guard_id), amount in increments.items():
+        key = {
+            "period": period,
+            "bucket": bucket,
+            "log_type": log_type,
+            "guard_id": guard_id,
+        }
+        rows = GateLogRollup.objects.filter(**key)
+        if rows.update(count=F("count") + amount):
+            continue
+        try:
+            with transaction.atomic():
+                GateLogRollup.objects.create(count=amount, **key)
+        except IntegrityError:
+            # Another writer created the bucket between our update and insert.
+            rows.update(count=F("count") + amount)
+
+
+def rebuild():
+    """Recompute every rollup bucket from the raw GateLog table."""
+    tz = timezone.get_current_timezone()
+    rollups = []
+    for period, trunc in (
+        (GateLogRollup.HOUR, TruncHour),
+        (GateLogRollup.DAY, TruncDay),
+    ):
+        rows = (
+            GateLog.objects.annotate(bucket=trunc("timestamp", tzinfo=tz))
+            .values("bucket", "log_type", "guard_id")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        rollups.extend(
+            GateLogRollup(
+                period=period,
+                bucket=row["bucket"],
+                log_type=row["log_type"],
+                guard_id=row["guard_id"],
+                count=row["count"],
+            )
+            for row in rows.iterator()
+        )
+
+    with transaction.atomic():
+        GateLogRollup.objects.all().delete()
+        GateLogRollup.objects.bulk_create(rollups, batch_size=1000)
+    return len(rollups)
@@ -1,9 +1,12 @@
 from rest_framework import serializers
 
-from .models import GateLog
+from users.fieldsets import SparseFieldsSerializerMixin
 
+from . import presence
+from .models import GateLog, VehiclePresence
 
-class GateLogSerializer(serializers.ModelSerializer):
+
+class GateLogSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     guard_name = serializers.CharField(source="guard.get_full_name", read_only=True)
     student_name = serializers.CharField(source="student.get_full_name", read_only=True)
     plate_number = serializers.CharField(source="vehicle.plate_number", read_only=True)
@@ -32,6 +35,19 @@ class GateLogSerializer(serializers.ModelSerializer):
             "declared_items",
         ]
         read_only_fields = ["timestamp", "guard"]
+        related_fields = {
+            "guard_name": ["guard"],
+            "student_name": ["student"],
+            "plate_number": ["vehicle"],
+            "asset_type": ["asset"],
+            "asset_serial": ["asset"],
+        }
+        expandable_fields = {
+            "guard": "users.serializers.UserSummarySerializer",
+            "student": "users.serializers.UserSummarySerializer",
+            "vehicle": "vehicles.serializers.VehicleSerializer",
+            "asset": "assets.serializers.AssetSerializer",
+        }
 
     def validate(self, attrs):
         log_type = attrs.get("log_type")
@@ -41,30 +57,62 @@ class GateLogSerializer(serializers.ModelSerializer):
         if log_type != "VEHICLE_ENTRY":
             return attrs
 
-        last_log = None
-        if vehicle:
-            last_log = (
-                GateLog.objects.filter(vehicle=vehicle)
-                .order_by("-timestamp")
-                .first()
-            )
-        elif plate_number_raw:
-            last_log = (
-                GateLog.objects.filter(plate_number_raw__iexact=plate_number_raw)
-                .order_by("-timestamp")
-                .first()
-            )
+        if plate_number_raw:
             attrs["plate_number_raw"] = plate_number_raw
 
-        if last_log and last_log.log_type == "VEHICLE_ENTRY":
-            raise serializers.ValidationError(
-                {
-                    "log_type": (
-                        "This vehicle is already logged IN (last entry at "
-                        f"{last_log.timestamp:%Y-%m-%d %H:%M:%S}). "
-                        "Log an exit first before adding another entry."
-                    )
-                }
-            )
+        conflict = presence.entry_conflict(
+            presence.current(presence.plate_key(vehicle, plate_number_raw))
+        )
+        if conflict:
+            raise serializers.ValidationError({"log_type": conflict})
 
         return attrs
+
+
+class VehiclePresenceSerializer(serializers.ModelSerializer):
+    owner_name = serializers.CharField(source="vehicle.owner.get_full_name", read_only=True)
+
+    class Meta:
+        model = VehiclePresence
+        fields = [
+            "plate_number",
+            "vehicle",
+            "owner_name",
+            "driver_name",
+            "entered_at",
+            "last_log",
+        ]
+
+
+class GateLogBulkItemSerializer(serializers.ModelSerializer):
+    """
+    One event in a POST /api/gate-logs/bulk/ batch.
+
+    Related objects are plain ids here; gate_logs.bulk resolves them for the
+    whole batch at once instead of one query per item.
+    """
+
+    client_id = serializers.CharField(max_length=64)
+    client_timestamp = serializers.DateTimeField(required=False)
+    vehicle = serializers.IntegerField(required=False, allow_null=True)
+    asset = serializers.IntegerField(required=False, allow_null=True)
+    student = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta:
+        model = GateLog
+        fields = [
+            "client_id",
+            "client_timestamp",
+            "log_type",
+            "notes",
+            "vehicle",
+            "asset",
+            "student",
+            "plate_number_raw",
+            "is_visitor",
+            "driver_name",
+            "declared_items",
+        ]
+
+    def validate_plate_number_raw(self, value):
+        return (value or "").strip().upper()
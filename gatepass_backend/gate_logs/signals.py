@@ -0,0 +1,14 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from . import presence, rollups, visits
+from .models import GateLog
+
+
+@receiver(post_save, sender=GateLog)
+def update_derived_state(sender, instance, created, raw=False, **kwargs):
+    """Keep rollups, vehicle presence and visits in step with every new gate log."""
+    if created and not raw:
+        rollups.record([instance])
+        presence.record([instance])
+        visits.record([instance])
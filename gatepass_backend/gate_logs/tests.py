@@ -1,3 +1,420 @@
-from django.test import TestCase
+import csv
+import importlib
+import io
+import json
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import User
+
+from . import buffer, bulk, export, rollups, visits
+from .models import GateLog, GateLogClientEvent, GateLogRollup, GateVisit, VehiclePresence
+
+
+class PaginationTests(TestCase):
+    def setUp(self):
+        guard = User.objects.create_user("guard", password="pw123456", role="guard")
+        now = timezone.now()
+        # Most share a timestamp, as a bulk or buffered insert does
+        logs = [GateLog(guard=guard, log_type="SCHOLAR_IN", timestamp=now) for _ in range(7)]
+        logs += [
+            GateLog(guard=guard, log_type="SCHOLAR_IN", timestamp=now - timedelta(minutes=m))
+            for m in (1, 2)
+        ]
+        GateLog.objects.bulk_create(logs)
+        self.expected = list(GateLog.objects.order_by("-timestamp", "-id").values_list("id", flat=True))
+        self.client = APIClient()
+        self.client.force_authenticate(guard)
+
+    def walk(self, url, link):
+        pages = []
+        while url:
+            data = self.client.get(url).data
+            pages.append([row["id"] for row in data["results"]])
+            url = data[link]
+        return pages
+
+    def test_pages_split_rows_sharing_a_timestamp(self):
+        pages = self.walk("/api/gate-logs/?page_size=3", "next")
+        self.assertEqual([len(page) for page in pages], [3, 3, 3])
+        self.assertEqual(sum(pages, []), self.expected)
+
+    def test_previous_links_walk_back_to_the_start(self):
+        first = self.client.get("/api/gate-logs/?page_size=4")
+        url = self.client.get(first.data["next"]).data["next"]
+        pages = self.walk(url, "previous")
+        self.assertEqual(sum(reversed(pages), []), self.expected)
+
+    def test_page_is_a_keyset_seek(self):
+        url = self.client.get("/api/gate-logs/?page_size=3").data["next"]
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        sql = next(q["sql"] for q in queries if "gate_logs_gatelog" in q["sql"])
+        self.assertIn('("gate_logs_gatelog"."timestamp", "gate_logs_gatelog"."id") <', sql)
+        self.assertNotIn("OFFSET", sql)
+        self.assertNotIn("COUNT(", sql)
+
+    def test_malformed_cursor_is_not_found(self):
+        response = self.client.get("/api/gate-logs/", {"cursor": "cD1ub3BlfDE="})  # p=nope|1
+        self.assertEqual(response.status_code, 404)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user("adm", password="pw123456", role="admin")
+        self.guard = User.objects.create_user(
+            "guard", password="pw123456", role="guard", first_name="Gate", last_name="Keeper"
+        )
+        self.log = GateLog.objects.create(guard=self.guard, log_type="SCHOLAR_IN", notes="a, b")
+        GateLog.objects.create(log_type="VEHICLE_ENTRY", plate_number_raw="KDA 123X")
+        GateLog.objects.create(
+            log_type="SCHOLAR_IN", timestamp=timezone.now() - timedelta(days=3)
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def export(self, **params):
+        response = self.client.get("/api/gate-logs/export/", params)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_has_header_and_one_row_per_log(self):
+        rows = list(csv.DictReader(io.StringIO(self.export())))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(list(rows[0]), export.COLUMNS)
+        row = next(r for r in rows if r["id"] == str(self.log.pk))
+        self.assertEqual((row["guard_name"], row["notes"]), ("Gate Keeper", "a, b"))
+
+    def test_ndjson_uses_list_filters(self):
+        today = timezone.localdate().isoformat()
+        lines = self.export(output="ndjson", log_type="SCHOLAR_IN", date=today).splitlines()
+        self.assertEqual([json.loads(line)["id"] for line in lines], [self.log.pk])
+
+    def test_guards_export_only_their_own_logs(self):
+        self.client.force_authenticate(self.guard)
+        lines = self.export(output="ndjson").splitlines()
+        self.assertEqual([json.loads(line)["guard"] for line in lines], [self.guard.pk])
+
+    def test_unknown_output_is_rejected(self):
+        response = self.client.get("/api/gate-logs/export/", {"output": "xml"})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_asgi_export_streams_asynchronously(self):
+        token = AccessToken.for_user(self.admin)
+        with mock.patch.object(export, "CHUNK_SIZE", 1):
+            response = await self.async_client.get(
+                "/api/gate-logs/export/",
+                {"output": "ndjson"},
+                headers={"authorization": f"Bearer {token}"},
+            )
+            self.assertTrue(response.is_async)
+            chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 3)
+
+
+class PresenceTests(TestCase):
+    def setUp(self):
+        self.guard = User.objects.create_user("guard", password="pw123456", role="guard")
+        self.client = APIClient()
+        self.client.force_authenticate(self.guard)
+
+    def log(self, log_type, plate="kda 123x"):
+        return self.client.post(
+            "/api/gate-logs/", {"log_type": log_type, "plate_number_raw": plate}, format="json"
+        )
+
+    def test_second_entry_is_rejected_until_exit(self):
+        self.assertEqual(self.log("VEHICLE_ENTRY").status_code, 201)
+        response = self.log("VEHICLE_ENTRY", plate="KDA123X")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("already logged IN", response.data["log_type"][0])
+        self.assertEqual(self.log("VEHICLE_EXIT").status_code, 201)
+        self.assertEqual(self.log("VEHICLE_ENTRY").status_code, 201)
+
+    def test_entry_check_reads_only_presence(self):
+        self.log("VEHICLE_ENTRY")
+        with CaptureQueriesContext(connection) as queries:
+            self.log("VEHICLE_ENTRY")
+        sql = " ".join(q["sql"] for q in queries)
+        self.assertIn("gate_logs_vehiclepresence", sql)
+        self.assertNotIn('FROM "gate_logs_gatelog"', sql)
+
+    def test_bulk_entry_of_vehicle_on_campus_is_an_error(self):
+        self.log("VEHICLE_ENTRY")
+        event = {"client_id": "tab-1", "log_type": "VEHICLE_ENTRY", "plate_number_raw": "KDA123X"}
+        response = self.client.post("/api/gate-logs/bulk/", {"events": [event]}, format="json")
+        self.assertEqual(response.data["results"][0]["status"], "error")
+
+    def test_state_follows_latest_log(self):
+        self.log("VEHICLE_ENTRY")
+        self.log("VEHICLE_EXIT")
+        state = VehiclePresence.objects.get(plate_key="KDA123X")
+        self.assertFalse(state.is_on_campus)
+        self.assertEqual(state.last_log, GateLog.objects.latest("id"))
+
+
+class BackfillMigrationTests(TestCase):
+    def setUp(self):
+        guard = User.objects.create_user("guard", password="pw123456", role="guard")
+        start = timezone.now() - timedelta(days=2)
+        for hours, log_type, plate in (
+            (0, "VEHICLE_ENTRY", "KDA 123X"),
+            (1, "VEHICLE_ENTRY", "KBB 456Y"),
+            (2, "VEHICLE_EXIT", "KDA 123X"),
+            (26, "SCHOLAR_IN", ""),
+        ):
+            GateLog.objects.create(
+                guard=guard,
+                log_type=log_type,
+                plate_number_raw=plate,
+                timestamp=start + timedelta(hours=hours),
+            )
+
+    def migrate(self, name, function):
+        migration = importlib.import_module(f"gate_logs.migrations.{name}")
+        getattr(migration, function)(apps, None)
+
+    def test_rollup_backfill_matches_incremental_counts(self):
+        fields = ("period", "bucket", "log_type", "guard_id", "count")
+        before = set(GateLogRollup.objects.values_list(*fields))
+        GateLogRollup.objects.all().delete()
+        self.migrate("0005_gatelogrollup", "backfill_rollups")
+        self.assertEqual(set(GateLogRollup.objects.values_list(*fields)), before)
+
+    def test_presence_backfill_matches_incremental_state(self):
+        fields = ("plate_key", "is_on_campus", "entered_at", "exited_at", "last_log_id")
+        before = set(VehiclePresence.objects.values_list(*fields))
+        self.assertEqual(len(before), 2)
+        VehiclePresence.objects.all().delete()
+        self.migrate("0006_vehiclepresence", "backfill_presence")
+        self.assertEqual(set(VehiclePresence.objects.values_list(*fields)), before)
+
+
+class BufferTests(TestCase):
+    def setUp(self):
+        self.guard = User.objects.create_user("guard", password="pw123456", role="guard")
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.spool_dir = Path(tmp.name)
+        config = {
+            "ENABLED": True,
+            "MAX_EVENTS": 1000,
+            "FLUSH_INTERVAL": 3600,
+            "SPOOL_DIR": str(self.spool_dir),
+        }
+        for patch in (
+            override_settings(GATE_LOG_BUFFER=config),
+            # Flushed by the tests, not a background thread or at exit
+            mock.patch.object(buffer._Buffer, "_run", lambda self: None),
+            mock.patch.object(buffer.atexit, "register"),
+            mock.patch.object(buffer, "close_old_connections"),  # Keeps the test transaction
+            mock.patch.object(buffer, "_buffer", None),
+        ):
+            self.enterContext(patch)
+
+    def event(self, **fields):
+        return buffer._to_event({"guard": self.guard, "log_type": "SCHOLAR_IN", **fields})
+
+    def spooled(self):
+        return buffer._get_buffer().spool_path.read_text().splitlines()
+
+    def test_event_is_spooled_until_flushed(self):
+        self.assertIsNone(buffer.log_event(guard=self.guard, log_type="SCHOLAR_IN"))
+        self.assertEqual(len(self.spooled()), 1)
+        self.assertFalse(GateLog.objects.exists())
+        buffer.flush()
+        self.assertEqual(GateLog.objects.get().guard, self.guard)
+        self.assertEqual(self.spooled(), [])
+
+    def test_written_events_are_skipped_without_scanning_gate_logs(self):
+        events = [self.event(), self.event()]
+        self.assertEqual(buffer.write_events(events), 2)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(buffer.write_events(events + [self.event()]), 1)
+        self.assertIn("gate_logs_gatelogclientevent", queries[0]["sql"])
+        self.assertEqual(GateLog.objects.count(), 3)
+
+    def test_bad_event_is_set_aside(self):
+        bad = self.event(log_type=None)
+        with self.assertLogs("gate_logs.buffer", "ERROR"):
+            self.assertEqual(buffer.write_events([self.event(), bad, self.event()]), 2)
+        self.assertEqual(GateLog.objects.count(), 2)
+        rejected = (self.spool_dir / buffer.REJECTED_FILE).read_text().splitlines()
+        self.assertEqual(json.loads(rejected[0])["event"]["client_id"], bad["client_id"])
+
+    def test_flush_keeps_batch_when_database_is_unavailable(self):
+        buffer.log_event(guard=self.guard, log_type="SCHOLAR_IN")
+        with (
+            mock.patch.object(bulk, "insert_logs", side_effect=OperationalError),
+            self.assertLogs("gate_logs.buffer", "ERROR"),
+        ):
+            buffer.flush()
+        self.assertEqual(len(self.spooled()), 1)
+        buffer.flush()
+        self.assertEqual(GateLog.objects.count(), 1)
+
+    def test_dead_workers_spool_is_replayed_once(self):
+        stored = self.event()
+        buffer.write_events([stored])
+        spool = self.spool_dir / "gate_logs-999999.jsonl"
+        spool.write_text("".join(json.dumps(e) + "\n" for e in (stored, self.event())))
+        self.assertEqual(buffer.recover_spools(self.spool_dir), 1)
+        self.assertFalse(spool.exists())
+        self.assertEqual(GateLog.objects.count(), 2)
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.guard = User.objects.create_user("guard", password="pw123456", role="guard")
+
+    def counts(self, **filters):
+        return list(
+            GateLogRollup.objects.filter(period=GateLogRollup.HOUR, **filters).values_list(
+                "count", flat=True
+            )
+        )
+
+    def test_logs_are_added_to_one_bucket(self):
+        for _ in range(3):
+            GateLog.objects.create(guard=self.guard, log_type="SCHOLAR_IN")
+        self.assertEqual(self.counts(guard=self.guard), [3])
+        self.assertEqual(
+            GateLogRollup.objects.get(period=GateLogRollup.DAY, guard=self.guard).count, 3
+        )
+
+    def test_guardless_logs_share_a_bucket(self):
+        now = timezone.now()
+        logs = [GateLog.objects.create(log_type="VEHICLE_ENTRY", timestamp=now) for _ in range(2)]
+        rollups.record(logs)
+        self.assertEqual(self.counts(guard__isnull=True), [4])
+
+    def test_guardless_bucket_cannot_be_duplicated(self):
+        GateLog.objects.create(log_type="VEHICLE_ENTRY")
+        bucket = GateLogRollup.objects.get(period=GateLogRollup.HOUR, guard__isnull=True)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            GateLogRollup.objects.create(
+                period=bucket.period, bucket=bucket.bucket, log_type=bucket.log_type, count=1
+            )
+
+    def test_rebuild_matches_incremental_counts(self):
+        GateLog.objects.create(guard=self.guard, log_type="SCHOLAR_IN")
+        GateLog.objects.create(log_type="SCHOLAR_IN")
+        before = set(GateLogRollup.objects.values_list("period", "guard_id", "count"))
+        rollups.rebuild()
+        after = set(GateLogRollup.objects.values_list("period", "guard_id", "count"))
+        self.assertEqual(before, after)
+
+
+class BulkIngestTests(TestCase):
+    def setUp(self):
+        self.guard = User.objects.create_user("guard", password="pw123456", role="guard")
+        self.client = APIClient()
+        self.client.force_authenticate(self.guard)
+
+    def upload(self, *events):
+        response = self.client.post("/api/gate-logs/bulk/", {"events": list(events)}, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_replayed_batch_is_not_inserted_twice(self):
+        # No client_timestamp: the replay is stamped with a different time
+        event = {"client_id": "tab-1", "log_type": "SCHOLAR_IN"}
+        first = self.upload(event)
+        second = self.upload(event)
+        self.assertEqual(first["created"], 1)
+        self.assertEqual(second["duplicate"], 1)
+        self.assertEqual(second["results"][0]["id"], first["results"][0]["id"])
+        self.assertEqual(GateLog.objects.count(), 1)
+        self.assertEqual(GateLogClientEvent.objects.get().log_id, first["results"][0]["id"])
+
+    def test_concurrent_upload_of_same_event_conflicts(self):
+        event = {"client_id": "tab-1", "log_type": "SCHOLAR_IN"}
+        self.upload(event)
+        # As if another request stored it after this one looked for duplicates
+        with mock.patch.object(
+            GateLogClientEvent.objects, "filter", return_value=GateLogClientEvent.objects.none()
+        ):
+            response = self.client.post("/api/gate-logs/bulk/", {"events": [event]}, format="json")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(GateLog.objects.count(), 1)
+
+    def test_same_client_id_from_another_guard_is_kept(self):
+        event = {"client_id": "tab-1", "log_type": "SCHOLAR_IN"}
+        self.upload(event)
+        other = User.objects.create_user("guard2", password="pw123456", role="guard")
+        self.client.force_authenticate(other)
+        self.assertEqual(self.upload(event)["created"], 1)
+
+    def test_repeat_within_batch_points_at_stored_event(self):
+        event = {"client_id": "tab-1", "log_type": "SCHOLAR_IN"}
+        data = self.upload(event, event)
+        created, repeat = data["results"]
+        self.assertEqual(repeat["status"], "duplicate")
+        self.assertEqual(repeat["id"], created["id"])
+
+    def test_repeat_of_failed_event_is_an_error(self):
+        # The first copy fails while resolving related objects
+        data = self.upload(
+            {"client_id": "tab-1", "log_type": "SCHOLAR_IN", "student": 9999},
+            {"client_id": "tab-1", "log_type": "SCHOLAR_IN"},
+        )
+        self.assertEqual([r["status"] for r in data["results"]], ["error", "error"])
+        self.assertIn("client_id", data["results"][1]["errors"])
+        self.assertFalse(GateLog.objects.exists())
+
+
+class VisitTests(TestCase):
+    def setUp(self):
+        self.student = User.objects.create_user(
+            "stu", password="pw123456", role="student", student_id="S1", is_day_scholar=True
+        )
+        self.start = timezone.now() - timedelta(hours=10)
+
+    def log(self, log_type, hours):
+        return GateLog.objects.create(
+            log_type=log_type, student=self.student, timestamp=self.start + timedelta(hours=hours)
+        )
+
+    def test_exit_closes_visit(self):
+        self.log("SCHOLAR_IN", 0)
+        self.log("SCHOLAR_OUT", 2)
+        visit = GateVisit.objects.get()
+        self.assertEqual(visit.duration_seconds, 2 * 3600)
+
+    def test_entry_ends_visit_without_exit(self):
+        self.log("SCHOLAR_IN", 0)
+        self.log("SCHOLAR_IN", 3)
+        self.log("SCHOLAR_OUT", 4)
+        first, second = GateVisit.objects.order_by("entered_at")
+        self.assertEqual(first.exited_at, second.entered_at)
+        self.assertIsNone(first.duration_seconds)
+        self.assertEqual(second.duration_seconds, 3600)
+        self.assertEqual(GateVisit.objects.filter(exited_at__isnull=True).count(), 0)
+
+    def test_batch_keeps_one_open_visit_per_subject(self):
+        logs = [
+            GateLog(log_type="SCHOLAR_IN", student=self.student, timestamp=self.start + timedelta(hours=h))
+            for h in (0, 1, 2)
+        ]
+        GateLog.objects.bulk_create(logs)
+        visits.record(logs)
+        self.assertEqual(GateVisit.objects.filter(exited_at__isnull=True).count(), 1)
+        self.assertEqual(GateVisit.objects.count(), 3)
+
+    def test_rebuild_matches_incremental_pairing(self):
+        for log_type, hours in (("SCHOLAR_IN", 0), ("SCHOLAR_IN", 1), ("SCHOLAR_OUT", 2), ("SCHOLAR_IN", 3)):
+            self.log(log_type, hours)
+        fields = ("entered_at", "exited_at", "duration_seconds")
+        before = list(GateVisit.objects.order_by("entered_at").values_list(*fields))
+        self.assertEqual(visits.rebuild(), 3)
+        self.assertEqual(list(GateVisit.objects.order_by("entered_at").values_list(*fields)), before)
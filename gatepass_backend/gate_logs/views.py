@@ -1,43 +1,85 @@
-from django.db.models import Count
-from rest_framework import viewsets
+from datetime import datetime, time, timedelta
+
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import serializers, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from users.fieldsets import SparseFieldsViewMixin
 from users.permissions import IsAdmin, IsGuard
 
-from .models import GateLog
+from . import buffer, bulk, export, presence, visits
+from .models import GateLog, GateLogRollup, GateVisit
+from .pagination import GateLogCursorPagination
 from .serializers import GateLogSerializer
 
 
-class GateLogViewSet(viewsets.ModelViewSet):
+def _day_start(param, value):
+    """Parse a YYYY-MM-DD query param into an aware midnight datetime."""
+    parsed = parse_date(value)
+    if parsed is None:
+        raise serializers.ValidationError({param: "Enter a date in YYYY-MM-DD format."})
+    return timezone.make_aware(datetime.combine(parsed, time.min))
+
+
+class GateLogViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     Guards create gate log entries; admins can view all and get reports.
-    GET  /api/gate-logs/      → list logs (guards see own, admins see all)
+    GET  /api/gate-logs/      → list logs, cursor-paginated (guards see own, admins see all)
     POST /api/gate-logs/      → create a log entry (guards)
     GET  /api/gate-logs/reports/ → summary counts by log type (admins only)
+    GET  /api/gate-logs/export/?output=csv|ndjson → stream every matching log
+    POST /api/gate-logs/bulk/    → replay a batch of offline events (guards)
+    GET  /api/gate-logs/dwell/   → dwell-time stats from paired entry/exit visits (admins only)
     """
 
     serializer_class = GateLogSerializer
+    pagination_class = GateLogCursorPagination
     http_method_names = ["get", "post", "head", "options"]  # No edits/deletes via API
 
     def get_permissions(self):
-        if self.action == "reports":
+        if self.action in ("reports", "dwell"):
             return [IsAdmin()]
         return [(IsGuard | IsAdmin)()]
 
-    def _apply_filters(self, queryset):
+    def _apply_date_range(self, queryset, timestamp_field="timestamp"):
         date_value = self.request.query_params.get("date")
         start_date = self.request.query_params.get("start_date")
         end_date = self.request.query_params.get("end_date")
-        log_type = self.request.query_params.get("log_type")
-        guard_id = self.request.query_params.get("guard")
 
+        # Compare against datetime bounds rather than timestamp__date so the
+        # (…, timestamp) composite indexes can serve the range.
         if date_value:
-            queryset = queryset.filter(timestamp__date=date_value)
+            day = _day_start("date", date_value)
+            queryset = queryset.filter(
+                **{
+                    f"{timestamp_field}__gte": day,
+                    f"{timestamp_field}__lt": day + timedelta(days=1),
+                }
+            )
         if start_date:
-            queryset = queryset.filter(timestamp__date__gte=start_date)
+            queryset = queryset.filter(
+                **{f"{timestamp_field}__gte": _day_start("start_date", start_date)}
+            )
         if end_date:
-            queryset = queryset.filter(timestamp__date__lte=end_date)
+            queryset = queryset.filter(
+                **{
+                    f"{timestamp_field}__lt": _day_start("end_date", end_date)
+                    + timedelta(days=1)
+                }
+            )
+        return queryset
+
+    def _apply_filters(self, queryset, timestamp_field="timestamp"):
+        log_type = self.request.query_params.get("log_type")
+        guard_id = self.request.query_params.get("guard")
+
+        queryset = self._apply_date_range(queryset, timestamp_field)
         if log_type:
             queryset = queryset.filter(log_type=log_type)
         if guard_id:
@@ -46,30 +88,128 @@ class GateLogViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
-        qs = GateLog.objects.select_related("guard", "vehicle", "asset", "student")
+        qs = self.with_related(GateLog.objects.all())
         if user.role == "guard":
             qs = qs.filter(guard=user)
         qs = self._apply_filters(qs)
-        return qs.order_by("-timestamp")
+        return qs.order_by("-timestamp", "-id")
+
+    def create(self, request, *args, **kwargs):
+        """
+        With the write-behind buffer on, non-vehicle events are queued and
+        answered with 202; vehicle entry/exit stays synchronous because the
+        presence check needs every earlier event already stored.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        log_type = serializer.validated_data["log_type"]
+        if not buffer.is_enabled() or log_type in presence.VEHICLE_LOG_TYPES:
+            self.perform_create(serializer)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+        buffer.log_event(guard=request.user, **serializer.validated_data)
+        return Response(
+            {"status": "queued", "log_type": log_type}, status=status.HTTP_202_ACCEPTED
+        )
 
     def perform_create(self, serializer):
-        serializer.save(guard=self.request.user)
+        # Log row, rollups and vehicle presence commit (or fail) together
+        with transaction.atomic():
+            serializer.save(guard=self.request.user)
 
     @action(detail=False, methods=["get"], url_path="reports")
     def reports(self, request):
-        """GET /api/gate-logs/reports/ — admin-only activity summary."""
+        """
+        GET /api/gate-logs/reports/ — admin-only activity summary.
+        Answered from the daily rollups, so cost tracks days in range, not events.
+        """
         filtered_qs = self._apply_filters(
-            GateLog.objects.select_related("guard", "vehicle", "asset", "student")
+            GateLogRollup.objects.filter(period=GateLogRollup.DAY),
+            timestamp_field="bucket",
         )
-        counts = (
+        counts = list(
             filtered_qs.values("log_type")
-            .annotate(count=Count("id"))
+            .annotate(count=Sum("count"))
             .order_by("log_type")
         )
-        total = filtered_qs.count()
+        total = sum(row["count"] for row in counts)
         return Response(
             {
                 "total_events": total,
-                "breakdown": list(counts),
+                "breakdown": counts,
+            }
+        )
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """
+        GET /api/gate-logs/export/?output=csv|ndjson — stream every log matching
+        the list filters in a single response. (``format`` is reserved by DRF.)
+        """
+        output = request.query_params.get("output", "csv").lower()
+        if output not in ("csv", "ndjson"):
+            return Response({"error": "output must be 'csv' or 'ndjson'"}, status=400)
+
+        queryset = self.get_queryset()
+        if output == "csv":
+            lines, content_type = export.stream_csv(queryset), "text/csv"
+        else:
+            lines, content_type = export.stream_ndjson(queryset), "application/x-ndjson"
+        if isinstance(request._request, ASGIRequest):
+            lines = export.async_chunks(lines)
+        response = StreamingHttpResponse(lines, content_type=content_type)
+        filename = f"gate_logs_{timezone.localdate():%Y%m%d}.{output}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        """
+        POST /api/gate-logs/bulk/ — ingest queued events from an offline device.
+        Body: {"events": [{"client_id": ..., "client_timestamp": ..., <log fields>}, ...]}
+        """
+        events = request.data.get("events") if isinstance(request.data, dict) else None
+        if not isinstance(events, list) or not events:
+            return Response({"error": "events must be a non-empty list"}, status=400)
+        if len(events) > bulk.MAX_EVENTS:
+            return Response(
+                {"error": f"A batch may contain at most {bulk.MAX_EVENTS} events."},
+                status=400,
+            )
+
+        try:
+            results = bulk.ingest(events, request.user)
+        except IntegrityError:
+            # A concurrent upload of the same client_ids won the race
+            return Response(
+                {"error": "Batch conflicted with a concurrent upload; retry."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        summary = {"created": 0, "duplicate": 0, "error": 0}
+        for result in results:
+            summary[result["status"]] += 1
+        return Response({**summary, "results": results})
+
+    @action(detail=False, methods=["get"], url_path="dwell")
+    def dwell(self, request):
+        """
+        GET /api/gate-logs/dwell/?start_date=&end_date=&kind=VEHICLE|SCHOLAR
+        Per-day visit counts, average stay and stay-length distribution, plus
+        the visits in range that never recorded an exit.
+        """
+        queryset = self._apply_date_range(GateVisit.objects.all(), "entered_at")
+        kind = request.query_params.get("kind")
+        if kind:
+            queryset = queryset.filter(kind=kind.upper())
+
+        never_exited = queryset.filter(duration_seconds__isnull=True).order_by("entered_at")
+        return Response(
+            {
+                "days": visits.dwell_summary(queryset),
+                "never_exited": list(
+                    never_exited.values("kind", "label", "entered_at", "entry_log")[
+                        : visits.NEVER_EXITED_LIMIT
+                    ]
+                ),
             }
         )
@@ -0,0 +1,183 @@
+"""
+Pairing of entry/exit gate logs into GateVisit rows, and dwell-time analytics.
+"""
+
+from django.db import transaction
+from django.db.models import Avg, Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import presence
+from .models import GateLog, GateVisit
+
+ENTRY_TYPES = {"VEHICLE_ENTRY": GateVisit.VEHICLE, "SCHOLAR_IN": GateVisit.SCHOLAR}
+EXIT_TYPES = {"VEHICLE_EXIT": GateVisit.VEHICLE, "SCHOLAR_OUT": GateVisit.SCHOLAR}
+
+# Cap on the open-visit list returned alongside the summary
+NEVER_EXITED_LIMIT = 500
+
+# Dwell-time histogram buckets: (label, lower bound, upper bound) in minutes
+DWELL_BUCKETS = [
+    ("under_15m", 0, 15),
+    ("15m_1h", 15, 60),
+    ("1h_2h", 60, 120),
+    ("2h_4h", 120, 240),
+    ("4h_8h", 240, 480),
+    ("over_8h", 480, None),
+]
+
+
+def _subject(log):
+    """Return (subject_key, label) identifying who/what a log is about."""
+    if log.log_type.startswith("VEHICLE"):
+        key = presence.plate_key(log.vehicle, log.plate_number_raw)
+        return key, (log.vehicle.plate_number if log.vehicle else log.plate_number_raw)
+    if log.student_id:
+        return f"student:{log.student_id}", log.student.get_full_name() or log.student.username
+    return "", ""
+
+
+def record(logs):
+    """
+    Open a visit for each entry log and close the subject's open visit for
+    each exit. A subject has at most one open visit: an entry ends a visit
+    that is still open (its exit was never logged) at the new entry's time,
+    without a duration, so it counts as never exited.
+
+    A batch costs one query for its subjects' open visits, one bulk_create
+    and one bulk_update.
+    """
+    events = []
+    for log in sorted(logs, key=lambda log: log.timestamp):
+        kind = ENTRY_TYPES.get(log.log_type) or EXIT_TYPES.get(log.log_type)
+        if not kind:
+            continue
+        key, label = _subject(log)
+        if key:
+            events.append((kind, key, label, log))
+    if not events:
+        return
+
+    with transaction.atomic():
+        open_visits = {}
+        changed = {}
+        stored = (
+            GateVisit.objects.select_for_update()
+            .filter(exited_at__isnull=True, subject_key__in={key for _, key, _, _ in events})
+            .order_by("entered_at")
+        )
+        for visit in stored:
+            # Rows from before this rule may have several open visits
+            earlier = open_visits.get((visit.kind, visit.subject_key))
+            if earlier:
+                _end(earlier, visit.entered_at)
+                changed[earlier.pk] = earlier
+            open_visits[(visit.kind, visit.subject_key)] = visit
+
+        opened = []
+        for kind, key, label, log in events:
+            current = open_visits.get((kind, key))
+            if log.log_type in ENTRY_TYPES:
+                visit = GateVisit(
+                    kind=kind,
+                    subject_key=key,
+                    label=label,
+                    entry_log=log,
+                    entered_at=log.timestamp,
+                )
+                opened.append(visit)
+                if current and current.entered_at > log.timestamp:
+                    # A late upload older than the open visit
+                    _end(visit, current.entered_at)
+                    continue
+                if current:
+                    _end(current, log.timestamp)
+                    if current.pk:
+                        changed[current.pk] = current
+                open_visits[(kind, key)] = visit
+            elif current and current.entered_at <= log.timestamp:
+                _close(current, log)
+                if current.pk:
+                    changed[current.pk] = current
+                del open_visits[(kind, key)]
+
+        GateVisit.objects.bulk_create(opened, batch_size=1000)
+        GateVisit.objects.bulk_update(
+            changed.values(), ["exit_log", "exited_at", "duration_seconds"], batch_size=1000
+        )
+
+
+def _close(visit, log):
+    visit.exit_log = log
+    visit.exited_at = log.timestamp
+    visit.duration_seconds = int((log.timestamp - visit.entered_at).total_seconds())
+
+
+def _end(visit, when):
+    """End a visit whose exit was never logged."""
+    visit.exited_at = when
+
+
+def rebuild():
+    """
+    Re-pair every entry/exit log from scratch; returns the number of visits.
+    Runs in one transaction, so readers keep seeing the old visits until it
+    commits.
+    """
+    logs = (
+        GateLog.objects.filter(log_type__in=[*ENTRY_TYPES, *EXIT_TYPES])
+        .select_related("vehicle", "student")
+        .order_by("timestamp", "id")
+    )
+    with transaction.atomic():
+        GateVisit.objects.all().delete()
+        batch = []
+        for log in logs.iterator(chunk_size=2000):
+            batch.append(log)
+            if len(batch) == 2000:
+                record(batch)
+                batch = []
+        record(batch)
+        return GateVisit.objects.count()
+
+
+def dwell_summary(visits):
+    """
+    Per-day, per-kind dwell statistics for a GateVisit queryset, computed
+    entirely in the database.
+    """
+    bucket_counts = {}
+    for label, low, high in DWELL_BUCKETS:
+        condition = Q(duration_seconds__gte=low * 60)
+        if high is not None:
+            condition &= Q(duration_seconds__lt=high * 60)
+        bucket_counts[label] = Count("id", filter=condition)
+
+    rows = (
+        visits.annotate(day=TruncDate("entered_at", tzinfo=timezone.get_current_timezone()))
+        .values("day", "kind")
+        .annotate(
+            visits=Count("id"),
+            completed=Count("id", filter=Q(duration_seconds__isnull=False)),
+            never_exited=Count("id", filter=Q(duration_seconds__isnull=True)),
+            avg_seconds=Avg("duration_seconds"),
+            **bucket_counts,
+        )
+        .order_by("day", "kind")
+    )
+    summary = []
+    for row in rows:
+        summary.append(
+            {
+                "day": row["day"],
+                "kind": row["kind"],
+                "visits": row["visits"],
+                "completed": row["completed"],
+                "never_exited": row["never_exited"],
+                "avg_stay_minutes": (
+                    round(row["avg_seconds"] / 60, 1) if row["avg_seconds"] is not None else None
+                ),
+                "distribution": {label: row[label] for label, _, _ in DWELL_BUCKETS},
+            }
+        )
+    return summary
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 from decouple import config
@@ -79,13 +80,31 @@ CORS_ALLOWED_ORIGIN_REGEXES = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 25,
+    "DEFAULT_THROTTLE_RATES": {
+        # Public QR images (assets/views.py), per client IP
+        "qr_image": config("QR_IMAGE_RATE", default="300/min"),
+    },
+}
+
+# Tokens carry role/ban/version claims so users can be served from a cache
+SIMPLE_JWT = {
+    "TOKEN_OBTAIN_SERIALIZER": "users.serializers.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "users.serializers.ClaimsTokenRefreshSerializer",
+}
+
+# Per-process cache of authenticated users (users/authentication.py). Only
+# used when CACHE_BACKEND is shared between processes (Redis, Memcached),
+# which is where users' current token versions are kept.
+AUTH_USER_CACHE = {
+    "TTL": config("AUTH_USER_CACHE_TTL", default=30, cast=float),
+    "MAX_USERS": config("AUTH_USER_CACHE_MAX_USERS", default=5000, cast=int),
 }
 
 ROOT_URLCONF = "gatepass_backend.urls"
@@ -122,10 +141,81 @@ DATABASES = {
     }
 }
 
+# Cache used for short-lived summaries; point at Redis/Memcached in production
+# so every worker shares one copy and invalidations reach all of them.
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": config("CACHE_LOCATION", default="gatepass"),
+    }
+}
+
+# Write-behind buffer for gate logs (gate_logs/buffer.py). Off by default;
+# when on, scholar/visitor/asset gate events are spooled to disk and
+# bulk-inserted every FLUSH_INTERVAL seconds or MAX_EVENTS events.
+GATE_LOG_BUFFER = {
+    "ENABLED": config("GATE_LOG_BUFFER_ENABLED", default=False, cast=bool),
+    "MAX_EVENTS": config("GATE_LOG_BUFFER_MAX_EVENTS", default=200, cast=int),
+    "FLUSH_INTERVAL": config("GATE_LOG_BUFFER_FLUSH_INTERVAL", default=1.0, cast=float),
+    "SPOOL_DIR": config("GATE_LOG_BUFFER_SPOOL_DIR", default=str(BASE_DIR / "spool")),
+}
+
+# Live events (users/events.py). Fan-out is in-process, so only one process
+# may serve /api/events/: it holds an flock on LOCK_FILE and any other process
+# refuses streams. TICKET_MAX_AGE is how long a stream ticket stays valid.
+EVENTS = {
+    "LOCK_FILE": config("EVENTS_LOCK_FILE", default=str(BASE_DIR / "spool" / "events.lock")),
+    "TICKET_MAX_AGE": config("EVENTS_TICKET_MAX_AGE", default=30, cast=int),
+}
+
+# QR images are served on demand from /api/qr/<token>.<png|svg>. With
+# STORE_FILES on, asset/visitor PNGs are also written to MEDIA_ROOT after the
+# create request returns (assets/qr.py); ASYNC=False renders them on commit.
+QR_RENDER = {
+    "STORE_FILES": config("QR_STORE_FILES", default=False, cast=bool),
+    "ASYNC": config("QR_RENDER_ASYNC", default=True, cast=bool),
+    "WORKERS": config("QR_RENDER_WORKERS", default=2, cast=int),
+    "BATCH_SIZE": config("QR_RENDER_BATCH_SIZE", default=50, cast=int),
+    # Worker processes for bulk imports (assets.qr.render_batch)
+    "PROCESSES": config("QR_RENDER_PROCESSES", default=os.cpu_count() or 1, cast=int),
+}
+
+# Load phonenumbers metadata at start-up instead of on the first request that
+# validates a phone (users/normalization.py)
+PHONE_NUMBERS_WARM = config("PHONE_NUMBERS_WARM", default=True, cast=bool)
+
+# Student Information System feed (users/sis/adapter.py). Without a URL the
+# built-in mock is used; `manage.py run_mock_sis` serves it over HTTP.
+SIS = {
+    "URL": config("SIS_URL", default=""),
+    "PAGE_SIZE": config("SIS_PAGE_SIZE", default=500, cast=int),
+    "CONCURRENCY": config("SIS_CONCURRENCY", default=4, cast=int),
+    "RETRIES": config("SIS_RETRIES", default=4, cast=int),
+    "BACKOFF": config("SIS_BACKOFF", default=0.5, cast=float),  # seconds, doubled per retry
+    "TIMEOUT": config("SIS_TIMEOUT", default=30, cast=float),
+    "CHECKPOINT": BASE_DIR / "spool" / "sis_sync_checkpoint.json",
+    # Largest share of SIS-managed accounts one run may deactivate; beyond it
+    # the feed is assumed truncated (sync_from_sis --allow-mass-deactivate)
+    "MAX_DEACTIVATE": config("SIS_MAX_DEACTIVATE", default=0.1, cast=float),
+}
+
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 AUTH_USER_MODEL = "users.User"
 
+# Django's default hashers, plus the placeholder used for SIS default
+# passwords until first login (users/hashers.py); keep it last
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+    "users.hashers.DeferredPasswordHasher",
+]
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -5,9 +5,17 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
-from assets.views import AssetViewSet
+from assets.views import AssetViewSet, qr_image
 from gate_logs.views import GateLogViewSet
-from users.views import AdminUserViewSet, DayScholarViewSet, UserProfileView, UserRegistrationView
+from users.views import (
+    AdminUserViewSet,
+    DashboardSummaryView,
+    DayScholarViewSet,
+    EventTicketView,
+    event_stream,
+    UserProfileView,
+    UserRegistrationView,
+)
 from vehicles.views import VehicleViewSet
 from visitors.views import VisitorViewSet
 
@@ -28,6 +36,13 @@ urlpatterns = [
     path("api/users/me/", UserProfileView.as_view(), name="user_profile"),
     # Legacy public registration (kept for backward compat; admin creation preferred)
     path("api/users/register/", UserRegistrationView.as_view(), name="user_register"),
+    # Admin dashboard headline numbers
+    path("api/dashboard/summary/", DashboardSummaryView.as_view(), name="dashboard_summary"),
+    # Live gate log / visitor / alert updates (Server-Sent Events, ASGI only)
+    path("api/events/ticket/", EventTicketView.as_view(), name="event_ticket"),
+    path("api/events/", event_stream, name="event_stream"),
+    # QR images rendered on demand
+    path("api/qr/<uuid:token>.<str:fmt>", qr_image, name="qr_image"),
     # All viewset routes (includes /api/users/ CRUD)
     path("api/", include(router.urls)),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
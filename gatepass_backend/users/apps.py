@@ -1,5 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class UsersConfig(AppConfig):
     name = 'users'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        if settings.PHONE_NUMBERS_WARM:
+            from . import normalization
+
+            normalization.warm()
@@ -0,0 +1,160 @@
+"""
+JWT authentication without a User query per request.
+
+Tokens carry the user's role, ban state and ``token_version`` as claims
+(``add_claims``; stamped at login and on every refresh). Users are kept in a
+small in-process cache for ``AUTH_USER_CACHE["TTL"]`` seconds, and a cached
+user is only served while its version matches both the token's claim and
+the user's current version, which is kept in the shared Django cache. Anything
+that changes a user's role, ban, details or active state bumps the version
+in the database and, once the transaction commits, writes the new version
+to the shared cache (``bump_version`` / ``expire``), so every process stops
+serving the old user on its next request. Tokens issued before the change
+fall back to a database lookup until the client refreshes them.
+
+A missing shared version is only ever seeded with ``cache.add``, so a
+request that loaded the user before a bump committed can't put the old
+version back over the one the bump wrote.
+
+Processes only share versions through a cache they actually share, so with
+the default LocMemCache (or DummyCache) the in-process user cache is off and
+every request loads its user from the database; set CACHE_BACKEND to Redis
+or Memcached to turn it on.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models import F
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+ROLE_CLAIM = "role"
+BANNED_CLAIM = "banned"
+VERSION_CLAIM = "ver"
+
+# str(user id) -> (expires at, user), least recently used first. Keys are
+# strings because simplejwt puts the id in tokens as one.
+_users = OrderedDict()
+_lock = threading.Lock()
+
+
+def add_claims(token, user):
+    token[ROLE_CLAIM] = user.role
+    token[BANNED_CLAIM] = user.is_banned
+    token[VERSION_CLAIM] = user.token_version
+    return token
+
+
+def _matches(user, token):
+    return (
+        user.token_version == token[VERSION_CLAIM]
+        and user.role == token.get(ROLE_CLAIM)
+        and user.is_banned == token.get(BANNED_CLAIM)
+    )
+
+
+def shares_versions():
+    """Whether the default cache is shared between processes."""
+    return not isinstance(caches["default"], (LocMemCache, DummyCache))
+
+
+def _version_key(user_id):
+    return f"auth:version:{user_id}"
+
+
+def _cached(user_id):
+    user_id = str(user_id)
+    with _lock:
+        entry = _users.get(user_id)
+        if entry is None:
+            return None
+        expires, user = entry
+        if expires < time.monotonic():
+            del _users[user_id]
+            return None
+        _users.move_to_end(user_id)
+        return user
+
+
+def _remember(user):
+    config = settings.AUTH_USER_CACHE
+    user_id = str(user.pk)
+    with _lock:
+        _users[user_id] = (time.monotonic() + config["TTL"], user)
+        _users.move_to_end(user_id)
+        while len(_users) > config["MAX_USERS"]:
+            _users.popitem(last=False)
+
+
+def forget(user_id):
+    with _lock:
+        _users.pop(str(user_id), None)
+
+
+def clear():
+    with _lock:
+        _users.clear()
+
+
+def expire(*user_ids):
+    """
+    Stop every process serving ``user_ids`` from its cache: drops them here
+    now, and records their committed versions in the shared cache once the
+    transaction commits. Call it after bumping their ``token_version``.
+    """
+    for user_id in user_ids:
+        forget(user_id)
+    transaction.on_commit(lambda: _record_versions(user_ids))
+
+
+def _record_versions(user_ids):
+    # Read after commit, so these are the versions every later load will see
+    versions = dict(User.objects.filter(pk__in=user_ids).values_list("pk", "token_version"))
+    cache.set_many(
+        {_version_key(pk): version for pk, version in versions.items()},
+        settings.AUTH_USER_CACHE["TTL"],
+    )
+    deleted = [_version_key(user_id) for user_id in user_ids if int(user_id) not in versions]
+    if deleted:
+        cache.delete_many(deleted)
+
+
+def bump_version(user):
+    """Invalidate the claims of every token issued to ``user`` so far."""
+    User.objects.filter(pk=user.pk).update(token_version=F("token_version") + 1)
+    expire(user.pk)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if VERSION_CLAIM not in validated_token or not shares_versions():
+            # Issued before tokens carried claims, or no shared version cache
+            return super().get_user(validated_token)
+
+        user_id = str(validated_token.get(api_settings.USER_ID_CLAIM))
+        user = _cached(user_id)
+        version = cache.get(_version_key(user_id))
+        if user is None or not _matches(user, validated_token) or version != user.token_version:
+            # Also rejects deleted and deactivated users
+            user = super().get_user(validated_token)
+            if not _matches(user, validated_token):
+                # An outdated token: serve the current user, but don't cache
+                # one this token can never match
+                return user
+            if version is None:
+                # add, not set: a version a bump wrote after this load wins
+                ttl = settings.AUTH_USER_CACHE["TTL"]
+                cache.add(_version_key(user_id), user.token_version, ttl)
+            _remember(user)
+        # Each request gets its own instance; views may modify request.user
+        return copy.copy(user)
@@ -0,0 +1,85 @@
+"""
+Admin dashboard summary: every headline number from aggregate queries, cached
+briefly. New or deleted users, assets and vehicles, and role or ban changes,
+invalidate it (see users/signals.py); gate log, visitor and on-campus numbers
+may lag by up to CACHE_TTL.
+"""
+
+from datetime import datetime, time
+
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from assets.models import Asset
+from gate_logs.models import GateLog, GateLogRollup, VehiclePresence
+from gate_logs.serializers import GateLogSerializer
+from vehicles.models import Vehicle
+from visitors import overdue
+from visitors.models import Visitor
+
+from .models import User
+
+CACHE_KEY = "dashboard:summary"
+CACHE_TTL = 30  # seconds
+RECENT_LOGS = 5
+
+
+def invalidate():
+    cache.delete(CACHE_KEY)
+
+
+def get_summary():
+    summary = cache.get(CACHE_KEY)
+    if summary is None:
+        summary = build_summary()
+        cache.set(CACHE_KEY, summary, CACHE_TTL)
+    return summary
+
+
+def build_summary():
+    overdue.sweep_if_due()
+    now = timezone.now()
+    today = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+
+    users_by_role = dict(
+        User.objects.values_list("role").annotate(count=Count("id")).order_by()
+    )
+    daily = GateLogRollup.objects.filter(period=GateLogRollup.DAY)
+    today_breakdown = list(
+        daily.filter(bucket=today)
+        .values("log_type")
+        .annotate(count=Sum("count"))
+        .order_by("log_type")
+    )
+    open_visitors = Visitor.objects.filter(
+        exit_time__isnull=True, status__in=Visitor.OPEN_STATUSES
+    )
+    recent_logs = GateLog.objects.select_related(
+        "guard", "vehicle", "asset", "student"
+    ).order_by("-timestamp", "-id")[:RECENT_LOGS]
+
+    return {
+        "generated_at": now,
+        "users": {
+            "total": sum(users_by_role.values()),
+            "by_role": users_by_role,
+            "banned": User.objects.filter(is_banned=True).count(),
+        },
+        "assets": Asset.objects.count(),
+        "vehicles": Vehicle.objects.count(),
+        "gate_logs": {
+            "total": daily.aggregate(total=Sum("count"))["total"] or 0,
+            "today": sum(row["count"] for row in today_breakdown),
+            "today_breakdown": today_breakdown,
+        },
+        "on_campus": {
+            "scholars": User.objects.filter(
+                is_day_scholar=True, day_scholar_status="ON_CAMPUS"
+            ).count(),
+            "vehicles": VehiclePresence.objects.filter(is_on_campus=True).count(),
+            "visitors": open_visitors.count(),
+            "overdue_visitors": overdue.overdue_visitors().count(),
+        },
+        "recent_logs": GateLogSerializer(recent_logs, many=True).data,
+    }
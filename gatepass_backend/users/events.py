@@ -0,0 +1,191 @@
+"""
+In-process pub/sub for live updates pushed to browsers over Server-Sent Events.
+
+Writers call ``publish`` (or ``publish_on_commit``) from ordinary sync code;
+every open ``/api/events/`` stream in this process gets its own bounded
+asyncio queue and is woken on its event loop. A subscriber that falls more
+than ``QUEUE_SIZE`` events behind loses the overflow rather than slowing
+writers down; clients refetch on reconnect anyway.
+
+Fan-out is per process, so streams only see events published by the same
+server process. ``claim_streams`` enforces that: the first process to serve a
+stream holds an flock on ``EVENTS["LOCK_FILE"]``, and any other process
+refuses streams with an error instead of silently missing events. Run the
+ASGI server with a single worker (see README), or put a shared broker in
+front of this module if you need more.
+
+Streams are opened with a short-lived, single-use ticket (``issue_ticket``)
+rather than the access token, so no JWT ends up in a URL or access log.
+Only the stream process redeems tickets, so it can remember used ones
+in memory.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import secrets
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process check is skipped
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+GATE_LOG = "gate_log"
+VISITOR = "visitor"
+ALERT = "alert"
+
+QUEUE_SIZE = 500
+
+TICKET_SALT = "users.events.ticket"
+
+_subscribers = set()
+_lock = threading.Lock()
+_ids = itertools.count(1)
+_stream_lock = None  # Open LOCK_FILE while this process serves streams
+_used_tickets = {}  # nonce -> expiry (time.monotonic())
+
+
+class Subscription:
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+    def deliver(self, event):
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    async def get(self, timeout):
+        """Next event, or None after ``timeout`` seconds without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+def subscribe():
+    subscription = Subscription()
+    with _lock:
+        _subscribers.add(subscription)
+    return subscription
+
+
+def unsubscribe(subscription):
+    with _lock:
+        _subscribers.discard(subscription)
+
+
+def publish(kind, data):
+    """Send ``data`` (JSON-serialisable) to every open stream."""
+    with _lock:
+        subscribers = list(_subscribers)
+    if not subscribers:
+        return
+    event = {"id": next(_ids), "kind": kind, "data": data}
+    for subscription in subscribers:
+        try:
+            subscription.deliver(event)
+        except RuntimeError:  # Loop already closed
+            unsubscribe(subscription)
+
+
+def publish_on_commit(kind, build):
+    """
+    Publish ``build()`` once the current transaction commits, and only if
+    anyone is listening (so writes pay nothing when no stream is open).
+    """
+    if not _subscribers:
+        return
+    transaction.on_commit(lambda: publish(kind, build()))
+
+
+def publish_gate_logs(logs):
+    from gate_logs.serializers import GateLogSerializer
+
+    if not _subscribers:
+        return
+    for data in GateLogSerializer(logs, many=True).data:
+        publish_on_commit(GATE_LOG, lambda data=data: data)
+
+
+def visitor_payload(visitor):
+    return {
+        "id": visitor.pk,
+        "name": visitor.name,
+        "host_name": visitor.host_name,
+        "status": visitor.status,
+        "exit_time": visitor.exit_time.isoformat() if visitor.exit_time else None,
+    }
+
+
+def claim_streams():
+    """
+    True if this process may serve event streams. The first process to ask
+    keeps an flock on EVENTS["LOCK_FILE"] for the rest of its life; every
+    other process gets False, because its streams would miss events published
+    by the owner.
+    """
+    global _stream_lock
+    if fcntl is None:
+        return True
+    with _lock:
+        if _stream_lock is not None:
+            return True
+        path = Path(settings.EVENTS["LOCK_FILE"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handle = open(path, "a+")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.seek(0)
+            owner = handle.read().strip() or "unknown"
+            handle.close()
+            logger.error(
+                "Refusing event stream in process %s: process %s already serves them and "
+                "events only fan out within one process. Run a single ASGI worker.",
+                os.getpid(),
+                owner,
+            )
+            return False
+        handle.truncate(0)
+        handle.write(str(os.getpid()))
+        handle.flush()
+        _stream_lock = handle
+        return True
+
+
+def issue_ticket(user):
+    """Signed single-use ticket for opening one stream as ``user``."""
+    return signing.dumps({"user": user.pk, "nonce": secrets.token_urlsafe(16)}, salt=TICKET_SALT)
+
+
+def redeem_ticket(ticket):
+    """User id the ticket was issued to, or None if invalid, expired or used."""
+    max_age = settings.EVENTS["TICKET_MAX_AGE"]
+    try:
+        payload = signing.loads(ticket, salt=TICKET_SALT, max_age=max_age)
+    except signing.BadSignature:  # Includes SignatureExpired
+        return None
+    now = time.monotonic()
+    with _lock:
+        for nonce, expires in list(_used_tickets.items()):
+            if expires < now:
+                del _used_tickets[nonce]
+        if payload["nonce"] in _used_tickets:
+            return None
+        _used_tickets[payload["nonce"]] = now + max_age
+    return payload["user"]
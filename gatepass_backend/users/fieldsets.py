@@ -0,0 +1,106 @@
+"""
+Sparse fieldsets for read endpoints: ``?fields=``, ``?omit=`` and ``?expand=``.
+
+    GET /api/visitors/?fields=id,name,status
+    GET /api/assets/?omit=owner_photo
+    GET /api/gate-logs/?expand=student
+
+Serializers opt in with ``SparseFieldsSerializerMixin`` and describe, in Meta,
+which relations each output field needs:
+
+    related_fields   {field: [relation, ...]}  joined with select_related
+    prefetch_fields  {field: [relation, ...]}  loaded with prefetch_related
+    expandable_fields {field: "dotted.path.Serializer"}  id -> nested object
+
+Viewsets that also use ``SparseFieldsViewMixin`` build their querysets with
+``with_related()``, which joins or prefetches only what the requested fields
+need, so list cost follows what the screen shows. Only GET/HEAD requests are
+trimmed; writes always see every field.
+"""
+
+from django.utils.module_loading import import_string
+from rest_framework.permissions import SAFE_METHODS
+
+
+def _param_set(query_params, name):
+    return {part.strip() for part in query_params.get(name, "").split(",") if part.strip()}
+
+
+class SparseFieldsSerializerMixin:
+    @classmethod
+    def requested_fields(cls, request, field_names):
+        """
+        (fields to output, fields to expand) for ``request``, out of
+        ``field_names``. Unknown names are ignored.
+        """
+        if request is None or request.method not in SAFE_METHODS:
+            return list(field_names), set()
+        only = _param_set(request.query_params, "fields")
+        omit = _param_set(request.query_params, "omit")
+        names = [
+            name
+            for name in field_names
+            if (not only or name in only) and name not in omit
+        ]
+        expandable = getattr(cls.Meta, "expandable_fields", {})
+        expand = {
+            name for name in _param_set(request.query_params, "expand")
+            if name in expandable and name in names
+        }
+        return names, expand
+
+    @classmethod
+    def relations_for(cls, names, expand):
+        """(select_related, prefetch_related) lookups needed for ``names``."""
+        related_fields = getattr(cls.Meta, "related_fields", {})
+        prefetch_fields = getattr(cls.Meta, "prefetch_fields", {})
+        select, prefetch = set(), set()
+        for name in names:
+            select.update(related_fields.get(name, ()))
+            prefetch.update(prefetch_fields.get(name, ()))
+        for name in expand:
+            select.add(name)
+            nested = import_string(cls.Meta.expandable_fields[name])
+            if issubclass(nested, SparseFieldsSerializerMixin):
+                nested_select, _ = nested.relations_for(nested.Meta.fields, set())
+                select.update(f"{name}__{relation}" for relation in nested_select)
+        return sorted(select), sorted(prefetch)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._expand = set()
+        request = self.context.get("request")
+        if request is None or request.method not in SAFE_METHODS:
+            return
+
+        names, self._expand = self.requested_fields(request, list(self.fields))
+        keep = set(names)
+        for name in list(self.fields):
+            if name not in keep and not self.fields[name].write_only:
+                self.fields.pop(name)
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        expandable = getattr(self.Meta, "expandable_fields", {})
+        for name in self._expand:
+            related = getattr(instance, name)
+            serializer_class = import_string(expandable[name])
+            data[name] = serializer_class(related).data if related is not None else None
+        return data
+
+
+class SparseFieldsViewMixin:
+    def with_related(self, queryset):
+        """Add the joins/prefetches the requested fields need to ``queryset``."""
+        serializer_class = self.get_serializer_class()
+        if not issubclass(serializer_class, SparseFieldsSerializerMixin):
+            return queryset
+        names, expand = serializer_class.requested_fields(
+            self.request, serializer_class.Meta.fields
+        )
+        select, prefetch = serializer_class.relations_for(names, expand)
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
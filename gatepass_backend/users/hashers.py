@@ -0,0 +1,47 @@
+import hashlib
+
+from django.contrib.auth.hashers import BasePasswordHasher, mask_hash
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext_noop as _
+
+
+class DeferredPasswordHasher(BasePasswordHasher):
+    """
+    Placeholder for SIS-issued default passwords (the student ID) created by
+    ``sync_from_sis --password-mode deferred``: one salted SHA-256, cheap to
+    write in bulk. It protects nothing the student ID doesn't already give
+    away, so it is always flagged for update and Django re-hashes the
+    password with the preferred hasher on the first successful login.
+
+    Listed last in PASSWORD_HASHERS so it is never used for new passwords.
+    """
+
+    algorithm = "deferred_sha256"
+
+    def encode(self, password, salt):
+        self._check_encode_args(password, salt)
+        digest = hashlib.sha256((salt + password).encode()).hexdigest()
+        return "%s$%s$%s" % (self.algorithm, salt, digest)
+
+    def decode(self, encoded):
+        algorithm, salt, digest = encoded.split("$", 2)
+        assert algorithm == self.algorithm
+        return {"algorithm": algorithm, "hash": digest, "salt": salt}
+
+    def verify(self, password, encoded):
+        decoded = self.decode(encoded)
+        return constant_time_compare(encoded, self.encode(password, decoded["salt"]))
+
+    def safe_summary(self, encoded):
+        decoded = self.decode(encoded)
+        return {
+            _("algorithm"): decoded["algorithm"],
+            _("salt"): mask_hash(decoded["salt"], show=2),
+            _("hash"): mask_hash(decoded["hash"]),
+        }
+
+    def must_update(self, encoded):
+        return True
+
+    def harden_runtime(self, password, encoded):
+        pass
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from users.sis import mock_sis
+from users.sis.mock_server import PATH, make_server
+
+
+class Command(BaseCommand):
+    help = "Serve the mock SIS feed over HTTP for testing sync_from_sis offline"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8100)
+        parser.add_argument(
+            "--students",
+            type=int,
+            default=mock_sis.DEFAULT_STUDENT_COUNT,
+            help="Number of student accounts in the feed",
+        )
+        parser.add_argument(
+            "--fail-rate",
+            type=float,
+            default=0.0,
+            help="Share of requests answered with HTTP 503 (0-1)",
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.0,
+            help="Seconds to wait before each response",
+        )
+
+    def handle(self, *args, **options):
+        server = make_server(
+            options["host"],
+            options["port"],
+            students=options["students"],
+            fail_rate=options["fail_rate"],
+            latency=options["latency"],
+        )
+        host, port = server.server_address[:2]
+        total = mock_sis.total_accounts(options["students"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Mock SIS serving {total} accounts at http://{host}:{port}{PATH}")
+        )
+        self.stdout.write(f"Sync against it with SIS_URL=http://{host}:{port}{PATH}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -1,7 +1,8 @@
-from django.contrib.auth.hashers import make_password
-from django.core.management.base import BaseCommand
-from users.models import User
-from users.sis.adapter import SISAdapter
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from users.sis import passwords
+from users.sis.adapter import Checkpoint, SISAdapter, SISError
+from users.sis.sync import sync_batches
 
 
 class Command(BaseCommand):
@@ -11,61 +12,104 @@ class Command(BaseCommand):
         parser.add_argument(
             "--dry-run",
             action="store_true",
-            help="Preview what would be created without writing to the database",
+            help="Preview what would change without writing to the database",
+        )
+        parser.add_argument(
+            "--password-mode",
+            choices=passwords.MODES,
+            default=passwords.SERIAL,
+            help=(
+                "How new accounts' passwords are hashed: serial, pool (process "
+                "pool) or deferred (default student-ID passwords hashed on first login)"
+            ),
+        )
+        parser.add_argument(
+            "--hash-workers",
+            type=int,
+            default=None,
+            help="Processes for --password-mode pool (default: one per CPU)",
+        )
+        parser.add_argument(
+            "--allow-mass-deactivate",
+            action="store_true",
+            help=(
+                "Deactivate missing accounts even if they are more than "
+                "SIS_MAX_DEACTIVATE of the SIS-managed accounts"
+            ),
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue an interrupted run after its last completed page",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=None,
+            help="Accounts per SIS page (default: SIS_PAGE_SIZE)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=None,
+            help="SIS pages fetched in parallel (default: SIS_CONCURRENCY)",
         )
 
     def handle(self, *args, **options):
         dry_run = options["dry_run"]
-        adapter = SISAdapter()
-        accounts = adapter.fetch_accounts()
-
-        existing_usernames = set(User.objects.values_list("username", flat=True))
+        adapter = SISAdapter(page_size=options["page_size"], concurrency=options["concurrency"])
+        checkpoint = Checkpoint(settings.SIS["CHECKPOINT"], adapter.source, adapter.page_size)
+        done, feed = checkpoint.load() if options["resume"] else (0, "")
+        if done:
+            self.stdout.write(f"Resuming after page {done} of {adapter.source}.")
 
-        to_create = []
-        skipped = 0
+        def batches():
+            for page in adapter.iter_pages(start=done + 1):
+                if done and page.feed != feed:
+                    # Records may have shifted across pages: resuming would skip some
+                    raise CommandError(
+                        f"The SIS feed changed since the interrupted run ({feed} -> "
+                        f"{page.feed}). Run a full sync without --resume."
+                    )
+                yield page.accounts
+                # Control is back here once the page has been written
+                if not dry_run:
+                    checkpoint.save(page)
 
-        for account in accounts:
-            if account["username"] in existing_usernames:
-                skipped += 1
-                continue
-
-            # Check if this is a default password (student_id or standard pattern)
-            is_default_password = (
-                (account["role"] == "student" and account["password"] == account.get("student_id")) or
-                (account["role"] == "guard" and account["password"].endswith("pass")) or
-                (account["role"] == "admin" and "secure" in account["password"])
+        try:
+            result = sync_batches(
+                batches(),
+                dry_run=dry_run,
+                password_mode=options["password_mode"],
+                hash_workers=options["hash_workers"],
+                # Pages before the checkpoint were not read this time
+                deactivate=not done,
+                max_deactivate=(
+                    None if options["allow_mass_deactivate"] else settings.SIS["MAX_DEACTIVATE"]
+                ),
             )
-            
-            to_create.append(
-                User(
-                    username=account["username"],
-                    first_name=account["first_name"],
-                    last_name=account["last_name"],
-                    email=account["email"],
-                    phone=account.get("phone", ""),
-                    role=account["role"],
-                    student_id=account.get("student_id"),
-                    is_day_scholar=account.get("is_day_scholar", False),
-                    day_scholar_status=account.get("day_scholar_status", "OFF_CAMPUS"),
-                    password=make_password(account["password"]),
-                    is_staff=account["role"] == "admin",
-                    is_superuser=account["role"] == "admin",
-                    must_change_password=is_default_password,
+        except SISError as exc:
+            hint = "" if dry_run else " Re-run with --resume to continue."
+            raise CommandError(f"{exc}.{hint}")
+        if not dry_run:
+            checkpoint.clear()
+
+        summary = (
+            f"Created: {result.created} | Updated: {result.updated} | "
+            f"Unchanged: {result.unchanged} | Deactivated: {result.deactivated}"
+        )
+        if done:
+            summary += " (skipped on a resumed run)"
+        if result.withheld:
+            self.stderr.write(
+                self.style.WARNING(
+                    f"Not deactivating {result.withheld} of {result.managed} SIS-managed accounts "
+                    f"missing from the feed: more than {settings.SIS['MAX_DEACTIVATE']:.0%} "
+                    "suggests an empty or truncated feed. Check the SIS, then re-run with "
+                    "--allow-mass-deactivate if they really left."
                 )
             )
-
         if dry_run:
-            self.stdout.write(
-                f"[DRY RUN] Would create: {len(to_create)} | Would skip: {skipped}"
-            )
-            for u in to_create[:5]:
-                self.stdout.write(f"  → {u.username} ({u.role})")
-            self.stdout.write("  ...")
+            self.stdout.write(f"[DRY RUN] {summary}")
             return
-
-        User.objects.bulk_create(to_create, batch_size=500)
-        self.stdout.write(
-            self.style.SUCCESS(
-                f"Sync complete. Created: {len(to_create)} | Skipped (exist): {skipped}"
-            )
-        )
+        self.stdout.write(self.style.SUCCESS(f"Sync complete. {summary}"))
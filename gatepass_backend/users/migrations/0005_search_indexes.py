@@ -0,0 +1,52 @@
+# Generated by Django 6.0.2 on 2026-10-17 16:40
+#
+# Indexes for people search (users/search.py): pg_trgm GIN indexes on
+# PostgreSQL (when the server ships pg_trgm), case-insensitive prefix indexes
+# on SQLite. Vendor-specific, so they are created here rather than declared
+# on the model.
+
+from django.db import migrations
+
+TABLE = 'users_user'
+COLUMNS = ['first_name', 'last_name', 'student_id', 'username']
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+            if cursor.fetchone() is None:
+                return  # Not shipped with this server; search falls back to prefixes
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for column in COLUMNS:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS user_{column}_trgm_idx '
+                f'ON {TABLE} USING gin ({column} gin_trgm_ops)'
+            )
+    elif vendor == 'sqlite':
+        for column in COLUMNS:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS user_{column}_prefix_idx '
+                f'ON {TABLE} ({column} COLLATE NOCASE)'
+            )
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    suffix = {'postgresql': 'trgm', 'sqlite': 'prefix'}.get(vendor)
+    if suffix is None:
+        return
+    for column in COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS user_{column}_{suffix}_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_alter_user_phone'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 6.0.2 on 2026-10-17 17:20
+#
+# The admin directory search also matches email addresses; index the column
+# the same way 0005 indexes the others.
+
+from django.db import migrations
+
+
+def create_email_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            if cursor.fetchone() is None:
+                return  # 0005 found no pg_trgm
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS user_email_trgm_idx '
+            'ON users_user USING gin (email gin_trgm_ops)'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS user_email_prefix_idx '
+            'ON users_user (email COLLATE NOCASE)'
+        )
+
+
+def drop_email_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    suffix = {'postgresql': 'trgm', 'sqlite': 'prefix'}.get(vendor)
+    if suffix is not None:
+        schema_editor.execute(f'DROP INDEX IF EXISTS user_email_{suffix}_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_email_search_index, drop_email_search_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-17 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_email_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='sis_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
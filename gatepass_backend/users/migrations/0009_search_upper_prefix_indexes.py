@@ -0,0 +1,43 @@
+# Generated by Django 6.0.2 on 2026-10-17 20:10
+#
+# Without pg_trgm, people search (users/search.py) falls back to
+# __istartswith, which PostgreSQL compiles to UPPER(column) LIKE 'WORD%'.
+# Index that expression with text_pattern_ops so the fallback is an index
+# range scan instead of a sequential scan of users_user.
+
+from django.db import migrations
+
+TABLE = 'users_user'
+COLUMNS = ['first_name', 'last_name', 'student_id', 'username', 'email']
+
+
+def create_upper_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone() is not None:
+            return  # Searched with trigram operators (0005, 0006)
+    for column in COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS user_{column}_upper_idx '
+            f'ON {TABLE} (UPPER({column}) text_pattern_ops)'
+        )
+
+
+def drop_upper_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS user_{column}_upper_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_user_token_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_upper_prefix_indexes, drop_upper_prefix_indexes),
+    ]
@@ -29,3 +29,9 @@ class User(AbstractUser):
     must_change_password = models.BooleanField(default=False)  # True if user has default password
     is_banned = models.BooleanField(default=False)
     ban_reason = models.CharField(max_length=255, blank=True)
+    # Hash of the SIS-owned fields at the last sync (users/sis/sync.py);
+    # empty for accounts not managed by the SIS
+    sis_hash = models.CharField(max_length=64, blank=True)
+    # Bumped whenever role, ban or account details change, so tokens issued
+    # before the change stop matching cached users (users/authentication.py)
+    token_version = models.PositiveIntegerField(default=0)
@@ -0,0 +1,112 @@
+"""
+Phone number and identity-document normalization shared by the user and
+visitor serializers.
+
+Results are memoized per (raw value, region/document type) in bounded LRU
+caches, so repeat visitors and hosts are normalized without re-parsing.
+``phonenumbers`` loads its metadata lazily, so ``UsersConfig.ready()`` calls
+``warm()`` to pay that cost at worker start-up rather than on the first
+request (turn off with ``PHONE_NUMBERS_WARM``).
+"""
+
+import re
+from functools import lru_cache
+
+CACHE_SIZE = 4096
+
+# Dial codes offered by the visitor form, mapped to phonenumbers regions
+DIAL_CODE_REGIONS = {
+    "+254": "KE",
+    "+256": "UG",
+    "+255": "TZ",
+    "+1": "US",
+    "+44": "GB",
+}
+
+# Region assumed for user phone numbers written without a country code
+DEFAULT_REGION = "KE"
+
+DOCUMENT_PATTERNS = {
+    "KENYA_NATIONAL_ID": (r"^\d{7,8}$", "Kenyan National ID must be 7 or 8 digits."),
+    "PASSPORT": (r"^[A-Z0-9]{6,9}$", "Passport number must be 6-9 letters/digits (no spaces)."),
+    "FOREIGN_ID": (r"^[A-Z0-9-]{5,20}$", "Foreign ID must be 5-20 letters/digits (hyphen allowed)."),
+}
+
+
+class NormalizationError(ValueError):
+    pass
+
+
+_phonenumbers = None
+
+
+def _lib():
+    global _phonenumbers
+    if _phonenumbers is None:
+        import phonenumbers
+
+        _phonenumbers = phonenumbers
+    return _phonenumbers
+
+
+def warm():
+    """Import phonenumbers and load its metadata now rather than on first use."""
+    normalize_phone("+254712345678", "KE")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _phone(value, region):
+    phonenumbers = _lib()
+    try:
+        parsed = phonenumbers.parse(value, region)
+    except phonenumbers.NumberParseException:
+        return None, "Enter a valid phone number format."
+    valid = (
+        phonenumbers.is_valid_number_for_region(parsed, region)
+        if region
+        else phonenumbers.is_valid_number(parsed)
+    )
+    if not valid:
+        return None, "Enter a valid number for the selected country."
+    return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164), None
+
+
+def normalize_phone(value, region):
+    """
+    E.164 form of ``value`` as a number in ``region`` (None: the number must
+    carry its own +country code). Raises NormalizationError.
+    """
+    normalized, error = _phone(value.strip(), region)
+    if error:
+        raise NormalizationError(error)
+    return normalized
+
+
+def split_dial_code(value):
+    """
+    (dial code, national number) for an E.164 number whose code is one of
+    DIAL_CODE_REGIONS, else ("", value).
+    """
+    for code in sorted(DIAL_CODE_REGIONS, key=len, reverse=True):
+        if value.startswith(code):
+            return code, value[len(code):]
+    return "", value
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _document(value, document_type):
+    normalized = value.upper().strip()
+    if len(normalized) < 5 or len(normalized) > 20:
+        return None, "Document number must be between 5 and 20 characters."
+    pattern, message = DOCUMENT_PATTERNS.get(document_type, DOCUMENT_PATTERNS["FOREIGN_ID"])
+    if not re.match(pattern, normalized):
+        return None, message
+    return normalized, None
+
+
+def normalize_document(value, document_type):
+    """Upper-cased, validated document number. Raises NormalizationError."""
+    normalized, error = _document(value, document_type)
+    if error:
+        raise NormalizationError(error)
+    return normalized
@@ -0,0 +1,27 @@
+from rest_framework.pagination import CursorPagination
+
+
+class UserCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the admin user directory.
+
+    ``?ordering=`` picks one of SORT_FIELDS (prefix "-" for descending); the
+    cursor position is taken from that column, with id breaking ties, so
+    every page is one indexed range scan and no COUNT(*) is issued.
+    """
+
+    SORT_FIELDS = ("id", "username", "last_name", "date_joined")
+
+    ordering = ("id",)
+    ordering_param = "ordering"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+    def get_ordering(self, request, queryset, view):
+        value = request.query_params.get(self.ordering_param, "")
+        if value.lstrip("-") not in self.SORT_FIELDS:
+            return self.ordering
+        if value.lstrip("-") == "id":
+            return (value,)
+        return (value, "-id" if value.startswith("-") else "id")
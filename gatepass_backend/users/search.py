@@ -0,0 +1,154 @@
+"""
+Typo-tolerant search shared by the list and lookup endpoints.
+
+``fuzzy`` matches one column as a whole (visitor names); ``matching``
+matches each word of a search box against several columns (people search),
+and ``ranked`` returns the best ``limit`` of those rows.
+
+On PostgreSQL both use pg_trgm operators, answered from GIN ``gin_trgm_ops``
+indexes on the columns, and rank matches by similarity. Word prefixes are
+matched there with ``column ILIKE 'word%'``, which those indexes also serve;
+Django's ``__istartswith`` compiles to ``UPPER(column) LIKE`` and would
+turn every search into a sequential scan. Other backends (SQLite in
+development), and PostgreSQL servers without pg_trgm, fall back to
+``__istartswith`` in the queryset's own order, answered from ``COLLATE
+NOCASE`` indexes on SQLite and ``UPPER(column) text_pattern_ops`` indexes on
+PostgreSQL.
+
+The trigram and prefix indexes are created by vendor-guarded RunPython
+migrations, so they are not part of the model state.
+"""
+
+from functools import reduce
+from operator import add, and_, or_
+
+from django.db import connection
+from django.db.models import BooleanField, F, FloatField, Func, Q, Value
+from django.db.models.functions import Greatest
+
+# Shorter terms have too few trigrams to rank usefully
+MIN_TERM_LENGTH = 2
+# Words of a search box considered by ``ranked``
+MAX_WORDS = 4
+
+
+class TrigramMatch(Func):
+    """``field % term``: true when the trigram similarity passes the threshold."""
+
+    arg_joiner = " %% "
+    template = "%(expressions)s"
+    output_field = BooleanField()
+    conditional = True
+
+
+class WordMatch(Func):
+    """``word <% field``: true when ``word`` closely matches part of the field."""
+
+    arg_joiner = " <%% "
+    template = "%(expressions)s"
+    output_field = BooleanField()
+    conditional = True
+
+
+class ILike(Func):
+    """``field ILIKE pattern``, case-insensitive LIKE on the bare column."""
+
+    arg_joiner = " ILIKE "
+    template = "%(expressions)s"
+    output_field = BooleanField()
+    conditional = True
+
+
+class Similarity(Func):
+    function = "similarity"
+    output_field = FloatField()
+
+
+class WordSimilarity(Func):
+    function = "word_similarity"
+    output_field = FloatField()
+
+
+# Database name -> whether pg_trgm is installed there
+_trigram_support = {}
+
+
+def supports_trigrams():
+    """True on PostgreSQL with the pg_trgm extension installed."""
+    if connection.vendor != "postgresql":
+        return False
+    name = connection.settings_dict["NAME"]
+    if name not in _trigram_support:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_support[name] = cursor.fetchone() is not None
+    return _trigram_support[name]
+
+
+def fuzzy(queryset, field, term):
+    """
+    ``queryset`` narrowed to rows whose ``field`` resembles ``term``, best
+    matches first on PostgreSQL (the queryset's ordering breaks ties).
+    """
+    term = term.strip()
+    if len(term) < MIN_TERM_LENGTH:
+        return queryset.none()
+    if not supports_trigrams():
+        return queryset.filter(**{f"{field}__icontains": term})
+    return (
+        queryset.filter(TrigramMatch(F(field), Value(term)))
+        .annotate(search_rank=Similarity(F(field), Value(term)))
+        .order_by("-search_rank", *queryset.query.order_by)
+    )
+
+
+def matching(queryset, fields, term):
+    """
+    ``queryset`` narrowed to rows where every word of ``term`` matches one of
+    ``fields``: by trigram word similarity or prefix on PostgreSQL, by prefix
+    elsewhere. The queryset's ordering is kept.
+    """
+    words = term.split()[:MAX_WORDS]
+    if not words:
+        return queryset.none()
+    return queryset.filter(reduce(and_, (_word_matches(word, fields) for word in words)))
+
+
+def ranked(queryset, fields, term, limit):
+    """
+    The best ``limit`` rows of ``matching(queryset, fields, term)``, ranked by
+    similarity on PostgreSQL.
+    """
+    matches = matching(queryset, fields, term)
+    if not supports_trigrams():
+        return matches[:limit]
+    rank = reduce(
+        add,
+        (
+            Greatest(*(WordSimilarity(Value(word), F(field)) for field in fields))
+            for word in term.split()[:MAX_WORDS]
+        ),
+    )
+    return matches.annotate(search_rank=rank).order_by(
+        "-search_rank", *queryset.query.order_by
+    )[:limit]
+
+
+def _prefix_pattern(word):
+    """LIKE pattern for values starting with ``word`` (wildcards escaped)."""
+    return word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _word_matches(word, fields):
+    if not supports_trigrams():
+        return reduce(or_, (Q(**{f"{field}__istartswith": word}) for field in fields))
+    # Only operators the gin_trgm_ops indexes serve, so the OR of them is a
+    # BitmapOr of index scans
+    prefix = Value(_prefix_pattern(word))
+    return reduce(
+        or_,
+        (
+            Q(ILike(F(field), prefix)) | Q(WordMatch(Value(word), F(field)))
+            for field in fields
+        ),
+    )
@@ -1,6 +1,11 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
 import re
 
+from . import authentication, normalization
+from .fieldsets import SparseFieldsSerializerMixin
 from .models import User
 
 
@@ -27,13 +32,22 @@ def validate_username_format(value):
 
 
 def validate_phone_format(value):
-    """Optional phone: if provided must be a plausible international number."""
+    """
+    Optional phone: if provided must be a plausible international number.
+    Numbers that phonenumbers recognises (local ones as Kenyan) are stored in
+    E.164 form; other plausible ones are kept as typed.
+    """
     if value:
         value = sanitize_text(value).strip()
         if not INTL_PHONE_RE.match(value):
             raise serializers.ValidationError(
                 "Enter a valid phone number (e.g. +254712345678)."
             )
+        region = None if value.startswith("+") else normalization.DEFAULT_REGION
+        try:
+            value = normalization.normalize_phone(value, region)
+        except normalization.NormalizationError:
+            pass
     return value
 
 
@@ -81,7 +95,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return validate_phone_format(value)
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = [
@@ -103,6 +117,14 @@ class UserProfileSerializer(serializers.ModelSerializer):
         read_only_fields = ["role", "student_id"]
 
 
+class UserSummarySerializer(serializers.ModelSerializer):
+    """Who someone is, for ``?expand=`` on records that point at a user."""
+
+    class Meta:
+        model = User
+        fields = ["id", "username", "first_name", "last_name", "role", "student_id"]
+
+
 # ── Admin-only serializers ─────────────────────────────────────────────────────
 
 class AdminUserCreateSerializer(serializers.ModelSerializer):
@@ -185,3 +207,23 @@ class AdminUserUpdateSerializer(serializers.ModelSerializer):
 
     def validate_phone(self, value):
         return validate_phone_format(value)
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Login tokens carry the claims CachedJWTAuthentication checks."""
+
+    @classmethod
+    def get_token(cls, user):
+        return authentication.add_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refreshed access tokens get the user's current claims, not the login-time ones."""
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data["access"])
+        user = User.objects.filter(pk=access[api_settings.USER_ID_CLAIM]).first()
+        if user is not None:
+            data["access"] = str(authentication.add_claims(access, user))
+        return data
@@ -0,0 +1,60 @@
+from django.db.models.signals import post_delete, post_save
+
+from assets.models import Asset
+from gate_logs.models import GateLog
+from vehicles.models import Vehicle
+from visitors.models import Visitor
+
+from . import authentication, dashboard, events
+from .models import User
+
+
+# User fields the dashboard counts that only admins change. Logins, password
+# upgrades and scholar sign-in/out save other fields at gate-traffic rates.
+DASHBOARD_USER_FIELDS = {"role", "is_banned"}
+
+
+def invalidate_dashboard(sender, **kwargs):
+    dashboard.invalidate()
+
+
+def invalidate_dashboard_on_save(sender, created, update_fields=None, **kwargs):
+    counted_fields = update_fields is None or DASHBOARD_USER_FIELDS & set(update_fields)
+    if created or (sender is User and counted_fields):
+        dashboard.invalidate()
+
+
+# Rare writes to the tables the dashboard counts clear it. Gate logs and
+# visitors are written every few seconds at a busy gate, so their numbers,
+# and scholar or visitor status changes, are left to the cache TTL.
+for model in (User, Asset, Vehicle):
+    post_save.connect(
+        invalidate_dashboard_on_save, sender=model, dispatch_uid=f"dashboard-save-{model.__name__}"
+    )
+    post_delete.connect(
+        invalidate_dashboard, sender=model, dispatch_uid=f"dashboard-delete-{model.__name__}"
+    )
+
+
+def forget_user(sender, instance, **kwargs):
+    authentication.forget(instance.pk)
+
+
+# Requests served by this process see a user's edits straight away
+post_save.connect(forget_user, sender=User, dispatch_uid="auth-forget-save")
+post_delete.connect(forget_user, sender=User, dispatch_uid="auth-forget-delete")
+
+
+def publish_gate_log(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        events.publish_gate_logs([instance])
+
+
+def publish_visitor(sender, instance, raw=False, **kwargs):
+    if not raw:
+        events.publish_on_commit(events.VISITOR, lambda: events.visitor_payload(instance))
+
+
+# Live updates for /api/events/ streams
+post_save.connect(publish_gate_log, sender=GateLog, dispatch_uid="events-gate-log")
+post_save.connect(publish_visitor, sender=Visitor, dispatch_uid="events-visitor")
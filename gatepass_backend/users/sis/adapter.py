@@ -1,13 +1,172 @@
-from .mock_sis import fetch_all_accounts
+import json
+import logging
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+from django.conf import settings
+
+from . import mock_sis
+
+logger = logging.getLogger(__name__)
+
+# Worth retrying: throttling and server-side failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SISError(Exception):
+    pass
+
+
+@dataclass
+class Page:
+    number: int
+    total_pages: int
+    accounts: list
+    # Identifies the feed's contents: the SIS snapshot id when it sends one,
+    # else the total account count
+    feed: str = ""
 
 
 class SISAdapter:
     """
     The only file that changes when the real SIS is connected.
     Everything else in the system calls this, never the mock directly.
+
+    Accounts are read a page at a time from ``SIS["URL"]``
+    (GET ?page=&page_size=, answered as ``mock_sis.fetch_page`` does: the
+    page's ``results`` plus ``total_pages``, ``count`` and optionally a
+    ``snapshot`` id of the data being paged), with
+    up to ``SIS["CONCURRENCY"]`` pages in flight and failed requests retried
+    with exponential backoff. Without a URL the in-process mock is paged
+    instead.
+    """
+
+    def __init__(self, url=None, page_size=None, concurrency=None):
+        config = settings.SIS
+        self.url = config["URL"] if url is None else url
+        self.page_size = page_size or config["PAGE_SIZE"]
+        self.concurrency = max(1, concurrency or config["CONCURRENCY"])
+        self.retries = config["RETRIES"]
+        self.backoff = config["BACKOFF"]
+        self.timeout = config["TIMEOUT"]
+
+    @property
+    def source(self):
+        return self.url or "mock"
+
+    def fetch_accounts(self):
+        """Every account, page by page, as a generator."""
+        for page in self.iter_pages():
+            yield from page.accounts
+
+    def iter_pages(self, start=1):
+        """
+        Pages from ``start`` (1-based) to the last, in order. The first page
+        says how many there are; the rest are fetched concurrently.
+        """
+        first = self._fetch_page(start)
+        yield first
+        if first.total_pages <= start:
+            return
+
+        pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="sis-fetch")
+        try:
+            upcoming = iter(range(start + 1, first.total_pages + 1))
+            pending = deque(
+                pool.submit(self._fetch_page, number)
+                for number in islice(upcoming, self.concurrency)
+            )
+            while pending:
+                page = pending.popleft().result()
+                number = next(upcoming, None)
+                if number is not None:
+                    pending.append(pool.submit(self._fetch_page, number))
+                yield page
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _fetch_page(self, number):
+        if not self.url:
+            return self._page(number, mock_sis.fetch_page(number, self.page_size))
+
+        query = urlencode({"page": number, "page_size": self.page_size})
+        url = f"{self.url}{'&' if '?' in self.url else '?'}{query}"
+        for attempt in range(self.retries + 1):
+            try:
+                with urlopen(url, timeout=self.timeout) as response:
+                    data = json.load(response)
+            except HTTPError as exc:
+                if exc.code not in RETRY_STATUSES or attempt == self.retries:
+                    raise SISError(f"SIS page {number}: HTTP {exc.code}") from exc
+            # ValueError: a truncated or non-JSON body
+            except (URLError, TimeoutError, ConnectionError, ValueError) as exc:
+                if attempt == self.retries:
+                    raise SISError(f"SIS page {number}: {exc}") from exc
+            else:
+                return self._page(number, data)
+            delay = self.backoff * 2**attempt * (1 + random.random())
+            logger.warning("SIS page %s failed, retrying in %.1fs", number, delay)
+            time.sleep(delay)
+
+    @staticmethod
+    def _page(number, data):
+        try:
+            snapshot = data.get("snapshot")
+            return Page(
+                number=data["page"],
+                total_pages=data["total_pages"],
+                accounts=data["results"],
+                feed=f"snapshot:{snapshot}" if snapshot else f"count:{data['count']}",
+            )
+        except (AttributeError, KeyError, TypeError) as exc:
+            raise SISError(f"SIS page {number}: unexpected response ({exc!r})") from exc
+
+
+class Checkpoint:
+    """
+    The last page of a sync run known to be written, so an interrupted run
+    can resume after it. Only valid for the same source and page size, and
+    only while the feed still has the same ``Page.feed`` (else records may
+    have moved across page boundaries; see ``sync_from_sis``).
     """
 
-    def fetch_accounts(self) -> list[dict]:
-        # FUTURE: replace this line with a real API call or DB query
-        # e.g. return self._fetch_from_api("https://sis.anu.ac.ke/api/students")
-        return fetch_all_accounts()
+    def __init__(self, path, source, page_size):
+        self.path = Path(path)
+        self.source = source
+        self.page_size = page_size
+
+    def load(self):
+        """(last completed page number, its ``Page.feed``), or (0, "")."""
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return 0, ""
+        if data.get("source") != self.source or data.get("page_size") != self.page_size:
+            return 0, ""
+        return data.get("page", 0), data.get("feed", "")
+
+    def save(self, page):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    "source": self.source,
+                    "page_size": self.page_size,
+                    "page": page.number,
+                    "feed": page.feed,
+                }
+            )
+        )
+        tmp.replace(self.path)
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
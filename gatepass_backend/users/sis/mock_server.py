@@ -0,0 +1,68 @@
+"""
+A local HTTP stand-in for the SIS, serving the ``mock_sis`` feed the way
+SISAdapter reads it (GET /accounts/?page=&page_size=). Pages are generated
+on request, so a feed of any size costs no memory up front.
+
+``fail_rate`` answers that share of requests with a 503 and ``latency``
+delays every response, to exercise the adapter's retries and concurrency.
+"""
+
+import json
+import logging
+import random
+import time
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from . import mock_sis
+
+logger = logging.getLogger(__name__)
+
+PATH = "/accounts/"
+MAX_PAGE_SIZE = 5000
+
+
+class MockSISHandler(BaseHTTPRequestHandler):
+    def __init__(self, *args, students, fail_rate, latency, **kwargs):
+        self.students = students
+        self.fail_rate = fail_rate
+        self.latency = latency
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != PATH.rstrip("/"):
+            return self._send(404, {"detail": "Not found."})
+
+        query = parse_qs(url.query)
+        try:
+            page = int(query.get("page", ["1"])[0])
+            page_size = int(query.get("page_size", ["500"])[0])
+        except ValueError:
+            return self._send(400, {"detail": "page and page_size must be integers."})
+        if page < 1 or not 1 <= page_size <= MAX_PAGE_SIZE:
+            return self._send(400, {"detail": f"page >= 1, 1 <= page_size <= {MAX_PAGE_SIZE}."})
+
+        if self.latency:
+            time.sleep(self.latency)
+        if random.random() < self.fail_rate:
+            return self._send(503, {"detail": "Simulated outage."})
+        self._send(200, mock_sis.fetch_page(page, page_size, self.students))
+
+    def _send(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def make_server(host="127.0.0.1", port=8100, students=mock_sis.DEFAULT_STUDENT_COUNT,
+                fail_rate=0.0, latency=0.0):
+    handler = partial(MockSISHandler, students=students, fail_rate=fail_rate, latency=latency)
+    return ThreadingHTTPServer((host, port), handler)
@@ -1,4 +1,5 @@
 import random
+import threading
 
 from faker import Faker
 
@@ -27,52 +28,63 @@ def _generate_email(student_id: str) -> str:
     return f"{student_id.lower()}@anu.ac.ke"
 
 
-def generate_students(count: int = 200) -> list[dict]:
-    students = []
-    dept_codes = list(DEPARTMENTS.keys())
-
-    for i in range(1, count + 1):
-        dept = random.choice(dept_codes)
-        year = random.choice(YEARS)
-        student_id = _generate_student_id(year, dept, i)
-
-        students.append(
-            {
-                "student_id": student_id,
-                "username": student_id.lower(),
-                "first_name": fake.first_name(),
-                "last_name": fake.last_name(),
-                "email": _generate_email(student_id),
-                "phone": f"+2547{random.randint(10000000, 99999999)}",
-                "role": "student",
-                "is_day_scholar": random.choice([True, False]),
-                "day_scholar_status": "OFF_CAMPUS",
-                "password": student_id,  # Default password is student ID
-            }
-        )
-
-    return students
-
-
-def generate_guards(count: int = 8) -> list[dict]:
-    guards = []
-    for i in range(1, count + 1):
-        guard_id = f"GRD{i:03d}"
-        guards.append(
-            {
-                "student_id": None,
-                "username": f"guard{i:03d}",
-                "first_name": fake.first_name(),
-                "last_name": fake.last_name(),
-                "email": f"guard{i:03d}@anu.ac.ke",
-                "phone": f"+2547{random.randint(10000000, 99999999)}",
-                "role": "guard",
-                "is_day_scholar": False,
-                "day_scholar_status": "OFF_CAMPUS",
-                "password": f"guard{i:03d}pass",
-            }
-        )
-    return guards
+GUARD_COUNT = 8
+DEFAULT_STUDENT_COUNT = 200
+
+# Faker is seeded per record so every page is reproducible; the seed is
+# shared state, hence the lock (the stand-in server answers on threads)
+_fake_lock = threading.Lock()
+
+
+def _names(seed: int) -> tuple[str, str]:
+    with _fake_lock:
+        fake.seed_instance(seed)
+        return fake.first_name(), fake.last_name()
+
+
+def _student(i: int) -> dict:
+    rng = random.Random(i)
+    dept = rng.choice(list(DEPARTMENTS))
+    year = rng.choice(YEARS)
+    student_id = _generate_student_id(year, dept, i)
+    first_name, last_name = _names(i)
+    return {
+        "student_id": student_id,
+        "username": student_id.lower(),
+        "first_name": first_name,
+        "last_name": last_name,
+        "email": _generate_email(student_id),
+        "phone": f"+2547{rng.randint(10000000, 99999999)}",
+        "role": "student",
+        "is_day_scholar": rng.choice([True, False]),
+        "day_scholar_status": "OFF_CAMPUS",
+        "password": student_id,  # Default password is student ID
+    }
+
+
+def _guard(i: int) -> dict:
+    rng = random.Random(-i)
+    first_name, last_name = _names(-i)
+    return {
+        "student_id": None,
+        "username": f"guard{i:03d}",
+        "first_name": first_name,
+        "last_name": last_name,
+        "email": f"guard{i:03d}@anu.ac.ke",
+        "phone": f"+2547{rng.randint(10000000, 99999999)}",
+        "role": "guard",
+        "is_day_scholar": False,
+        "day_scholar_status": "OFF_CAMPUS",
+        "password": f"guard{i:03d}pass",
+    }
+
+
+def generate_students(count: int = DEFAULT_STUDENT_COUNT) -> list[dict]:
+    return [_student(i) for i in range(1, count + 1)]
+
+
+def generate_guards(count: int = GUARD_COUNT) -> list[dict]:
+    return [_guard(i) for i in range(1, count + 1)]
 
 
 def generate_admins() -> list[dict]:
@@ -92,9 +104,39 @@ def generate_admins() -> list[dict]:
     ]
 
 
+def total_accounts(students: int = DEFAULT_STUDENT_COUNT) -> int:
+    return students + GUARD_COUNT + len(generate_admins())
+
+
+def account_at(index: int, students: int = DEFAULT_STUDENT_COUNT) -> dict:
+    """The account at ``index`` of the feed: students, then guards, then admins."""
+    if index < students:
+        return _student(index + 1)
+    if index < students + GUARD_COUNT:
+        return _guard(index - students + 1)
+    return generate_admins()[index - students - GUARD_COUNT]
+
+
+def fetch_page(page: int, page_size: int, students: int = DEFAULT_STUDENT_COUNT) -> dict:
+    """
+    One page of the feed in the shape the SIS API returns (1-based ``page``).
+    The same arguments always give the same accounts.
+    """
+    total = total_accounts(students)
+    start = (page - 1) * page_size
+    return {
+        "page": page,
+        "page_size": page_size,
+        "count": total,
+        # The generated feed only changes with its size
+        "snapshot": f"mock-{students}",
+        "total_pages": max(1, -(-total // page_size)),
+        "results": [account_at(i, students) for i in range(start, min(start + page_size, total))],
+    }
+
+
 def fetch_all_accounts() -> list[dict]:
     """
-    This is the single method the SISAdapter calls.
-    In production this becomes an API call or DB query to the real SIS.
+    Every account of the default-sized feed in one list.
     """
-    return generate_students(200) + generate_guards(8) + generate_admins()
+    return generate_students() + generate_guards() + generate_admins()
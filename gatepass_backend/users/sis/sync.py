@@ -0,0 +1,194 @@
+"""
+Incremental account sync from the SIS.
+
+Accounts are read from the adapter in batches (SIS pages). Each batch
+costs one query to load the matching users, then a bulk_create for new
+accounts and a bulk_update for accounts whose SIS-owned fields changed.
+Changes are detected by comparing a hash of those fields with
+``User.sis_hash``, so an unchanged account is neither loaded field by field
+nor written.
+
+Once the whole feed has been read, SIS-managed accounts (non-empty
+``sis_hash``) that it no longer lists are deactivated. A feed that fails
+part-way deactivates nothing, and neither does one that would deactivate
+more than ``max_deactivate`` of the managed accounts: an SIS that answers
+with an empty or truncated list must not lock out the campus.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import F
+
+from users import authentication
+from users.models import User
+
+from .passwords import SERIAL, is_default_password, password_hasher
+
+BATCH_SIZE = 500
+
+# Fields the SIS is the source of truth for. day_scholar_status is only
+# taken from the SIS for new accounts: after that the gate owns it.
+SIS_FIELDS = [
+    "first_name",
+    "last_name",
+    "email",
+    "phone",
+    "role",
+    "student_id",
+    "is_day_scholar",
+]
+
+
+@dataclass
+class SyncResult:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deactivated: int = 0
+    # Missing accounts left active because there were too many of them
+    withheld: int = 0
+    managed: int = 0
+
+
+def account_hash(account):
+    values = {field: account.get(field) for field in SIS_FIELDS}
+    values["phone"] = values["phone"] or ""
+    values["is_day_scholar"] = bool(values["is_day_scholar"])
+    return hashlib.sha256(json.dumps(values, sort_keys=True).encode()).hexdigest()
+
+
+def _apply(user, account, digest):
+    for field in SIS_FIELDS:
+        setattr(user, field, account.get(field))
+    user.phone = user.phone or ""
+    user.is_day_scholar = bool(user.is_day_scholar)
+    user.is_staff = user.is_superuser = account["role"] == "admin"
+    user.is_active = True
+    user.sis_hash = digest
+
+
+def _new_user(account, digest, password):
+    user = User(
+        username=account["username"],
+        day_scholar_status=account.get("day_scholar_status", "OFF_CAMPUS"),
+        password=password,
+        must_change_password=is_default_password(account),
+    )
+    _apply(user, account, digest)
+    return user
+
+
+UPDATE_FIELDS = SIS_FIELDS + ["is_staff", "is_superuser", "is_active", "sis_hash"]
+
+
+def _sync_batch(accounts, result, dry_run, hash_all):
+    by_username = {}
+    for account in accounts:
+        by_username.setdefault(account["username"], account)
+    existing = {
+        user.username: user
+        for user in User.objects.filter(username__in=by_username).only(
+            "id", "username", "sis_hash", "is_active"
+        )
+    }
+
+    to_create, changed = [], []
+    for username, account in by_username.items():
+        digest = account_hash(account)
+        user = existing.get(username)
+        if user is None:
+            to_create.append((account, digest))
+        elif user.sis_hash != digest or not user.is_active:
+            changed.append((user, account, digest))
+        else:
+            result.unchanged += 1
+
+    result.created += len(to_create)
+    result.updated += len(changed)
+    if dry_run:
+        return
+
+    passwords = hash_all([account for account, _ in to_create]) if to_create else []
+    with transaction.atomic():
+        if changed:
+            for user, account, digest in changed:
+                _apply(user, account, digest)
+                # Outdates the claims in the user's tokens (users/authentication.py)
+                user.token_version = F("token_version") + 1
+            User.objects.bulk_update(
+                [user for user, _, _ in changed], UPDATE_FIELDS + ["token_version"]
+            )
+            authentication.expire(*[user.pk for user, _, _ in changed])
+        if to_create:
+            User.objects.bulk_create(
+                [
+                    _new_user(account, digest, password)
+                    for (account, digest), password in zip(to_create, passwords)
+                ]
+            )
+
+
+def _deactivate_missing(seen, result, dry_run, max_deactivate):
+    managed = User.objects.filter(is_active=True).exclude(sis_hash="")
+    missing = [
+        pk
+        for pk, username in managed.values_list("pk", "username").iterator(chunk_size=2000)
+        if username not in seen
+    ]
+    # Includes accounts this run created or reactivated, which are all seen
+    result.managed = managed.count() if missing else 0
+    if max_deactivate is not None and len(missing) > max_deactivate * result.managed:
+        result.withheld = len(missing)
+        return
+    result.deactivated = len(missing)
+    if not dry_run:
+        for start in range(0, len(missing), BATCH_SIZE):
+            chunk = missing[start : start + BATCH_SIZE]
+            User.objects.filter(pk__in=chunk).update(
+                is_active=False, token_version=F("token_version") + 1
+            )
+            authentication.expire(*chunk)
+
+
+def sync_accounts(accounts, **options):
+    """
+    Bring users in line with ``accounts`` (any iterable of SIS account dicts,
+    consumed in batches of BATCH_SIZE). See ``sync_batches`` for options.
+    """
+    accounts = iter(accounts)
+    return sync_batches(iter(lambda: list(islice(accounts, BATCH_SIZE)), []), **options)
+
+
+def sync_batches(
+    batches,
+    dry_run=False,
+    password_mode=SERIAL,
+    hash_workers=None,
+    deactivate=True,
+    max_deactivate=None,
+):
+    """
+    Sync each batch (a list of account dicts, e.g. one SIS page) before the
+    next one is requested, so a caller's generator can checkpoint after the
+    ``yield``. New accounts' passwords are hashed as ``password_mode`` says
+    (see passwords.py). Missing accounts are only deactivated if
+    ``deactivate`` is set, i.e. ``batches`` is the whole feed, and only if
+    they are at most ``max_deactivate`` (a fraction; None for no limit) of
+    the active SIS-managed accounts; otherwise they are counted as
+    ``withheld``. Returns a SyncResult; ``dry_run`` only counts.
+    """
+    result = SyncResult()
+    seen = set()
+    with password_hasher(password_mode, hash_workers) as hash_all:
+        for batch in batches:
+            # A username listed twice keeps its first record
+            batch = [account for account in batch if account["username"] not in seen]
+            _sync_batch(batch, result, dry_run, hash_all)
+            seen.update(account["username"] for account in batch)
+    if deactivate:
+        _deactivate_missing(seen, result, dry_run, max_deactivate)
+    return result
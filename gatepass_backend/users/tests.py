@@ -1,3 +1,478 @@
-from django.test import TestCase
+import fcntl
+import io
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from gate_logs.models import GateLog
+from visitors.models import Visitor, VisitorConfirmation
+
+from . import authentication, dashboard, events, search
+from .models import User
+from .serializers import validate_phone_format
+from .sis import mock_sis, passwords
+from .sis.adapter import Checkpoint, Page, SISAdapter, SISError
+from .sis.sync import sync_accounts
+
+
+class EventStreamTicketTests(TestCase):
+    def setUp(self):
+        self.guard = User.objects.create_user("grd", password="pw123456", role="guard")
+        self.client = APIClient()
+        self.client.force_authenticate(self.guard)
+
+    def ticket(self):
+        response = self.client.post("/api/events/ticket/")
+        self.assertEqual(response.status_code, 200)
+        return response.data["ticket"]
+
+    async def async_client_ticket(self):
+        return await sync_to_async(self.ticket)()
+
+    def test_ticket_is_single_use(self):
+        ticket = self.ticket()
+        self.assertEqual(events.redeem_ticket(ticket), self.guard.pk)
+        self.assertIsNone(events.redeem_ticket(ticket))
+
+    def test_expired_or_forged_ticket_is_rejected(self):
+        ticket = self.ticket()
+        with override_settings(EVENTS={"TICKET_MAX_AGE": -1}):
+            self.assertIsNone(events.redeem_ticket(ticket))
+        forged = signing.dumps({"user": self.guard.pk, "nonce": "x"}, salt="other")
+        self.assertIsNone(events.redeem_ticket(forged))
+
+    def test_students_cannot_get_tickets(self):
+        student = User.objects.create_user("stu", password="pw123456", role="student")
+        self.client.force_authenticate(student)
+        self.assertEqual(self.client.post("/api/events/ticket/").status_code, 403)
+
+    async def test_stream_rejects_used_ticket(self):
+        ticket = await self.async_client_ticket()
+        events.redeem_ticket(ticket)
+        with mock.patch.object(events, "claim_streams", return_value=True):
+            response = await self.async_client.get("/api/events/", {"ticket": ticket})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_second_process_refuses_streams(self):
+        ticket = await self.async_client_ticket()
+        with mock.patch.object(events, "claim_streams", return_value=False):
+            response = await self.async_client.get("/api/events/", {"ticket": ticket})
+        self.assertEqual(response.status_code, 503)
+
+    def test_only_one_process_claims_streams(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            lock_file = Path(tmp) / "events.lock"
+            with (
+                override_settings(EVENTS={"LOCK_FILE": str(lock_file)}),
+                mock.patch.object(events, "_stream_lock", None),
+                open(lock_file, "w") as other,
+            ):
+                # Another process holding the lock (flock is per open file)
+                fcntl.flock(other, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                with self.assertLogs("users.events", "ERROR"):
+                    self.assertFalse(events.claim_streams())
+                fcntl.flock(other, fcntl.LOCK_UN)
+                self.assertTrue(events.claim_streams())
+                events._stream_lock.close()
+
+
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        authentication.clear()
+        self.addCleanup(authentication.clear)
+        shared = mock.patch.object(authentication, "shares_versions", return_value=True)
+        shared.start()
+        self.addCleanup(shared.stop)
+        self.guard = User.objects.create_user("grd", password="pw123456", role="guard")
+        self.client = APIClient()
+        response = self.client.post(
+            "/api/auth/token/", {"username": "grd", "password": "pw123456"}, format="json"
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def ticket(self):
+        return self.client.post("/api/events/ticket/")
+
+    def held_by_another_worker(self):
+        # bump_version only forgets the user in this process
+        return authentication._users.get(str(self.guard.pk))
+
+    def test_change_applies_to_users_cached_elsewhere(self):
+        self.assertEqual(self.ticket().status_code, 200)
+        entry = self.held_by_another_worker()
+        self.assertIsNotNone(entry)
+        User.objects.filter(pk=self.guard.pk).update(role="student")
+        with self.captureOnCommitCallbacks(execute=True):
+            authentication.bump_version(self.guard)
+        authentication._users[str(self.guard.pk)] = entry
+        self.assertEqual(self.ticket().status_code, 403)
+
+    def test_outdated_token_user_is_not_cached(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            authentication.bump_version(self.guard)
+        self.assertEqual(self.ticket().status_code, 200)
+        self.assertIsNone(self.held_by_another_worker())
+        self.assertEqual(cache.get(authentication._version_key(self.guard.pk)), 1)
+
+    def test_load_racing_a_bump_does_not_restore_old_version(self):
+        stale = User.objects.get(pk=self.guard.pk)
+
+        def load_then_bump(auth, token):
+            # The bump commits after this request has read the user
+            with self.captureOnCommitCallbacks(execute=True):
+                authentication.bump_version(self.guard)
+            return stale
+
+        with mock.patch.object(
+            JWTAuthentication, "get_user", autospec=True, side_effect=load_then_bump
+        ):
+            self.assertEqual(self.ticket().status_code, 200)
+        self.assertEqual(cache.get(authentication._version_key(self.guard.pk)), 1)
+        User.objects.filter(pk=self.guard.pk).update(role="student")
+        self.assertEqual(self.ticket().status_code, 403)
+
+    def test_deactivated_user_is_refused_everywhere(self):
+        self.ticket()
+        entry = self.held_by_another_worker()
+        with self.captureOnCommitCallbacks(execute=True):
+            # As the SIS sync deactivates accounts
+            User.objects.filter(pk=self.guard.pk).update(
+                is_active=False, token_version=F("token_version") + 1
+            )
+            authentication.expire(self.guard.pk)
+        authentication._users[str(self.guard.pk)] = entry
+        self.assertEqual(self.ticket().status_code, 401)
+
+
+class DashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user("adm", password="pw123456", role="admin")
+        self.scholar = User.objects.create_user(
+            "stu", password="pw123456", role="student", is_day_scholar=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def summary(self):
+        response = self.client.get("/api/dashboard/summary/")
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def is_cached(self):
+        return cache.get(dashboard.CACHE_KEY) is not None
+
+    def test_gate_traffic_keeps_cache(self):
+        self.summary()
+        guard = User.objects.create_user("grd", password="pw123456", role="guard")
+        self.summary()
+        self.client.force_authenticate(guard)
+        self.client.post(f"/api/day-scholars/{self.scholar.pk}/sign-in/")
+        APIClient().post("/api/auth/token/", {"username": "stu", "password": "pw123456"})
+        Visitor.objects.create(name="Jane Doe", national_id="12345678", host_name="Dr. Smith")
+        self.assertTrue(self.is_cached())
+
+    def test_admin_changes_clear_cache(self):
+        self.summary()
+        self.client.post(f"/api/users/{self.scholar.pk}/ban/")
+        self.assertFalse(self.is_cached())
+        self.assertEqual(self.summary()["users"]["banned"], 1)
+        User.objects.create_user("new", password="pw123456")
+        self.assertFalse(self.is_cached())
+
+    def test_overdue_count_matches_sweeper(self):
+        late = timezone.now() - timedelta(minutes=5)
+        Visitor.objects.create(
+            name="Jane Doe", national_id="12345678", host_name="Dr. Smith", expected_end_time=late
+        )
+        self.assertEqual(self.summary()["on_campus"]["overdue_visitors"], 1)
+        self.assertEqual(len(self.client.get("/api/visitors/overdue/").data), 1)
+
+
+class SparseFieldsTests(TestCase):
+    def setUp(self):
+        self.guard = User.objects.create_user(
+            "grd", password="pw123456", role="guard", first_name="Gate", last_name="Keeper"
+        )
+        for n in range(3):
+            visitor = Visitor.objects.create(
+                name=f"Visitor {n}",
+                national_id=f"1234567{n}",
+                host_name="Dr. Smith",
+                guard=self.guard,
+            )
+            VisitorConfirmation.objects.create(
+                visitor=visitor, confirmation_type="EXPECTED", confirmed_by="Dr. Smith"
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.guard)
+
+    def visitors(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/visitors/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data["results"], [q["sql"] for q in queries]
+
+    def test_all_fields_join_and_prefetch(self):
+        rows, queries = self.visitors()
+        self.assertEqual(rows[0]["guard_name"], "Gate Keeper")
+        self.assertEqual(len(rows[0]["confirmations"]), 1)
+        # Count, visitors joined to their guard, confirmations
+        self.assertEqual(len(queries), 3)
+        self.assertIn('JOIN "users_user"', queries[1])
+
+    def test_fields_limits_output_and_queries(self):
+        rows, queries = self.visitors(fields="id,name,status")
+        self.assertEqual(list(rows[0]), ["id", "name", "status"])
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn("users_user", queries[1])
+
+    def test_omit_drops_prefetch(self):
+        rows, queries = self.visitors(omit="confirmations")
+        self.assertNotIn("confirmations", rows[0])
+        self.assertIn("guard_name", rows[0])
+        self.assertEqual(len(queries), 2)
+
+    def test_expand_nests_related_object_in_one_query(self):
+        GateLog.objects.create(guard=self.guard, log_type="SCHOLAR_IN")
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/gate-logs/", {"fields": "id,guard", "expand": "guard"})
+        row = response.data["results"][0]
+        self.assertEqual(row["guard"]["username"], "grd")
+        self.assertEqual(set(row), {"id", "guard"})
+
+    def test_unknown_names_are_ignored(self):
+        rows, _ = self.visitors(fields="id,nope", expand="nope")
+        self.assertEqual(list(rows[0]), ["id"])
+
+    def test_writes_return_every_field(self):
+        response = self.client.post(
+            "/api/visitors/?fields=id",
+            {"name": "Jane Doe", "national_id": "87654321", "host_name": "Dr. Smith"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertIn("qr_token", response.data)
+
+
+class PhoneFormatTests(TestCase):
+    def test_recognised_numbers_are_stored_as_e164(self):
+        self.assertEqual(validate_phone_format("0712 345 678"), "+254712345678")
+        self.assertEqual(validate_phone_format("+44 20 7946 0958"), "+442079460958")
+
+    def test_unrecognised_numbers_are_kept_as_typed(self):
+        self.assertEqual(validate_phone_format("+999 123456"), "+999 123456")
+
+
+class SearchTests(TestCase):
+    FIELDS = ["first_name", "last_name", "student_id", "username"]
+
+    def setUp(self):
+        for username, first, last in (
+            ("s1", "Amina", "Otieno"),
+            ("s2", "Amos", "Kariuki"),
+            ("s3", "Brian", "Amin"),
+            ("s4", "Jon", "Mwangi"),
+            ("s5", "Jonathan", "Mwangi"),
+        ):
+            User.objects.create_user(
+                username,
+                password="pw123456",
+                first_name=first,
+                last_name=last,
+                is_day_scholar=True,
+            )
+        guard = User.objects.create_user("grd", password="pw123456", role="guard")
+        self.client = APIClient()
+        self.client.force_authenticate(guard)
+
+    def names(self, users):
+        return [user.first_name for user in users]
+
+    def scholars(self, **params):
+        response = self.client.get("/api/day-scholars/", params)
+        self.assertEqual(response.status_code, 200)
+        return [row["first_name"] for row in response.data]
+
+    def test_every_word_must_prefix_a_column(self):
+        with mock.patch.object(search, "supports_trigrams", return_value=False):
+            matches = search.matching(User.objects.order_by("username"), self.FIELDS, "am")
+            self.assertEqual(self.names(matches), ["Amina", "Amos", "Brian"])
+            matches = search.matching(User.objects.all(), self.FIELDS, "am OTI")
+            self.assertEqual(self.names(matches), ["Amina"])
+
+    def test_search_returns_at_most_limit(self):
+        self.assertEqual(self.scholars(search="am"), ["Amina", "Amos", "Brian"])
+        self.assertEqual(len(self.scholars(search="am", limit=2)), 2)
+        self.assertEqual(len(self.scholars(search="a", limit=1000)), 3)
+
+    def test_trigram_predicates_are_index_friendly(self):
+        with mock.patch.object(search, "supports_trigrams", return_value=True):
+            sql = str(search.matching(User.objects.all(), self.FIELDS, "amina").query)
+        self.assertIn('"users_user"."first_name" ILIKE amina%', sql)
+        self.assertIn('amina <% "users_user"."first_name"', sql)
+        self.assertNotIn("UPPER(", sql)
+
+    def test_prefix_pattern_escapes_wildcards(self):
+        self.assertEqual(search._prefix_pattern("5_%"), "5\\_\\%%")
+
+    def test_closest_match_ranks_first(self):
+        if not search.supports_trigrams():
+            self.skipTest("needs PostgreSQL with pg_trgm")
+        self.assertEqual(self.scholars(search="jon")[:2], ["Jon", "Jonathan"])
+        self.assertEqual(self.scholars(search="jonathon")[0], "Jonathan")
+
+    def test_postgresql_fallback_uses_prefix_index(self):
+        if connection.vendor != "postgresql" or search.supports_trigrams():
+            self.skipTest("needs PostgreSQL without pg_trgm")
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = User.objects.filter(first_name__istartswith="am").explain()
+        self.assertIn("user_first_name_upper_idx", plan)
+
+
+class UserDirectoryTests(TestCase):
+    def setUp(self):
+        admin = User.objects.create_user("adm", password="pw123456", role="admin")
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+    def test_etag_must_match_exactly(self):
+        etag = self.client.get("/api/users/")["ETag"]
+        matched = self.client.get("/api/users/", HTTP_IF_NONE_MATCH=f'"stale", {etag}')
+        self.assertEqual(matched.status_code, 304)
+        # Contains the ETag as a substring but is a different tag
+        partial = self.client.get("/api/users/", HTTP_IF_NONE_MATCH=f'"x{etag[1:]}')
+        self.assertEqual(partial.status_code, 200)
+
+
+class SISSyncTests(TestCase):
+    def setUp(self):
+        self.accounts = [mock_sis._student(i) for i in range(1, 21)]
+
+    def sync(self, accounts, **options):
+        return sync_accounts(accounts, password_mode=passwords.DEFERRED, **options)
+
+    def test_second_run_changes_nothing(self):
+        self.assertEqual(self.sync(self.accounts).created, 20)
+        result = self.sync(self.accounts)
+        self.assertEqual((result.created, result.updated, result.unchanged), (0, 0, 20))
+
+    def test_changed_account_is_updated_and_its_tokens_outdated(self):
+        self.sync(self.accounts)
+        self.accounts[0] = {**self.accounts[0], "last_name": "Renamed"}
+        self.assertEqual(self.sync(self.accounts).updated, 1)
+        user = User.objects.get(username=self.accounts[0]["username"])
+        self.assertEqual((user.last_name, user.token_version), ("Renamed", 1))
+
+    def test_missing_account_is_deactivated(self):
+        self.sync(self.accounts)
+        local = User.objects.create_user("local", password="pw123456")
+        result = self.sync(self.accounts[1:], max_deactivate=0.1)
+        self.assertEqual(result.deactivated, 1)
+        self.assertFalse(User.objects.get(username=self.accounts[0]["username"]).is_active)
+        local.refresh_from_db()
+        self.assertTrue(local.is_active)
+
+    def test_empty_feed_deactivates_nobody(self):
+        self.sync(self.accounts)
+        result = self.sync([], max_deactivate=0.1)
+        self.assertEqual((result.deactivated, result.withheld, result.managed), (0, 20, 20))
+        self.assertEqual(User.objects.filter(is_active=True).count(), 20)
+
+    def test_mass_deactivation_can_be_allowed(self):
+        self.sync(self.accounts)
+        self.assertEqual(self.sync(self.accounts[:5], max_deactivate=None).deactivated, 15)
+
+    def test_command_warns_instead_of_deactivating(self):
+        self.sync(self.accounts)
+        empty = [Page(number=1, total_pages=1, accounts=[])]
+        stderr = io.StringIO()
+        with (
+            mock.patch.object(SISAdapter, "iter_pages", return_value=iter(empty)),
+            tempfile.TemporaryDirectory() as tmp,
+            override_settings(SIS={**settings.SIS, "CHECKPOINT": Path(tmp) / "checkpoint.json"}),
+        ):
+            call_command("sync_from_sis", stdout=io.StringIO(), stderr=stderr)
+        self.assertIn("Not deactivating 20 of 20", stderr.getvalue())
+        self.assertEqual(User.objects.filter(is_active=True).count(), 20)
+
+
+class DeferredPasswordTests(TestCase):
+    def setUp(self):
+        self.account = mock_sis._student(1)
+        sync_accounts([self.account], password_mode=passwords.DEFERRED)
+        self.user = User.objects.get(username=self.account["username"])
+
+    def test_default_password_gets_placeholder_hash(self):
+        self.assertTrue(self.user.password.startswith("deferred_sha256$"))
+        self.assertTrue(self.user.must_change_password)
+
+    def test_first_login_rehashes_with_preferred_hasher(self):
+        response = APIClient().post(
+            "/api/auth/token/",
+            {"username": self.account["username"], "password": self.account["password"]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$"))
+        self.assertTrue(self.user.check_password(self.account["password"]))
+
+    def test_wrong_password_keeps_placeholder(self):
+        self.assertFalse(self.user.check_password("not-the-id"))
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("deferred_sha256$"))
+
+
+class SISResumeTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "checkpoint.json"
+        settings_patch = override_settings(SIS={**settings.SIS, "URL": "", "CHECKPOINT": self.path})
+        settings_patch.enable()
+        self.addCleanup(settings_patch.disable)
+
+    def resume(self, feed):
+        Checkpoint(self.path, "mock", 50).save(Page(number=1, total_pages=5, accounts=[], feed=feed))
+        stdout = io.StringIO()
+        call_command(
+            "sync_from_sis", "--resume", "--page-size=50", "--password-mode=deferred", stdout=stdout
+        )
+        return stdout.getvalue()
+
+    def test_resume_continues_after_checkpoint(self):
+        output = self.resume(f"snapshot:mock-{mock_sis.DEFAULT_STUDENT_COUNT}")
+        self.assertIn("Resuming after page 1", output)
+        self.assertEqual(User.objects.count(), mock_sis.total_accounts() - 50)
+        self.assertFalse(self.path.exists())
+
+    def test_resume_refused_when_feed_changed(self):
+        with self.assertRaisesMessage(CommandError, "The SIS feed changed"):
+            self.resume("snapshot:mock-150")
+        self.assertFalse(User.objects.exists())
+
+    def test_unreadable_page_is_an_sis_error(self):
+        adapter = SISAdapter(url="http://sis.invalid/accounts/")
+        adapter.retries = 0
+        with (
+            mock.patch("users.sis.adapter.urlopen", return_value=io.BytesIO(b'{"page": 1, "resu')),
+            self.assertRaises(SISError),
+        ):
+            adapter._fetch_page(1)
@@ -1,5 +1,13 @@
-from gate_logs.models import GateLog
-from django.db.models import Q
+import hashlib
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.http import parse_etags
+from gate_logs import buffer as gate_log_buffer
 from rest_framework import generics, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -7,7 +15,9 @@ from rest_framework.response import Response
 
 from users.permissions import IsAdmin, IsGuard
 
+from . import authentication, dashboard, events, search
 from .models import User
+from .pagination import UserCursorPagination
 from .serializers import (
     UserProfileSerializer,
     UserRegistrationSerializer,
@@ -48,10 +58,19 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
             serializer.save()
 
 
+# Columns the admin directory's ?search= matches (users/search.py)
+USER_SEARCH_FIELDS = ["first_name", "last_name", "username", "student_id", "email"]
+
+
+def _etag(data):
+    body = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder).encode()
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
 class AdminUserViewSet(viewsets.ModelViewSet):
     """
     Admin-only CRUD for all users.
-    GET    /api/users/           → list all users
+    GET    /api/users/           → list users (filtered, searchable, cursor-paginated)
     POST   /api/users/           → create a user (any role)
     GET    /api/users/{id}/      → retrieve a user
     PUT    /api/users/{id}/      → full update
@@ -63,7 +82,37 @@ class AdminUserViewSet(viewsets.ModelViewSet):
 
     queryset = User.objects.all().order_by("id")
     permission_classes = [IsAdmin]
-    pagination_class = None  # Admins always need the full list for search/filter
+    pagination_class = UserCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != "list":
+            return queryset
+        params = self.request.query_params
+        if params.get("role"):
+            queryset = queryset.filter(role=params["role"])
+        for flag in ("is_banned", "is_day_scholar"):
+            if params.get(flag) in ("true", "false"):
+                queryset = queryset.filter(**{flag: params[flag] == "true"})
+        if params.get("day_scholar_status"):
+            queryset = queryset.filter(day_scholar_status=params["day_scholar_status"])
+        term = (params.get("search") or "").strip()
+        if term:
+            queryset = search.matching(queryset, USER_SEARCH_FIELDS, term)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        """
+        Pages carry an ETag of their content; a matching If-None-Match gets
+        an empty 304 so an unchanged directory is not sent again.
+        """
+        response = super().list(request, *args, **kwargs)
+        etag = _etag(response.data)
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
 
     def get_serializer_class(self):
         if self.action == "create":
@@ -72,6 +121,10 @@ class AdminUserViewSet(viewsets.ModelViewSet):
             return AdminUserUpdateSerializer
         return UserProfileSerializer
 
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        authentication.bump_version(serializer.instance)
+
     @action(detail=True, methods=["post"])
     def ban(self, request, pk=None):
         user = self.get_object()
@@ -79,6 +132,7 @@ class AdminUserViewSet(viewsets.ModelViewSet):
         user.is_banned = True
         user.ban_reason = reason
         user.save(update_fields=["is_banned", "ban_reason"])
+        authentication.bump_version(user)
         return Response({"status": "banned", "user": UserProfileSerializer(user).data})
 
     @action(detail=True, methods=["post"])
@@ -87,13 +141,117 @@ class AdminUserViewSet(viewsets.ModelViewSet):
         user.is_banned = False
         user.ban_reason = ""
         user.save(update_fields=["is_banned", "ban_reason"])
+        authentication.bump_version(user)
         return Response({"status": "unbanned", "user": UserProfileSerializer(user).data})
 
 
+class DashboardSummaryView(generics.GenericAPIView):
+    """
+    GET /api/dashboard/summary/ — every number the admin dashboard shows, in one
+    small response built from aggregates and cached briefly.
+    """
+
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return Response(dashboard.get_summary())
+
+
+class EventTicketView(generics.GenericAPIView):
+    """
+    POST /api/events/ticket/ — single-use ticket for opening one event
+    stream. EventSource cannot send headers, and a ticket in the URL is
+    harmless once used, unlike the access token.
+    """
+
+    permission_classes = [IsGuard | IsAdmin]
+
+    def post(self, request):
+        return Response(
+            {
+                "ticket": events.issue_ticket(request.user),
+                "expires_in": settings.EVENTS["TICKET_MAX_AGE"],
+            }
+        )
+
+
+STREAM_HEARTBEAT = 15  # seconds between keep-alive comments
+STREAM_MAX_AGE = 300  # seconds before the client is asked to reconnect
+
+
+def _stream_user(ticket):
+    """Guard/admin a stream ticket was issued to, or None."""
+    user_id = events.redeem_ticket(ticket)
+    user = User.objects.filter(pk=user_id, is_active=True).first() if user_id else None
+    if user is None or user.is_banned or user.role not in ("guard", "admin"):
+        return None
+    return user
+
+
+async def event_stream(request):
+    """
+    GET /api/events/?ticket=<stream ticket> — Server-Sent Events stream of new
+    gate logs, visitor changes and overdue alerts (see users/events.py).
+
+    Opened with a ticket from EventTicketView. Guards only receive their own
+    gate logs, matching /api/gate-logs/. The stream closes after
+    STREAM_MAX_AGE so access is re-checked when the client reconnects with a
+    new ticket. Needs an ASGI server, and only one process may serve streams.
+    """
+    from visitors import overdue
+
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"error": "Event streams need the ASGI server."}, status=501)
+    if not events.claim_streams():
+        return JsonResponse(
+            {"error": "Event streams are served by another worker; run a single worker."},
+            status=503,
+        )
+    user = await sync_to_async(_stream_user)(request.GET.get("ticket", ""))
+    if user is None:
+        return JsonResponse({"error": "Valid guard or admin stream ticket required."}, status=401)
+
+    async def stream():
+        subscription = events.subscribe()
+        loop = subscription.loop
+        deadline = loop.time() + STREAM_MAX_AGE
+        try:
+            yield "retry: 3000\n\n"
+            while loop.time() < deadline:
+                event = await subscription.get(STREAM_HEARTBEAT)
+                if event is None:
+                    # Quiet period: keep proxies from closing us, and let the
+                    # overdue sweeper run even though nobody is polling alerts
+                    await sync_to_async(overdue.sweep_if_due)()
+                    yield ": keep-alive\n\n"
+                    continue
+                if (
+                    event["kind"] == events.GATE_LOG
+                    and user.role == "guard"
+                    and event["data"]["guard"] != user.pk
+                ):
+                    continue
+                data = json.dumps(event["data"], default=str)
+                yield f"id: {event['id']}\nevent: {event['kind']}\ndata: {data}\n\n"
+        finally:
+            events.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # Don't let nginx buffer the stream
+    return response
+
+
+SEARCH_LIMIT = 25
+MAX_SEARCH_LIMIT = 100
+# Columns the day scholar ?search= ranks on (users/search.py)
+SCHOLAR_SEARCH_FIELDS = ["first_name", "last_name", "student_id", "username"]
+
+
 class DayScholarViewSet(viewsets.ReadOnlyModelViewSet):
     """
     Guards use this to list day scholars and toggle their on/off campus status.
-    GET  /api/day-scholars/          → list all day scholars
+    GET  /api/day-scholars/          → list all day scholars (?search= for top matches)
     POST /api/day-scholars/{id}/sign-in/   → mark ON_CAMPUS
     POST /api/day-scholars/{id}/sign-out/  → mark OFF_CAMPUS
     """
@@ -103,23 +261,31 @@ class DayScholarViewSet(viewsets.ReadOnlyModelViewSet):
     pagination_class = None
 
     def get_queryset(self):
-        queryset = User.objects.filter(is_day_scholar=True)
-        search = (self.request.query_params.get("search") or "").strip()
-        if search:
-            queryset = queryset.filter(
-                Q(first_name__icontains=search)
-                | Q(last_name__icontains=search)
-                | Q(student_id__icontains=search)
-                | Q(username__icontains=search)
-            )
-        return queryset.order_by("first_name", "last_name", "student_id")
+        return User.objects.filter(is_day_scholar=True).order_by(
+            "first_name", "last_name", "student_id"
+        )
+
+    def list(self, request, *args, **kwargs):
+        """
+        ?search= returns the best ``?limit=`` matches (default 25, max 100),
+        ranked on PostgreSQL; without it, every day scholar.
+        """
+        term = (request.query_params.get("search") or "").strip()
+        if not term:
+            return super().list(request, *args, **kwargs)
+        try:
+            limit = min(int(request.query_params.get("limit", SEARCH_LIMIT)), MAX_SEARCH_LIMIT)
+        except ValueError:
+            limit = SEARCH_LIMIT
+        matches = search.ranked(self.get_queryset(), SCHOLAR_SEARCH_FIELDS, term, max(limit, 1))
+        return Response(self.get_serializer(matches, many=True).data)
 
     @action(detail=True, methods=["post"], url_path="sign-in")
     def sign_in(self, request, pk=None):
         scholar = self.get_object()
         scholar.day_scholar_status = "ON_CAMPUS"
         scholar.save(update_fields=["day_scholar_status"])
-        GateLog.objects.create(
+        gate_log_buffer.log_event(
             guard=request.user,
             log_type="SCHOLAR_IN",
             student=scholar,
@@ -133,7 +299,7 @@ class DayScholarViewSet(viewsets.ReadOnlyModelViewSet):
         scholar = self.get_object()
         scholar.day_scholar_status = "OFF_CAMPUS"
         scholar.save(update_fields=["day_scholar_status"])
-        GateLog.objects.create(
+        gate_log_buffer.log_event(
             guard=request.user,
             log_type="SCHOLAR_OUT",
             student=scholar,
@@ -2,6 +2,8 @@ from rest_framework import serializers
 import re
 import bleach
 
+from users.fieldsets import SparseFieldsSerializerMixin
+
 from .models import Vehicle
 
 def sanitize_text(value):
@@ -9,7 +11,7 @@ def sanitize_text(value):
         return bleach.clean(value, tags=[], attributes={}, strip=True)
     return value
 
-class VehicleSerializer(serializers.ModelSerializer):
+class VehicleSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     owner_name = serializers.CharField(source="owner.get_full_name", read_only=True)
     owner_student_id = serializers.CharField(source="owner.student_id", read_only=True)
 
@@ -21,11 +23,14 @@ class VehicleSerializer(serializers.ModelSerializer):
             "make",
             "model",
             "color",
+            "owner",
             "owner_name",
             "owner_student_id",
             "registered_at",
         ]
-        read_only_fields = ["registered_at"]
+        read_only_fields = ["owner", "registered_at"]
+        related_fields = {"owner_name": ["owner"], "owner_student_id": ["owner"]}
+        expandable_fields = {"owner": "users.serializers.UserSummarySerializer"}
 
     def validate_plate_number(self, value):
         """Enforce Kenyan plate format, e.g. KCA 123A or KCB 1234."""
@@ -1,3 +1,51 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from gate_logs.models import GateLog
+from users.models import User
+
+from .models import Vehicle
+
+
+class OnCampusTests(TestCase):
+    def setUp(self):
+        self.guard = User.objects.create_user("grd", password="pw123456", role="guard")
+        owner = User.objects.create_user(
+            "stu", password="pw123456", role="student", first_name="Amina", last_name="Otieno"
+        )
+        self.vehicle = Vehicle.objects.create(
+            owner=owner, plate_number="KDA 123X", make="Toyota", model="Axio", color="Silver"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.guard)
+
+    def on_campus(self):
+        response = self.client.get("/api/vehicles/on-campus/")
+        self.assertEqual(response.status_code, 200)
+        return response.data["results"]
+
+    def test_lists_vehicles_inside_newest_first(self):
+        GateLog.objects.create(log_type="VEHICLE_ENTRY", vehicle=self.vehicle)
+        GateLog.objects.create(
+            log_type="VEHICLE_ENTRY", plate_number_raw="KBB 456Y", driver_name="Visitor"
+        )
+        rows = self.on_campus()
+        self.assertEqual([row["plate_number"] for row in rows], ["KBB 456Y", "KDA 123X"])
+        self.assertEqual(rows[1]["owner_name"], "Amina Otieno")
+
+    def test_exit_removes_vehicle(self):
+        GateLog.objects.create(log_type="VEHICLE_ENTRY", vehicle=self.vehicle)
+        GateLog.objects.create(log_type="VEHICLE_EXIT", vehicle=self.vehicle)
+        self.assertEqual(self.on_campus(), [])
+
+    def test_reads_presence_not_gate_logs(self):
+        for n in range(3):
+            GateLog.objects.create(log_type="VEHICLE_ENTRY", plate_number_raw=f"KCC {n}00Z")
+        GateLog.objects.create(log_type="VEHICLE_ENTRY", vehicle=self.vehicle)
+        # Page count, presence rows with their vehicles and owners
+        with self.assertNumQueries(2):
+            self.assertEqual(len(self.on_campus()), 4)
+
+    def test_students_cannot_list(self):
+        self.client.force_authenticate(self.vehicle.owner)
+        self.assertEqual(self.client.get("/api/vehicles/on-campus/").status_code, 403)
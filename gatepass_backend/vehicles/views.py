@@ -2,30 +2,35 @@ from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from gate_logs.models import VehiclePresence
+from gate_logs.serializers import VehiclePresenceSerializer
+from users.fieldsets import SparseFieldsViewMixin
 from users.permissions import IsAdmin, IsGuard, IsStudent
 
 from .models import Vehicle
 from .serializers import VehicleSerializer
 
 
-class VehicleViewSet(viewsets.ModelViewSet):
+class VehicleViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     Students register and manage their own vehicles.
     Guards can look up any vehicle by plate number.
+    GET /api/vehicles/on-campus/ → vehicles currently inside, registered or not (guards/admins)
     """
 
     serializer_class = VehicleSerializer
 
     def get_permissions(self):
-        if self.action == "lookup":
+        if self.action in ("lookup", "on_campus"):
             return [(IsGuard | IsAdmin)()]
         return [(IsStudent | IsGuard | IsAdmin)()]
 
     def get_queryset(self):
         user = self.request.user
+        queryset = self.with_related(Vehicle.objects.all())
         if user.role == "student":
-            return Vehicle.objects.filter(owner=user)
-        return Vehicle.objects.select_related("owner").all()
+            return queryset.filter(owner=user)
+        return queryset
 
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
@@ -45,3 +50,17 @@ class VehicleViewSet(viewsets.ModelViewSet):
             )
         except Vehicle.DoesNotExist:
             return Response({"status": "NOT_FOUND", "plate_number": plate}, status=404)
+
+    @action(detail=False, methods=["get"], url_path="on-campus")
+    def on_campus(self, request):
+        """GET /api/vehicles/on-campus/ — newest entries first, from the presence table."""
+        queryset = (
+            VehiclePresence.objects.filter(is_on_campus=True)
+            .select_related("vehicle__owner")
+            .order_by("-entered_at")
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = VehiclePresenceSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        return Response(VehiclePresenceSerializer(queryset, many=True).data)
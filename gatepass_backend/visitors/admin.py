@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Visitor, VisitorConfirmation
+from .models import Visitor, VisitorAlert, VisitorConfirmation
 
 
 @admin.register(Visitor)
@@ -21,7 +21,7 @@ class VisitorAdmin(admin.ModelAdmin):
             "fields": ("host_name", "host_email", "host_phone", "department", "office_location")
         }),
         ("Status & Timing", {
-            "fields": ("status", "entry_time", "exit_time", "expected_end_time")
+            "fields": ("status", "entry_time", "exit_time", "expected_end_time", "overdue_since")
         }),
         ("System", {
             "fields": ("qr_token", "guard", "created_at", "updated_at"),
@@ -36,3 +36,11 @@ class VisitorConfirmationAdmin(admin.ModelAdmin):
     list_filter = ["confirmation_type", "confirmed_at"]
     search_fields = ["visitor__name", "confirmed_by"]
     date_hierarchy = "confirmed_at"
+
+
+@admin.register(VisitorAlert)
+class VisitorAlertAdmin(admin.ModelAdmin):
+    list_display = ["visitor", "kind", "created_at", "resolved_at"]
+    list_filter = ["kind", "created_at"]
+    search_fields = ["visitor__name"]
+    date_hierarchy = "created_at"
@@ -0,0 +1,165 @@
+"""
+Bulk visitor pre-registration for POST /api/visitors/bulk/ and
+``manage.py import_visitors``.
+
+Rows (from a CSV or JSON file, or a JSON body) are validated with the normal
+VisitorSerializer in batches of ``BATCH_SIZE``; each batch checks for
+repeats against the file and the existing pre-registrations with one query
+and inserts its valid rows with a single bulk_create. Invalid rows are
+reported back rather than failing the whole import. When QR files are
+stored on disk they are rendered on a process pool once all rows are in.
+
+Pre-registered visits are PENDING until the guard approves them on arrival,
+which starts their clock (see VisitorViewSet.approve_visitor).
+"""
+
+import csv
+import io
+import json
+
+from django.db import transaction
+from django.utils import timezone
+
+from assets import qr
+from users import events
+
+from .models import Visitor
+from .serializers import VisitorSerializer
+
+MAX_ROWS = 5000
+BATCH_SIZE = 500
+
+
+def read_rows(upload):
+    """
+    Rows of an uploaded ``.json`` (a list of objects, or {"visitors": [...]})
+    or CSV file (header row of VisitorSerializer field names). Blank CSV
+    cells are left out so field defaults apply. Raises ValueError.
+    """
+    try:
+        text = upload.read().decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("File must be UTF-8 encoded.")
+
+    if upload.name.lower().endswith(".json"):
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Invalid JSON: {exc}")
+        if isinstance(data, dict):
+            data = data.get("visitors")
+        if not isinstance(data, list):
+            raise ValueError("JSON file must contain a list of visitors.")
+        return data
+
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames:
+        raise ValueError("CSV file has no header row.")
+    return [
+        {
+            key.strip(): value.strip()
+            for key, value in row.items()
+            if key and isinstance(value, str) and value.strip()
+        }
+        for row in reader
+    ]
+
+
+def _validate(index, row):
+    item = {"row": index + 1, "attrs": {}, "errors": {}}
+    if not isinstance(row, dict):
+        item["errors"] = {"non_field_errors": ["Row must be an object."]}
+        return item
+    serializer = VisitorSerializer(data=row)
+    if not serializer.is_valid():
+        item["errors"] = dict(serializer.errors)
+        return item
+    attrs = dict(serializer.validated_data)
+    if attrs.setdefault("status", "PENDING") != "PENDING":
+        item["errors"] = {"status": ["Pre-registered visitors start as PENDING."]}
+    item["attrs"] = attrs
+    return item
+
+
+def _check_duplicates(items, seen):
+    """
+    Flag rows that repeat an earlier row (same document and scheduled time)
+    or a pre-registration that has not been used yet.
+    """
+    if not items:
+        return
+    existing = {
+        (national_id, scheduled_time): pk
+        for national_id, scheduled_time, pk in Visitor.objects.filter(
+            status="PENDING",
+            exit_time__isnull=True,
+            national_id__in={item["attrs"]["national_id"] for item in items},
+        ).values_list("national_id", "scheduled_time", "id")
+    }
+    for item in items:
+        key = (item["attrs"]["national_id"], item["attrs"].get("scheduled_time"))
+        if key in seen:
+            item["errors"] = {"national_id": [f"Same visitor and time as row {seen[key]}."]}
+        elif key in existing:
+            item["errors"] = {"national_id": [f"Already pre-registered (visitor {existing[key]})."]}
+        else:
+            seen[key] = item["row"]
+
+
+def register(rows, guard, dry_run=False):
+    """
+    Validate and insert ``rows`` as visitors pre-registered by ``guard``.
+
+    Returns one result dict per row, in input order, with a status of
+    "created" (or "valid" for a dry run) or "error" and the row's errors.
+    """
+    now = timezone.now()
+    items = []
+    created = []
+    seen = {}
+    for start in range(0, len(rows), BATCH_SIZE):
+        chunk = rows[start : start + BATCH_SIZE]
+        batch = [_validate(index, row) for index, row in enumerate(chunk, start)]
+        items.extend(batch)
+        valid = [item for item in batch if not item["errors"]]
+        _check_duplicates(valid, seen)
+        valid = [item for item in valid if not item["errors"]]
+        if dry_run or not valid:
+            continue
+
+        visitors = []
+        for item in valid:
+            attrs = item["attrs"]
+            # Provisional end from the scheduled time; approval restarts the
+            # clock when the visitor actually arrives (Visitor.start_visit)
+            expected_end_time = None
+            if attrs.get("scheduled_time"):
+                duration = timezone.timedelta(minutes=attrs.get("expected_duration", 60))
+                expected_end_time = attrs["scheduled_time"] + duration
+            visitors.append(
+                Visitor(guard=guard, created_at=now, expected_end_time=expected_end_time, **attrs)
+            )
+        with transaction.atomic():
+            Visitor.objects.bulk_create(visitors)
+            for visitor in visitors:
+                events.publish_on_commit(
+                    events.VISITOR, lambda visitor=visitor: events.visitor_payload(visitor)
+                )
+        for item, visitor in zip(valid, visitors):
+            item["id"] = visitor.pk
+        created.extend(visitors)
+
+    if created:
+        qr.render_batch(Visitor, created)
+
+    results = []
+    for item in items:
+        result = {"row": item["row"]}
+        if item["errors"]:
+            result.update(status="error", errors=item["errors"])
+        elif dry_run:
+            result.update(status="valid")
+        else:
+            result.update(status="created", id=item["id"])
+        results.append(result)
+    return results
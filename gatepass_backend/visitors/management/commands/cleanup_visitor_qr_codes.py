@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from visitors.models import Visitor
+
+FINISHED_STATUSES = ["COMPLETED", "EXPIRED"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete stored QR images of completed or expired visitors. "
+        "Images are served on demand from /api/qr/ instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the files that would be removed",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        finished = Visitor.objects.filter(status__in=FINISHED_STATUSES).exclude(qr_code="")
+        storage = Visitor._meta.get_field("qr_code").storage
+
+        removed = 0
+        rows = list(finished.values_list("pk", "qr_code"))
+        for start in range(0, len(rows), 500):
+            chunk = rows[start : start + 500]
+            if not dry_run:
+                for _, name in chunk:
+                    storage.delete(name)
+                Visitor.objects.filter(pk__in=[pk for pk, _ in chunk]).update(qr_code="")
+            removed += len(chunk)
+
+        prefix = "[DRY RUN] " if dry_run else ""
+        self.stdout.write(self.style.SUCCESS(f"{prefix}Visitor QR files removed: {removed}"))
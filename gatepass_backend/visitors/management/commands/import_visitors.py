@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from users.models import User
+from visitors import bulk
+
+
+class Command(BaseCommand):
+    help = "Pre-register visitors from a CSV or JSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV (with a header row) or .json file")
+        parser.add_argument(
+            "--guard",
+            required=True,
+            help="Username recorded as the registering guard",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate the rows without creating visitors",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            guard = User.objects.get(username=options["guard"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['guard']!r}")
+
+        try:
+            with open(options["path"], "rb") as upload:
+                rows = bulk.read_rows(upload)
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        results = bulk.register(rows, guard, dry_run=options["dry_run"])
+        errors = [result for result in results if result["status"] == "error"]
+        for result in errors:
+            for field, messages in result["errors"].items():
+                self.stdout.write(f"Row {result['row']}: {field}: {' '.join(map(str, messages))}")
+
+        prefix = "[DRY RUN] " if options["dry_run"] else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}Visitors imported: {len(results) - len(errors)}, rows with errors: {len(errors)}"
+            )
+        )
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from visitors import overdue
+
+
+class Command(BaseCommand):
+    help = "Mark overdue visits and record one alert per visit"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=0,
+            help="Keep running and sweep every N seconds (default: sweep once and exit)",
+        )
+
+    def handle(self, *args, **options):
+        every = options["every"]
+        while True:
+            marked, resolved = overdue.sweep()
+            self.stdout.write(
+                self.style.SUCCESS(f"Sweep done. Marked overdue: {marked} | Alerts resolved: {resolved}")
+            )
+            if not every:
+                return
+            close_old_connections()
+            time.sleep(every)
@@ -0,0 +1,52 @@
+# Generated by Django 6.0.2 on 2026-10-17 14:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0003_visitor_qr_code'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitorAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('OVERDUE', 'Visit Overdue')], default='OVERDUE', max_length=20)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='visitor',
+            name='overdue_since',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='visitor',
+            index=models.Index(condition=models.Q(('exit_time__isnull', True), ('overdue_since__isnull', True), ('status__in', ['APPROVED', 'CHECKED_IN', 'IN_MEETING'])), fields=['expected_end_time'], name='visitor_open_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visitor',
+            index=models.Index(condition=models.Q(('exit_time__isnull', True), ('overdue_since__isnull', False), ('status__in', ['APPROVED', 'CHECKED_IN', 'IN_MEETING'])), fields=['overdue_since'], name='visitor_overdue_idx'),
+        ),
+        migrations.AddField(
+            model_name='visitoralert',
+            name='visitor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='visitors.visitor'),
+        ),
+        migrations.AddIndex(
+            model_name='visitoralert',
+            index=models.Index(condition=models.Q(('resolved_at__isnull', True)), fields=['created_at'], name='visitoralert_active_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='visitoralert',
+            constraint=models.UniqueConstraint(fields=('visitor', 'kind'), name='visitoralert_once_per_visit'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 6.0.2 on 2026-10-17 15:10
+#
+# 0002 added qr_token with a callable default, which Django evaluates once for
+# all existing rows, so visitors created before it share a token. Give every
+# duplicate a fresh one before the unique index goes on.
+
+import uuid
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def reissue_duplicate_tokens(apps, schema_editor):
+    Visitor = apps.get_model('visitors', 'Visitor')
+    duplicated = (
+        Visitor.objects.exclude(qr_token=None)
+        .values('qr_token')
+        .annotate(n=Count('id'))
+        .filter(n__gt=1)
+        .values_list('qr_token', flat=True)
+    )
+    for token in list(duplicated):
+        for pk in Visitor.objects.filter(qr_token=token).order_by('id').values_list('pk', flat=True)[1:]:
+            Visitor.objects.filter(pk=pk).update(qr_token=uuid.uuid4(), qr_code='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0004_overdue_sweeper'),
+    ]
+
+    operations = [
+        migrations.RunPython(reissue_duplicate_tokens, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='visitor',
+            name='qr_token',
+            field=models.UUIDField(blank=True, default=uuid.uuid4, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-17 15:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0005_visitor_qr_token_unique'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='visitor',
+            index=models.Index(fields=['-entry_time'], name='visitor_entry_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visitor',
+            index=models.Index(condition=models.Q(('exit_time__isnull', True), ('status__in', ['APPROVED', 'CHECKED_IN', 'IN_MEETING', 'PENDING'])), fields=['-entry_time'], name='visitor_desk_open_idx'),
+        ),
+    ]
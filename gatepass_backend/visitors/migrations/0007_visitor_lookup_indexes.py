@@ -0,0 +1,44 @@
+# Generated by Django 6.0.2 on 2026-10-17 16:05
+#
+# Indexes for the returning-visitor lookup: (national_id, entry_time) for
+# exact document matches and, on PostgreSQL only, a pg_trgm GIN index on name
+# for typo-tolerant search (see users/search.py), if the server ships pg_trgm.
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_name_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return  # Not shipped with this server; search falls back to prefixes
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS visitor_name_trgm_idx '
+        'ON visitors_visitor USING gin (name gin_trgm_ops)'
+    )
+
+
+def drop_name_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS visitor_name_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0006_visitor_desk_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='visitor',
+            index=models.Index(fields=['national_id', '-entry_time'], name='visitor_document_idx'),
+        ),
+        migrations.RunPython(create_name_trigram_index, drop_name_trigram_index),
+    ]
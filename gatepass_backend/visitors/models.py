@@ -1,9 +1,8 @@
 from django.db import models
 from django.utils import timezone
-from django.core.files import File
-from io import BytesIO
+from django.core.files.base import ContentFile
+from assets import qr
 import uuid
-import qrcode
 
 
 # Create your models here.
@@ -29,6 +28,9 @@ class Visitor(models.Model):
         ('DENIED', 'Denied by Host'),
     ]
     
+    # Statuses of a visit that is still under way (visitor on campus)
+    OPEN_STATUSES = ['APPROVED', 'CHECKED_IN', 'IN_MEETING']
+    
     # Basic visitor info
     name = models.CharField(max_length=100)
     national_id = models.CharField(max_length=20)
@@ -56,8 +58,11 @@ class Visitor(models.Model):
     
     # Status and validation
     status = models.CharField(max_length=20, choices=VISIT_STATUS, default='APPROVED')
-    qr_token = models.UUIDField(default=uuid.uuid4, null=True, blank=True)
+    qr_token = models.UUIDField(default=uuid.uuid4, null=True, blank=True, unique=True)
     qr_code = models.ImageField(upload_to="visitor_qr_codes/", blank=True)
+    # Set by the overdue sweeper (visitors/overdue.py); cleared when the
+    # visit is extended past now
+    overdue_since = models.DateTimeField(null=True, blank=True)
     
     # Staff involved
     guard = models.ForeignKey("users.User", on_delete=models.SET_NULL, null=True, related_name='logged_visitors')
@@ -66,21 +71,83 @@ class Visitor(models.Model):
     created_at = models.DateTimeField(null=True, blank=True)
     updated_at = models.DateTimeField(null=True, blank=True)
     
+    class Meta:
+        indexes = [
+            # Returning-visitor lookup: a person's visits by document, newest first
+            models.Index(fields=['national_id', '-entry_time'], name='visitor_document_idx'),
+            # Visitor desk: today's visits, newest first
+            models.Index(fields=['-entry_time'], name='visitor_entry_time_idx'),
+            # Visitor desk: visits from earlier days that are still open/pending
+            models.Index(
+                fields=['-entry_time'],
+                condition=models.Q(
+                    exit_time__isnull=True,
+                    status__in=['APPROVED', 'CHECKED_IN', 'IN_MEETING', 'PENDING'],
+                ),
+                name='visitor_desk_open_idx',
+            ),
+            # Open visits only: what the overdue sweeper scans
+            models.Index(
+                fields=['expected_end_time'],
+                condition=models.Q(
+                    exit_time__isnull=True,
+                    overdue_since__isnull=True,
+                    status__in=['APPROVED', 'CHECKED_IN', 'IN_MEETING'],
+                ),
+                name='visitor_open_end_idx',
+            ),
+            # Open visits already marked overdue: what the overdue list reads
+            models.Index(
+                fields=['overdue_since'],
+                condition=models.Q(
+                    exit_time__isnull=True,
+                    overdue_since__isnull=False,
+                    status__in=['APPROVED', 'CHECKED_IN', 'IN_MEETING'],
+                ),
+                name='visitor_overdue_idx',
+            ),
+        ]
+    
     def save(self, *args, **kwargs):
         if self.expected_duration and self.entry_time and not self.expected_end_time:
             self.expected_end_time = self.entry_time + timezone.timedelta(minutes=self.expected_duration)
         
-        if not self.qr_code:
-            self._generate_qr()
+        # An end time in the future means the visit is not overdue (any longer).
+        # The sweeper marks visits with .update(), so this instance may not
+        # know about the mark; clear it in the database either way.
+        update_fields = kwargs.get('update_fields')
+        adding = self._state.adding
+        clear_overdue = bool(
+            not adding
+            and self.expected_end_time
+            and self.expected_end_time > timezone.now()
+            and (update_fields is None or 'expected_end_time' in update_fields)
+        )
+        if clear_overdue:
+            self.overdue_since = None
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'overdue_since'}
         
         super().save(*args, **kwargs)
-    
-    def _generate_qr(self):
+        if clear_overdue:
+            # Lets the visit alert again if it overruns the new end
+            self.alerts.filter(kind=VisitorAlert.OVERDUE, resolved_at__isnull=True).delete()
+        if adding and not self.qr_code:
+            qr.schedule(self)  # Rendered off the request; see assets/qr.py
+    
+    def start_visit(self):
+        """
+        Start the visit clock now, for a pre-registered (PENDING) visitor who
+        has arrived. Returns the fields it changed.
+        """
+        self.entry_time = timezone.now()
+        self.expected_end_time = self.entry_time + timezone.timedelta(minutes=self.expected_duration)
+        return ['entry_time', 'expected_end_time']
+    
+    def _generate_qr(self, png=None):
         """Generate QR code for visitor verification"""
-        qr = qrcode.make(str(self.qr_token))
-        buffer = BytesIO()
-        qr.save(buffer, "PNG")
-        self.qr_code.save(f"visitor_{self.qr_token}.png", File(buffer), save=False)
+        png = png or qr.render_png(self.qr_token)
+        self.qr_code.save(f"visitor_{self.qr_token}.png", ContentFile(png), save=False)
     
     @property
     def is_overdue(self):
@@ -119,3 +186,34 @@ class VisitorConfirmation(models.Model):
     
     def __str__(self):
         return f"{self.visitor.name} - {self.confirmation_type} by {self.confirmed_by}"
+
+
+class VisitorAlert(models.Model):
+    """
+    An alert raised for a visit, recorded once per visit and kind by the
+    overdue sweeper and resolved when the visit ends.
+    """
+    OVERDUE = 'OVERDUE'
+    KIND_CHOICES = [
+        (OVERDUE, 'Visit Overdue'),
+    ]
+    
+    visitor = models.ForeignKey(Visitor, on_delete=models.CASCADE, related_name='alerts')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default=OVERDUE)
+    created_at = models.DateTimeField(default=timezone.now)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['visitor', 'kind'], name='visitoralert_once_per_visit'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(resolved_at__isnull=True),
+                name='visitoralert_active_idx',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.visitor.name}"
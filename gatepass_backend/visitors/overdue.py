@@ -0,0 +1,98 @@
+"""
+Overdue-visit sweeper.
+
+``sweep()`` stamps ``overdue_since`` on open visits whose expected end has
+passed and records one VisitorAlert per visit; alerts are resolved once the
+visit is over. Both steps only touch rows in the partial indexes
+``visitor_open_end_idx`` and ``visitoralert_active_idx``, so the cost tracks
+visitors currently on campus, not visitor history.
+Extending a visit past now clears its mark and alert (``Visitor.save``).
+
+Run it from ``manage.py sweep_overdue_visitors`` (cron, or ``--every`` as a
+long-running process). The alert endpoints also call ``sweep_if_due()``,
+which sweeps at most once per ``SWEEP_INTERVAL`` across all workers.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from users import events
+
+from .models import Visitor, VisitorAlert
+
+SWEEP_INTERVAL = 30  # seconds
+SWEEP_LOCK_KEY = "visitors:overdue-sweep"
+
+
+def active_alerts():
+    """Unresolved overdue alerts, oldest first, with their visitor."""
+    return (
+        VisitorAlert.objects.filter(kind=VisitorAlert.OVERDUE, resolved_at__isnull=True)
+        .select_related("visitor")
+        .order_by("created_at")
+    )
+
+
+def overdue_visitors():
+    """Open visits the sweeper has marked overdue."""
+    return Visitor.objects.filter(
+        exit_time__isnull=True,
+        overdue_since__isnull=False,
+        status__in=Visitor.OPEN_STATUSES,
+    )
+
+
+def alert_messages(now=None):
+    """Alert text for every open overdue visit, oldest alert first."""
+    now = now or timezone.now()
+    alerts = active_alerts().filter(
+        visitor__exit_time__isnull=True, visitor__status__in=Visitor.OPEN_STATUSES
+    )
+    messages = []
+    for alert in alerts:
+        minutes = int((now - alert.visitor.expected_end_time).total_seconds() / 60)
+        messages.append(
+            f"Visitor {alert.visitor.name} has exceeded their maximum duration by {minutes} minutes."
+        )
+    return messages
+
+
+def sweep(now=None):
+    """Returns (visits newly marked overdue, alerts resolved)."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        newly_overdue = list(
+            Visitor.objects.select_for_update(skip_locked=True)
+            .filter(
+                exit_time__isnull=True,
+                overdue_since__isnull=True,
+                status__in=Visitor.OPEN_STATUSES,
+                expected_end_time__lt=now,
+            )
+            .values_list("pk", flat=True)
+        )
+        if newly_overdue:
+            Visitor.objects.filter(pk__in=newly_overdue).update(overdue_since=now)
+            VisitorAlert.objects.bulk_create(
+                [
+                    VisitorAlert(visitor_id=pk, kind=VisitorAlert.OVERDUE, created_at=now)
+                    for pk in newly_overdue
+                ],
+                ignore_conflicts=True,
+            )
+            events.publish_on_commit(events.ALERT, lambda: {"visitor_ids": newly_overdue})
+
+        finished = active_alerts().exclude(
+            visitor__exit_time__isnull=True, visitor__status__in=Visitor.OPEN_STATUSES
+        )
+        resolved = VisitorAlert.objects.filter(pk__in=finished.values("pk")).update(
+            resolved_at=now
+        )
+    return len(newly_overdue), resolved
+
+
+def sweep_if_due():
+    """Sweep unless another request or worker did within SWEEP_INTERVAL."""
+    if cache.add(SWEEP_LOCK_KEY, True, timeout=SWEEP_INTERVAL):
+        sweep()
@@ -1,8 +1,8 @@
 import bleach
-import phonenumbers
-import re
+from django.utils import timezone
 from rest_framework import serializers
-from phonenumbers.phonenumberutil import NumberParseException
+from users import normalization
+from users.fieldsets import SparseFieldsSerializerMixin
 from .models import Visitor, VisitorConfirmation
 
 
@@ -29,11 +29,12 @@ class VisitorConfirmationSerializer(serializers.ModelSerializer):
         return sanitize_text(value)
 
 
-class VisitorSerializer(serializers.ModelSerializer):
+class VisitorSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     guard_name = serializers.CharField(source="guard.get_full_name", read_only=True)
     confirmations = VisitorConfirmationSerializer(many=True, read_only=True)
     is_overdue = serializers.BooleanField(read_only=True)
     qr_code_url = serializers.SerializerMethodField()
+    qr_image_url = serializers.SerializerMethodField()
     phone_country = serializers.CharField(write_only=True, required=False, allow_blank=True)
     host_phone_country = serializers.CharField(write_only=True, required=False, allow_blank=True)
     document_type = serializers.ChoiceField(
@@ -43,13 +44,7 @@ class VisitorSerializer(serializers.ModelSerializer):
         default="FOREIGN_ID",
     )
 
-    COUNTRY_DIAL_TO_ISO = {
-        "+254": "KE",
-        "+256": "UG",
-        "+255": "TZ",
-        "+1": "US",
-        "+44": "GB",
-    }
+    COUNTRY_DIAL_TO_ISO = normalization.DIAL_CODE_REGIONS
     
     class Meta:
         model = Visitor
@@ -78,43 +73,34 @@ class VisitorSerializer(serializers.ModelSerializer):
             "status",
             "qr_token",
             "qr_code",
+            "guard",
             "guard_name",
             "confirmations",
             "is_overdue",
             "qr_code_url",
+            "qr_image_url",
             "created_at",
             "updated_at",
         ]
         read_only_fields = ["entry_time", "guard", "qr_token", "expected_end_time", "created_at", "updated_at"]
+        related_fields = {"guard_name": ["guard"]}
+        prefetch_fields = {"confirmations": ["confirmations"]}
+        expandable_fields = {"guard": "users.serializers.UserSummarySerializer"}
     
     def get_qr_code_url(self, obj):
         return f"/api/visitors/verify/?token={obj.qr_token}"
 
+    def get_qr_image_url(self, obj):
+        if not obj.qr_token:
+            return None
+        return f"/api/qr/{obj.qr_token}.png"
+
     def _normalize_document_id(self, value, document_type):
         value = sanitize_text(value)
-        normalized = value.upper().strip()
-        if len(normalized) < 5 or len(normalized) > 20:
-            raise serializers.ValidationError(
-                {"national_id": "Document number must be between 5 and 20 characters."}
-            )
-
-        if document_type == "KENYA_NATIONAL_ID":
-            if not re.match(r"^\d{7,8}$", normalized):
-                raise serializers.ValidationError(
-                    {"national_id": "Kenyan National ID must be 7 or 8 digits."}
-                )
-        elif document_type == "PASSPORT":
-            if not re.match(r"^[A-Z0-9]{6,9}$", normalized):
-                raise serializers.ValidationError(
-                    {"national_id": "Passport number must be 6-9 letters/digits (no spaces)."}
-                )
-        else:  # FOREIGN_ID
-            if not re.match(r"^[A-Z0-9-]{5,20}$", normalized):
-                raise serializers.ValidationError(
-                    {"national_id": "Foreign ID must be 5-20 letters/digits (hyphen allowed)."}
-                )
-
-        return normalized
+        try:
+            return normalization.normalize_document(value, document_type)
+        except normalization.NormalizationError as exc:
+            raise serializers.ValidationError({"national_id": str(exc)})
 
     def _normalize_phone(self, value, dial_code, field_name):
         if not value:
@@ -128,21 +114,9 @@ class VisitorSerializer(serializers.ModelSerializer):
             )
 
         try:
-            parsed = phonenumbers.parse(value, region)
-        except NumberParseException:
-            raise serializers.ValidationError(
-                {field_name: "Enter a valid phone number format."}
-            )
-
-        if not phonenumbers.is_valid_number_for_region(parsed, region):
-            raise serializers.ValidationError(
-                {field_name: "Enter a valid number for the selected country."}
-            )
-
-        return phonenumbers.format_number(
-            parsed,
-            phonenumbers.PhoneNumberFormat.E164,
-        )
+            return normalization.normalize_phone(value, region)
+        except normalization.NormalizationError as exc:
+            raise serializers.ValidationError({field_name: str(exc)})
 
     def validate(self, attrs):
         attrs = super().validate(attrs)
@@ -150,10 +124,11 @@ class VisitorSerializer(serializers.ModelSerializer):
         phone_country = attrs.pop("phone_country", "")
         host_phone_country = attrs.pop("host_phone_country", "")
 
-        attrs["national_id"] = self._normalize_document_id(
-            attrs.get("national_id", ""),
-            document_type,
-        )
+        if "national_id" in attrs or not self.partial:
+            attrs["national_id"] = self._normalize_document_id(
+                attrs.get("national_id", ""),
+                document_type,
+            )
 
         if attrs.get("phone"):
             attrs["phone"] = self._normalize_phone(attrs["phone"], phone_country, "phone")
@@ -163,6 +138,15 @@ class VisitorSerializer(serializers.ModelSerializer):
             )
         return attrs
 
+    def update(self, instance, validated_data):
+        duration = validated_data.get("expected_duration")
+        if duration is not None and duration != instance.expected_duration and instance.entry_time:
+            # Changing the duration extends or shortens the visit
+            validated_data["expected_end_time"] = instance.entry_time + timezone.timedelta(
+                minutes=duration
+            )
+        return super().update(instance, validated_data)
+
     def validate_purpose_details(self, value):
         value = sanitize_text(value)
         if len(value) < 10:
@@ -1,3 +1,207 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from users.models import User
+
+from . import overdue, views
+from .models import Visitor, VisitorAlert
+
+
+class OverdueSweepTests(TestCase):
+    def setUp(self):
+        self.visitor = Visitor.objects.create(
+            name="Jane Doe",
+            national_id="12345678",
+            host_name="Dr. Smith",
+            expected_duration=60,
+            expected_end_time=timezone.now() - timedelta(minutes=5),
+        )
+        self.admin = User.objects.create_user("adm", password="pw123456", role="admin")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_sweep_marks_overdue_once(self):
+        self.assertEqual(overdue.sweep(), (1, 0))
+        self.assertEqual(overdue.sweep(), (0, 0))
+        self.visitor.refresh_from_db()
+        self.assertIsNotNone(self.visitor.overdue_since)
+        self.assertEqual(list(overdue.overdue_visitors()), [self.visitor])
+        self.assertEqual(len(overdue.alert_messages()), 1)
+
+    def test_alert_resolved_when_visit_ends(self):
+        overdue.sweep()
+        self.visitor.status = "COMPLETED"
+        self.visitor.exit_time = timezone.now()
+        self.visitor.save()
+        self.assertEqual(overdue.sweep(), (0, 1))
+        self.assertFalse(overdue.active_alerts().exists())
+
+    def test_extending_visit_clears_overdue(self):
+        overdue.sweep()
+        response = self.client.patch(
+            f"/api/visitors/{self.visitor.pk}/", {"expected_duration": 180}, format="json"
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.visitor.refresh_from_db()
+        self.assertIsNone(self.visitor.overdue_since)
+        self.assertGreater(self.visitor.expected_end_time, timezone.now())
+        self.assertFalse(VisitorAlert.objects.exists())
+        self.assertEqual(overdue.sweep(), (0, 0))
+
+    def test_extended_visit_alerts_again_when_it_overruns(self):
+        overdue.sweep()
+        self.visitor.expected_end_time = timezone.now() + timedelta(minutes=30)
+        self.visitor.save(update_fields=["expected_end_time"])
+        self.assertEqual(overdue.sweep(timezone.now() + timedelta(hours=1)), (1, 0))
+        self.assertEqual(VisitorAlert.objects.count(), 1)
+
+
+class DeskTests(TestCase):
+    def setUp(self):
+        cache.clear()  # Sweep throttle
+        guard = User.objects.create_user("grd", password="pw123456", role="guard")
+        self.client = APIClient()
+        self.client.force_authenticate(guard)
+
+    def visitor(self, days_ago=0, **fields):
+        visitor = Visitor.objects.create(
+            name="Jane Doe", national_id="12345678", host_name="Dr. Smith", **fields
+        )
+        if days_ago:
+            entry_time = timezone.now() - timedelta(days=days_ago)
+            Visitor.objects.filter(pk=visitor.pk).update(entry_time=entry_time)
+        return visitor
+
+    def desk(self):
+        response = self.client.get("/api/visitors/desk/", {"omit": "confirmations"})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_overdue_matches_sweeper(self):
+        late = self.visitor(expected_end_time=timezone.now() - timedelta(minutes=1))
+        self.visitor()
+        data = self.desk()
+        self.assertEqual(data["overdue_ids"], [late.pk])
+        self.assertEqual(data["counts"]["overdue"], 1)
+        overdue_list = self.client.get("/api/visitors/overdue/").data
+        self.assertEqual([v["id"] for v in overdue_list], [late.pk])
+
+    def test_earlier_visits_are_capped_but_counted(self):
+        for _ in range(3):
+            self.visitor(days_ago=2, status="PENDING")
+        with mock.patch.object(views, "DESK_CARRY_OVER_LIMIT", 2):
+            data = self.desk()
+        self.assertEqual(len(data["visits"]), 2)
+        self.assertTrue(data["more_earlier"])
+        self.assertEqual(data["counts"]["pending"], 3)
+
+
+class PreRegistrationTests(TestCase):
+    def setUp(self):
+        guard = User.objects.create_user("grd", password="pw123456", role="guard")
+        self.client = APIClient()
+        self.client.force_authenticate(guard)
+
+    def import_visitor(self, **fields):
+        row = {
+            "name": "Jane Wanjiku",
+            "national_id": "12345678",
+            "document_type": "KENYA_NATIONAL_ID",
+            "purpose_details": "Quarterly planning meeting",
+            "host_name": "Dr. Otieno",
+            "expected_duration": 90,
+            **fields,
+        }
+        response = self.client.post("/api/visitors/bulk/", {"visitors": [row]}, format="json")
+        self.assertEqual(response.data["created"], 1, response.data)
+        visitor = Visitor.objects.get(pk=response.data["results"][0]["id"])
+        # Imported hours before the visitor turns up
+        Visitor.objects.filter(pk=visitor.pk).update(entry_time=timezone.now() - timedelta(hours=5))
+        return visitor
+
+    def test_approval_starts_unscheduled_visit(self):
+        visitor = self.import_visitor()
+        self.assertEqual(visitor.status, "PENDING")
+        self.assertIsNone(visitor.expected_end_time)
+        self.client.post(f"/api/visitors/{visitor.pk}/approve/")
+        visitor.refresh_from_db()
+        self.assertEqual(visitor.status, "APPROVED")
+        self.assertAlmostEqual(visitor.entry_time, timezone.now(), delta=timedelta(minutes=1))
+        self.assertEqual(visitor.expected_end_time - visitor.entry_time, timedelta(minutes=90))
+        self.assertEqual(overdue.sweep(), (0, 0))
+
+    def test_host_confirmation_starts_visit(self):
+        scheduled = timezone.now() - timedelta(hours=4)
+        visitor = self.import_visitor(scheduled_time=scheduled.isoformat())
+        self.client.post(
+            f"/api/visitors/{visitor.pk}/confirm/",
+            {"confirmation_type": "ARRIVED", "confirmed_by": "Dr. Otieno"},
+            format="json",
+        )
+        visitor.refresh_from_db()
+        self.assertEqual(visitor.status, "IN_MEETING")
+        self.assertGreater(visitor.expected_end_time, timezone.now())
+
+
+class LookupTests(TestCase):
+    def setUp(self):
+        guard = User.objects.create_user("grd", password="pw123456", role="guard")
+        self.client = APIClient()
+        self.client.force_authenticate(guard)
+
+    def visit(self, name, national_id, days_ago, **fields):
+        fields.setdefault("host_name", "Dr. Smith")
+        visitor = Visitor.objects.create(name=name, national_id=national_id, **fields)
+        entry_time = timezone.now() - timedelta(days=days_ago)
+        Visitor.objects.filter(pk=visitor.pk).update(entry_time=entry_time)
+        return visitor
+
+    def lookup(self, **params):
+        response = self.client.get("/api/visitors/lookup/", params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_document_returns_latest_visit_in_two_queries(self):
+        self.visit("Jane Doe", "12345678", 30, host_name="Dr. Old", phone="+254712345678")
+        latest = self.visit("Jane Doe", "12345678", 2, status="COMPLETED")
+        with self.assertNumQueries(2):
+            data = self.lookup(document=" 12345678 ")
+        self.assertEqual(data["visit_count"], 2)
+        self.assertEqual(data["visitor"]["host_name"], latest.host_name)
+        self.assertFalse(data["visitor"]["on_site"])
+
+    def test_unknown_document_is_not_found(self):
+        self.assertEqual(self.lookup(document="99999999"), {"found": False})
+
+    def test_name_returns_each_person_once(self):
+        self.visit("Jane Doe", "12345678", 30)
+        self.visit("Jane Doe", "12345678", 2)
+        self.visit("Janet Roe", "87654321", 5)
+        self.visit("John Smith", "11223344", 1)
+        with self.assertNumQueries(1):
+            results = self.lookup(name="jane")["results"]
+        self.assertEqual(
+            sorted((r["name"], r["national_id"]) for r in results),
+            [("Jane Doe", "12345678"), ("Janet Roe", "87654321")],
+        )
+
+    def test_name_results_are_limited(self):
+        for n in range(3):
+            self.visit(f"Jane {n}", f"1234567{n}", n)
+        with mock.patch.object(views, "LOOKUP_LIMIT", 2):
+            self.assertEqual(len(self.lookup(name="jane")["results"]), 2)
+        self.assertEqual(self.lookup(name="j")["results"], [])
+
+    def test_requires_document_or_name(self):
+        self.assertEqual(self.client.get("/api/visitors/lookup/").status_code, 400)
 
-# Create your tests here.
+    def test_students_cannot_look_up_visitors(self):
+        student = User.objects.create_user("stu", password="pw123456", role="student")
+        self.client.force_authenticate(student)
+        response = self.client.get("/api/visitors/lookup/", {"document": "12345678"})
+        self.assertEqual(response.status_code, 403)
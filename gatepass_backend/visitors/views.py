@@ -1,17 +1,55 @@
+from datetime import datetime, time
+
+from django.db.models import Count, Q
 from django.utils import timezone
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from users import normalization, search
+from users.fieldsets import SparseFieldsViewMixin
 from users.permissions import IsAdmin, IsGuard
-from gate_logs.models import GateLog
+from assets import verification
+from gate_logs import buffer as gate_log_buffer
 import random
 import string
 
+from . import bulk, overdue
 from .models import Visitor, VisitorConfirmation
 from .serializers import VisitorSerializer, VisitorConfirmationSerializer
 
 
-class VisitorViewSet(viewsets.ModelViewSet):
+# What a returning visitor's last visit contributes to the registration form
+PREFILL_FIELDS = [
+    "name",
+    "national_id",
+    "phone",
+    "email",
+    "organization",
+    "purpose_category",
+    "purpose_details",
+    "host_name",
+    "host_email",
+    "host_phone",
+    "department",
+    "office_location",
+    "expected_duration",
+]
+LOOKUP_LIMIT = 10
+# Open/pending visits from earlier days listed on the desk; older ones are
+# only counted
+DESK_CARRY_OVER_LIMIT = 200
+
+
+def _prefill_payload(visitor):
+    data = {field: getattr(visitor, field) for field in PREFILL_FIELDS}
+    data["phone_country"], data["phone"] = normalization.split_dial_code(visitor.phone)
+    data["host_phone_country"], data["host_phone"] = normalization.split_dial_code(visitor.host_phone)
+    data["last_visit"] = visitor.entry_time
+    data["on_site"] = visitor.exit_time is None and visitor.status in Visitor.OPEN_STATUSES
+    return data
+
+
+class VisitorViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     Enhanced visitor management with host confirmation workflow.
     GET  /api/visitors/              → list all visitors (guards/admins)
@@ -20,21 +58,23 @@ class VisitorViewSet(viewsets.ModelViewSet):
     POST /api/visitors/{id}/confirm/  → add host confirmation (guard/host)
     POST /api/visitors/{id}/approve/  → approve visitor (guard)
     POST /api/visitors/{id}/deny/     → deny visitor (guard)
+    POST /api/visitors/bulk/          → pre-register visitors from CSV/JSON
     GET  /api/visitors/verify/        → verify visitor by QR token
+    GET  /api/visitors/lookup/        → returning visitor by document or name
     """
 
     serializer_class = VisitorSerializer
     permission_classes = [IsGuard | IsAdmin]
 
     def get_queryset(self):
-        return Visitor.objects.select_related("guard").prefetch_related("confirmations").order_by("-entry_time")
+        return self.with_related(Visitor.objects.order_by("-entry_time"))
 
     def perform_create(self, serializer):
         # Automatically create gate log entry
         visitor = serializer.save(guard=self.request.user)
         
         # Create initial gate log
-        GateLog.objects.create(
+        gate_log_buffer.log_event(
             guard=self.request.user,
             log_type="VISITOR_ENTRY",
             is_visitor=True,
@@ -72,6 +112,10 @@ class VisitorViewSet(viewsets.ModelViewSet):
         if serializer.is_valid():
             confirmation = serializer.save(visitor=visitor)
             
+            update_fields = ['status']
+            if visitor.status == 'PENDING' and confirmation.confirmation_type in ['EXPECTED', 'ARRIVED']:
+                update_fields += visitor.start_visit()
+            
             # Update visitor status based on confirmation type
             if confirmation.confirmation_type == 'EXPECTED':
                 visitor.status = 'APPROVED'
@@ -82,7 +126,7 @@ class VisitorViewSet(viewsets.ModelViewSet):
             elif confirmation.confirmation_type in ['NO_SHOW', 'DENIED']:
                 visitor.status = 'DENIED'
             
-            visitor.save(update_fields=['status'])
+            visitor.save(update_fields=update_fields)
             return Response(VisitorConfirmationSerializer(confirmation).data)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -93,8 +137,11 @@ class VisitorViewSet(viewsets.ModelViewSet):
         Manually approve a visitor (guard decision)
         """
         visitor = self.get_object()
+        update_fields = ['status']
+        if visitor.status == 'PENDING':
+            update_fields += visitor.start_visit()
         visitor.status = 'APPROVED'
-        visitor.save(update_fields=['status'])
+        visitor.save(update_fields=update_fields)
         
         # Add confirmation
         VisitorConfirmation.objects.create(
@@ -134,15 +181,120 @@ class VisitorViewSet(viewsets.ModelViewSet):
         if not token:
             return Response({"error": "token query param is required"}, status=400)
         
-        try:
-            visitor = Visitor.objects.select_related("guard").get(qr_token=token)
-            return Response({
-                "status": "VALID", 
-                "visitor": VisitorSerializer(visitor).data
-            })
-        except Visitor.DoesNotExist:
+        token = verification.parse_token(token)
+        visitor = token and verification.fetch(
+            Visitor.objects.select_related("guard").prefetch_related("confirmations"), token
+        )
+        if not visitor:
             return Response({"status": "INVALID"}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"status": "VALID", "visitor": VisitorSerializer(visitor).data})
     
+    @action(detail=False, methods=["get"], url_path="lookup")
+    def lookup(self, request):
+        """
+        Find a returning visitor to prefill the registration form.
+        ?document=<number> → their latest visit (index on national_id, entry_time)
+        ?name=<text>       → up to 10 people with a similar name, latest visit each
+        """
+        lookup_fields = PREFILL_FIELDS + ["entry_time", "exit_time", "status"]
+        document = request.query_params.get("document", "").strip().upper()
+        if document:
+            visits = Visitor.objects.filter(national_id=document)
+            latest = visits.order_by("-entry_time").only(*lookup_fields).first()
+            if latest is None:
+                return Response({"found": False})
+            return Response({
+                "found": True,
+                "visit_count": visits.count(),
+                "visitor": _prefill_payload(latest),
+            })
+
+        name = request.query_params.get("name", "")
+        if not name:
+            return Response({"error": "document or name query param is required"}, status=400)
+        matches = search.fuzzy(
+            Visitor.objects.order_by("-entry_time").only(*lookup_fields), "name", name
+        )
+        people = {}
+        for visitor in matches[: LOOKUP_LIMIT * 5]:
+            people.setdefault(visitor.national_id, visitor)
+            if len(people) == LOOKUP_LIMIT:
+                break
+        return Response({"results": [_prefill_payload(v) for v in people.values()]})
+
+    @action(detail=False, methods=["get"], url_path="desk")
+    def desk(self, request):
+        """
+        Everything the visitor desk shows in one response: today's visits plus
+        up to DESK_CARRY_OVER_LIMIT still open or pending from earlier days,
+        the ids of the pending and overdue ones, and counts over all of them.
+        Overdue means marked by the sweeper, as on the overdue/alerts
+        endpoints. Three queries (plus the confirmations prefetch, skippable
+        with ?omit=confirmations).
+        """
+        overdue.sweep_if_due()
+        today = timezone.make_aware(
+            datetime.combine(timezone.localdate(), time.min)
+        )
+        unfinished = Q(exit_time__isnull=True, status__in=Visitor.OPEN_STATUSES + ['PENDING'])
+        on_site = Q(exit_time__isnull=True, status__in=Visitor.OPEN_STATUSES)
+
+        visits = list(self.get_queryset().filter(entry_time__gte=today))
+        earlier = list(
+            self.get_queryset().filter(unfinished, entry_time__lt=today)[:DESK_CARRY_OVER_LIMIT + 1]
+        )
+        more_earlier = len(earlier) > DESK_CARRY_OVER_LIMIT
+        visits += earlier[:DESK_CARRY_OVER_LIMIT]
+
+        counts = Visitor.objects.filter(Q(entry_time__gte=today) | unfinished).aggregate(
+            total=Count('pk'),
+            on_site=Count('pk', filter=on_site),
+            pending=Count('pk', filter=Q(status='PENDING')),
+            overdue=Count('pk', filter=on_site & Q(overdue_since__isnull=False)),
+            completed_today=Count('pk', filter=Q(status='COMPLETED', entry_time__gte=today)),
+        )
+        return Response({
+            "date": timezone.localdate(),
+            "visits": self.get_serializer(visits, many=True).data,
+            "more_earlier": more_earlier,
+            "pending_ids": [v.pk for v in visits if v.status == 'PENDING'],
+            "overdue_ids": [
+                v.pk for v in visits
+                if v.overdue_since and v.exit_time is None and v.status in Visitor.OPEN_STATUSES
+            ],
+            "counts": counts,
+        })
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        """
+        POST /api/visitors/bulk/ — pre-register visitors in one request.
+        Body: multipart ``file`` (.csv with a header row, or .json), or
+        {"visitors": [{<visitor fields>}, ...]}. Add ?dry_run=1 to only validate.
+        """
+        upload = request.FILES.get("file")
+        if upload is not None:
+            try:
+                rows = bulk.read_rows(upload)
+            except ValueError as exc:
+                return Response({"error": str(exc)}, status=400)
+        else:
+            rows = request.data.get("visitors") if isinstance(request.data, dict) else None
+        if not isinstance(rows, list) or not rows:
+            return Response({"error": "Provide a file or a non-empty visitors list"}, status=400)
+        if len(rows) > bulk.MAX_ROWS:
+            return Response(
+                {"error": f"An import may contain at most {bulk.MAX_ROWS} visitors."},
+                status=400,
+            )
+
+        dry_run = request.query_params.get("dry_run") in ("1", "true")
+        results = bulk.register(rows, request.user, dry_run=dry_run)
+        summary = {"created": 0, "valid": 0, "error": 0}
+        for result in results:
+            summary[result["status"]] += 1
+        return Response({**summary, "results": results})
+
     @action(detail=False, methods=["get"], url_path="pending")
     def pending_visitors(self, request):
         """
@@ -157,13 +309,9 @@ class VisitorViewSet(viewsets.ModelViewSet):
         """
         Get visitors who have exceeded their expected duration
         """
-        now = timezone.now()
-        overdue = self.get_queryset().filter(
-            expected_end_time__lt=now,
-            exit_time__isnull=True,
-            status__in=['APPROVED', 'CHECKED_IN', 'IN_MEETING']
-        )
-        serializer = self.get_serializer(overdue, many=True)
+        overdue.sweep_if_due()
+        visitors = self.with_related(overdue.overdue_visitors().order_by("-entry_time"))
+        serializer = self.get_serializer(visitors, many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=["get"], url_path="alerts")
@@ -171,15 +319,5 @@ class VisitorViewSet(viewsets.ModelViewSet):
         """
         Get formatted alert messages for overdue visitors
         """
-        now = timezone.now()
-        overdue = self.get_queryset().filter(
-            expected_end_time__lt=now,
-            exit_time__isnull=True,
-            status__in=['APPROVED', 'CHECKED_IN', 'IN_MEETING']
-        )
-        alerts_list = []
-        for visitor in overdue:
-            diff = now - visitor.expected_end_time
-            minutes = int(diff.total_seconds() / 60)
-            alerts_list.append(f"Visitor {visitor.name} has exceeded their maximum duration by {minutes} minutes.")
-        return Response({"alerts": alerts_list})
+        overdue.sweep_if_due()
+        return Response({"alerts": overdue.alert_messages()})